@@ -0,0 +1,214 @@
+"""
+Compare fusion strategies for merging vector and full-text candidates.
+
+Fetches vector and full-text candidates for every labelled query in the fixture (queries with a
+"relevant" list of dataset uris), fuses them with each strategy and weighting, and reports NDCG@k
+of the fused order, counting a candidate as relevant when one of its connected datasets is. The
+rerank depth column is the mean number of fused candidates needed to reach 90% of the relevant
+ones in the pool, i.e. how many would have to go to the cross-encoder.
+
+Candidates come from Neo4j and Bedrock (credentials in .env); save them once and iterate offline:
+	uv run scripts/benchmark-fusion.py --save runs.json
+	uv run scripts/benchmark-fusion.py --runs runs.json --weights 1,1 2,1 1,2
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "serka-mcp"))
+
+from fusion import FUSION_METHODS, fuse  # noqa: E402
+
+_FIXTURE = (
+	Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "search-queries.json"
+)
+_RESULT_TYPE_LABEL = {
+	"dataset": "TextChunk",
+	"person": "Person",
+	"organisation": "Organisation",
+}
+
+
+def _ndcg(relevances: list[int], ideal: list[int], k: int) -> float:
+	def dcg(rels: list[int]) -> float:
+		return sum((2**rel - 1) / math.log2(i + 2) for i, rel in enumerate(rels[:k]))
+
+	best = dcg(sorted(ideal, reverse=True))
+	return dcg(relevances) / best if best else 0.0
+
+
+def _rerank_depth(relevances: list[int], share: float = 0.9) -> int:
+	needed = math.ceil(share * sum(relevances))
+	found = 0
+	for depth, rel in enumerate(relevances, start=1):
+		found += rel
+		if found >= needed:
+			return depth
+	return len(relevances)
+
+
+async def _fetch_runs(fixture: list[dict], candidates: int) -> list[dict]:
+	from dotenv import load_dotenv
+	from embedders import create_embedder
+	from neo4j import AsyncGraphDatabase
+	from queries import escape_fts_query, fulltext_search_query, search_query
+
+	load_dotenv()
+	dimensions = (
+		int(os.getenv("MODELS_EMBEDDING_DIMENSIONS"))
+		if os.getenv("MODELS_EMBEDDING_DIMENSIONS")
+		else None
+	)
+	embedder = create_embedder(f"{os.getenv('MODELS_EMBEDDING')}", dimensions)
+	driver = AsyncGraphDatabase.driver(
+		f"bolt://{os.getenv('NEO4J_HOST', 'localhost')}:{os.getenv('NEO4J_PORT', '7687')}",
+		auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+	)
+
+	def candidate_list(rows: list[dict]) -> list[dict]:
+		return [
+			{
+				"key": row["start_node_id"],
+				"score": row["score"],
+				"datasets": [d["dataset"].get("uri") for d in row["datasets"]],
+			}
+			for row in rows
+		]
+
+	runs = []
+	try:
+		async with driver.session(database="neo4j") as session:
+			for q in fixture:
+				label = _RESULT_TYPE_LABEL.get(q.get("result_type"))
+				embedding = embedder.run(q["query"])["embedding"]
+				vector_rows = await session.execute_read(
+					search_query,
+					embedding=embedding,
+					limit=candidates,
+					label=label,
+					max_datasets=1000,
+				)
+				ft_rows = await session.execute_read(
+					fulltext_search_query,
+					search_term=escape_fts_query(q["query"]),
+					limit=candidates,
+					label=label,
+					max_datasets=1000,
+				)
+				runs.append(
+					{
+						"query": q["query"],
+						"relevant": q["relevant"],
+						"lists": [candidate_list(vector_rows), candidate_list(ft_rows)],
+					}
+				)
+	finally:
+		await driver.close()
+	return runs
+
+
+def _evaluate(
+	runs: list[dict],
+	method: str,
+	weights: tuple[float, float],
+	rrf_k: int,
+	ks: list[int],
+) -> dict:
+	ndcgs: dict[int, list[float]] = {k: [] for k in ks}
+	depths: list[int] = []
+	for run in runs:
+		relevant = set(run["relevant"])
+		gains = {
+			c["key"]: int(bool(relevant.intersection(c["datasets"])))
+			for candidates in run["lists"]
+			for c in candidates
+		}
+		fused = fuse(
+			[[c["key"] for c in candidates] for candidates in run["lists"]],
+			[[c["score"] for c in candidates] for candidates in run["lists"]],
+			method=method,
+			weights=weights,
+			k=rrf_k,
+		)
+		relevances = [gains[key] for key, _ in fused]
+		if not any(relevances):
+			continue
+		for k in ks:
+			ndcgs[k].append(_ndcg(relevances, list(gains.values()), k))
+		depths.append(_rerank_depth(relevances))
+	return {
+		"ndcg": {k: statistics.mean(v) if v else 0.0 for k, v in ndcgs.items()},
+		"depth": statistics.mean(depths) if depths else 0.0,
+		"queries": len(depths),
+	}
+
+
+def main(args) -> None:
+	if args.runs:
+		runs = json.loads(args.runs.read_text())
+	else:
+		fixture = [q for q in json.loads(args.fixture.read_text()) if q.get("relevant")]
+		if not fixture:
+			sys.exit(
+				f'{args.fixture} has no queries with a "relevant" list of dataset uris'
+			)
+		runs = asyncio.run(_fetch_runs(fixture, args.candidates))
+		if args.save:
+			args.save.write_text(json.dumps(runs))
+
+	weightings = [tuple(float(w) for w in spec.split(",")) for spec in args.weights]
+	print(f"{len(runs)} labelled queries, RRF k={args.rrf_k}")
+	print(
+		f"{'method':<14}{'weights':>10}"
+		+ "".join(f"{f'NDCG@{k}':>10}" for k in args.k)
+		+ f"{'rerank depth':>14}"
+	)
+	for method in args.methods:
+		for weights in [(1.0, 1.0)] if method == "rrf" else weightings:
+			result = _evaluate(runs, method, weights, args.rrf_k, args.k)
+			print(
+				f"{method:<14}{f'{weights[0]:g},{weights[1]:g}':>10}"
+				+ "".join(f"{result['ndcg'][k]:>10.4f}" for k in args.k)
+				+ f"{result['depth']:>14.1f}"
+			)
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Benchmark fusion strategies on labelled queries"
+	)
+	parser.add_argument("--fixture", type=Path, default=_FIXTURE)
+	parser.add_argument(
+		"--runs",
+		type=Path,
+		help="Evaluate candidates saved by --save instead of querying",
+	)
+	parser.add_argument(
+		"--save", type=Path, help="Write the fetched candidates to this file"
+	)
+	parser.add_argument(
+		"--candidates",
+		type=int,
+		default=100,
+		help="Candidates fetched per query and index",
+	)
+	parser.add_argument(
+		"--methods", nargs="+", default=list(FUSION_METHODS), choices=FUSION_METHODS
+	)
+	parser.add_argument(
+		"--weights",
+		nargs="+",
+		default=["1,1", "2,1", "1,2"],
+		help="Vector,full-text weightings to try",
+	)
+	parser.add_argument("--rrf-k", type=int, default=60)
+	parser.add_argument(
+		"--k", type=int, nargs="+", default=[5, 10, 25], help="NDCG cut-offs"
+	)
+	main(parser.parse_args())
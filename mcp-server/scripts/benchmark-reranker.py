@@ -0,0 +1,111 @@
+"""
+Compare cross-encoder variants on throughput and ranking quality.
+
+Scores every (query, passage) pair in a labelled fixture with each variant and reports pairs/s
+and NDCG@k against the fixture's graded relevance, with the delta from the first variant.
+
+Usage:
+	uv run scripts/benchmark-reranker.py [--variants fp32 int8] [--threads 4] [--max-length 256]
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "serka-mcp"))
+
+from rerankers import DEFAULT_RERANKER_MODEL, ONNX_FILES, create_reranker  # noqa: E402
+
+_FIXTURE = (
+	Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "rerank-queries.json"
+)
+
+
+def _ndcg(relevances: list[int], k: int) -> float:
+	def dcg(rels: list[int]) -> float:
+		return sum((2**rel - 1) / math.log2(i + 2) for i, rel in enumerate(rels[:k]))
+
+	ideal = dcg(sorted(relevances, reverse=True))
+	return dcg(relevances) / ideal if ideal else 0.0
+
+
+def _evaluate(
+	reranker, fixture: list[dict], k: int, repeats: int, batch_size: int
+) -> dict:
+	pairs = [(q["query"], p["text"]) for q in fixture for p in q["passages"]]
+	reranker.predict(
+		pairs[:batch_size], batch_size=batch_size, show_progress_bar=False
+	)  # warm up
+
+	t0 = time.perf_counter()
+	for _ in range(repeats):
+		scores = reranker.predict(pairs, batch_size=batch_size, show_progress_bar=False)
+	elapsed = time.perf_counter() - t0
+
+	ndcgs = []
+	offset = 0
+	for q in fixture:
+		n = len(q["passages"])
+		ranked = sorted(range(n), key=lambda i: scores[offset + i], reverse=True)
+		ndcgs.append(_ndcg([q["passages"][i]["relevance"] for i in ranked], k))
+		offset += n
+	return {
+		"pairs_per_s": len(pairs) * repeats / elapsed,
+		"ndcg": sum(ndcgs) / len(ndcgs),
+	}
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Benchmark fp32 vs quantised cross-encoders"
+	)
+	parser.add_argument("--model", default=DEFAULT_RERANKER_MODEL)
+	parser.add_argument(
+		"--variants",
+		nargs="+",
+		default=["fp32", "int8"],
+		help=f"Precisions ({', '.join(ONNX_FILES)}) or ONNX file paths within the model repo",
+	)
+	parser.add_argument(
+		"--fixture", type=Path, default=_FIXTURE, help="Labelled queries and passages"
+	)
+	parser.add_argument("--k", type=int, default=5, help="Cut-off for NDCG@k")
+	parser.add_argument(
+		"--repeats", type=int, default=20, help="Passes over the fixture when timing"
+	)
+	parser.add_argument("--batch-size", type=int, default=32)
+	parser.add_argument(
+		"--threads",
+		type=int,
+		default=0,
+		help="ONNX Runtime intra-op threads, 0 for default",
+	)
+	parser.add_argument("--max-length", type=int, default=None)
+	args = parser.parse_args()
+
+	fixture = json.loads(args.fixture.read_text())
+	print(
+		f"{args.model}: {len(fixture)} queries, {sum(len(q['passages']) for q in fixture)} pairs, NDCG@{args.k}"
+	)
+	baseline = None
+	for variant in args.variants:
+		t0 = time.perf_counter()
+		reranker = create_reranker(
+			model=args.model,
+			precision=variant if variant in ONNX_FILES else "fp32",
+			onnx_file=None if variant in ONNX_FILES else variant,
+			intra_op_threads=args.threads,
+			max_length=args.max_length,
+		)
+		load = time.perf_counter() - t0
+		result = _evaluate(reranker, fixture, args.k, args.repeats, args.batch_size)
+		baseline = baseline or result
+		print(
+			f"{variant:<36} {result['pairs_per_s']:>9,.0f} pairs/s "
+			f"({result['pairs_per_s'] / baseline['pairs_per_s']:.2f}x)  "
+			f"NDCG {result['ndcg']:.4f} ({result['ndcg'] - baseline['ndcg']:+.4f})  "
+			f"load {load:.1f}s"
+		)
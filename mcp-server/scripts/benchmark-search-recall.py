@@ -0,0 +1,194 @@
+"""
+Measure search recall and latency against the candidate count and index breadth.
+
+For every fixture query and each (candidate factor, index oversample) setting, runs the vector and
+full-text searches the way the search tool does and reports, averaged over queries:
+  - ann recall@k: share of the exact top-k vector hits (an exhaustive cosine scan) found by the index
+  - dataset recall: share of the query's labelled relevant datasets connected to any candidate,
+    i.e. what reranking could still surface; only for fixture queries with a "relevant" list
+  - p50 latency of the vector and full-text queries together
+
+Run against a Neo4j with ingested data and Bedrock credentials in .env:
+	uv run scripts/benchmark-search-recall.py --factors 1 2 4 8 --oversample 1 2 4 --k 25
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from neo4j import AsyncGraphDatabase
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "serka-mcp"))
+
+from embedders import create_embedder  # noqa: E402
+from queries import (
+	_SEARCH_RETURN,
+	escape_fts_query,
+	fulltext_search_query,
+	search_query,
+)  # noqa: E402
+
+_FIXTURE = (
+	Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "search-queries.json"
+)
+_RESULT_TYPE_LABEL = {
+	"dataset": "TextChunk",
+	"person": "Person",
+	"organisation": "Organisation",
+}
+
+
+async def _exact_search(
+	tx, embedding: list[float], limit: int, label: str | None
+) -> list[dict]:
+	# Exhaustive cosine scan over the nodes the index covers: the ground truth for ann recall
+	result = await tx.run(
+		f"MATCH (start_node:{label or 'embedded'}) "
+		"WHERE start_node.embedding IS NOT NULL AND EXISTS { (start_node)--(:Dataset) } "
+		"WITH start_node, vector.similarity.cosine(start_node.embedding, $embedding) AS score "
+		"ORDER BY score DESC LIMIT $limit "
+		"MATCH (start_node)-[r]-(connected_node:Dataset) "
+		+ _SEARCH_RETURN
+		+ " LIMIT $limit",
+		embedding=embedding,
+		limit=limit,
+		max_datasets=1000,
+	)
+	return await result.data()
+
+
+def _dataset_uris(rows: list[dict]) -> set[str]:
+	return {d["dataset"].get("uri") for row in rows for d in row["datasets"]}
+
+
+async def main(args) -> None:
+	load_dotenv()
+	fixture = json.loads(args.fixture.read_text())
+	dimensions = (
+		int(os.getenv("MODELS_EMBEDDING_DIMENSIONS"))
+		if os.getenv("MODELS_EMBEDDING_DIMENSIONS")
+		else None
+	)
+	embedder = create_embedder(f"{os.getenv('MODELS_EMBEDDING')}", dimensions)
+	embeddings = [embedder.run(q["query"])["embedding"] for q in fixture]
+	driver = AsyncGraphDatabase.driver(
+		f"bolt://{os.getenv('NEO4J_HOST', 'localhost')}:{os.getenv('NEO4J_PORT', '7687')}",
+		auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+	)
+	labelled = sum(1 for q in fixture if q.get("relevant"))
+	print(
+		f"{len(fixture)} queries ({labelled} labelled), k={args.k}, {args.repeats} timed runs each"
+	)
+	print(
+		f"{'factor':>6} {'oversample':>10} {'candidates':>10} {'index k':>8} {'ann recall':>10} {'dataset recall':>14} {'p50':>8}"
+	)
+	try:
+		async with driver.session(database="neo4j") as session:
+			exact = [
+				await session.execute_read(
+					_exact_search,
+					embedding,
+					args.k,
+					_RESULT_TYPE_LABEL.get(q.get("result_type")),
+				)
+				for q, embedding in zip(fixture, embeddings)
+			]
+			for factor in args.factors:
+				for oversample in args.oversample:
+					candidates = max(args.k, math.ceil(args.k * factor))
+					index_k = math.ceil(candidates * max(oversample, 1.0))
+					ann_recalls: list[float] = []
+					dataset_recalls: list[float] = []
+					latencies: list[float] = []
+					for q, embedding, truth in zip(fixture, embeddings, exact):
+						label = _RESULT_TYPE_LABEL.get(q.get("result_type"))
+						for _ in range(args.repeats):
+							t0 = time.perf_counter()
+							vector_rows = await session.execute_read(
+								search_query,
+								embedding=embedding,
+								limit=candidates,
+								k=index_k,
+								label=label,
+								max_datasets=1000,
+							)
+							ft_rows = await session.execute_read(
+								fulltext_search_query,
+								search_term=escape_fts_query(q["query"]),
+								limit=candidates,
+								k=index_k,
+								label=label,
+								max_datasets=1000,
+							)
+							latencies.append(time.perf_counter() - t0)
+						if truth:
+							found = {
+								row["start_node_id"] for row in vector_rows[: args.k]
+							}
+							ann_recalls.append(
+								len(found & {row["start_node_id"] for row in truth})
+								/ len(truth)
+							)
+						if q.get("relevant"):
+							relevant = set(q["relevant"])
+							reached = _dataset_uris(vector_rows) | _dataset_uris(
+								ft_rows
+							)
+							dataset_recalls.append(
+								len(reached & relevant) / len(relevant)
+							)
+					dataset_recall = (
+						f"{statistics.mean(dataset_recalls):.3f}"
+						if dataset_recalls
+						else "-"
+					)
+					print(
+						f"{factor:>6g} {oversample:>10g} {candidates:>10} {index_k:>8} "
+						f"{statistics.mean(ann_recalls) if ann_recalls else 0.0:>10.3f} {dataset_recall:>14} "
+						f"{statistics.median(latencies) * 1000:>6.0f}ms"
+					)
+	finally:
+		await driver.close()
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Benchmark search recall against candidate counts"
+	)
+	parser.add_argument(
+		"--fixture",
+		type=Path,
+		default=_FIXTURE,
+		help='Queries with optional "result_type" and "relevant" (list of dataset uris)',
+	)
+	parser.add_argument(
+		"--k",
+		type=int,
+		default=25,
+		help="Results per query, the search tool's result_limit",
+	)
+	parser.add_argument(
+		"--factors",
+		type=float,
+		nargs="+",
+		default=[1, 2, 4, 8],
+		help="Values of SEARCH_CANDIDATE_FACTOR to try",
+	)
+	parser.add_argument(
+		"--oversample",
+		type=float,
+		nargs="+",
+		default=[1, 2],
+		help="Values of SEARCH_INDEX_OVERSAMPLE to try",
+	)
+	parser.add_argument(
+		"--repeats", type=int, default=3, help="Timed runs per query and setting"
+	)
+	asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,208 @@
+"""
+Compare post-filtered and pre-filtered bounding-box search on a synthetic catalogue.
+
+Loads N datasets with random UK extents, each described by a few text chunks with random
+embeddings, creates the same indexes as ingest, then times both search modes for boxes of
+increasing size and reports how many results each mode returns inside the box.
+
+The catalogue replaces everything in the target database, so point it at a scratch Neo4j:
+	uv run scripts/benchmark-spatial-search.py --wipe [--datasets 50000] [--dim 256]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from neo4j import AsyncGraphDatabase
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "serka-mcp"))
+
+from models import BoundingBox  # noqa: E402
+from queries import (
+	prefiltered_search_query,
+	search_query,
+	spatial_candidate_count_query,
+)  # noqa: E402
+
+# Roughly the extent of Great Britain
+_UK = BoundingBox(south=49.9, north=58.7, west=-7.6, east=1.8)
+# Box side lengths in degrees of latitude; catchment, county and region sized
+_BOX_SIZES = [0.1, 0.5, 2.0]
+
+
+def _random_vector(dim: int) -> list[float]:
+	return [random.gauss(0, 1) for _ in range(dim)]
+
+
+def _random_extent() -> dict:
+	# Mostly small site-level extents with the odd national one, as in the real catalogue
+	height = 8.0 if random.random() < 0.05 else random.expovariate(1 / 0.2)
+	width = height * 1.6
+	south = random.uniform(_UK.south, _UK.north - min(height, _UK.north - _UK.south))
+	west = random.uniform(_UK.west, _UK.east - min(width, _UK.east - _UK.west))
+	return {
+		"south_boundary": south,
+		"north_boundary": min(south + height, _UK.north),
+		"west_boundary": west,
+		"east_boundary": min(west + width, _UK.east),
+	}
+
+
+async def _load(
+	driver, datasets: int, chunks: int, dim: int, batch_size: int = 500
+) -> None:
+	async with driver.session(database="neo4j") as session:
+		# Batched deletes have to run in an implicit transaction
+		result = await session.run(
+			"MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS"
+		)
+		await result.consume()
+	for start in range(0, datasets, batch_size):
+		rows = [
+			{
+				"uri": f"https://example.org/dataset/{i}",
+				"title": f"Synthetic dataset {i}",
+				"citations": random.randint(0, 50),
+				**_random_extent(),
+				"chunks": [
+					{
+						"doc_id": f"{i}-{c}",
+						"content": f"chunk {c} of dataset {i}",
+						"embedding": _random_vector(dim),
+					}
+					for c in range(chunks)
+				],
+			}
+			for i in range(start, min(start + batch_size, datasets))
+		]
+		await driver.execute_query(
+			"UNWIND $rows AS row "
+			"CREATE (d:Dataset:embedded {uri: row.uri, title: row.title, citations: row.citations, "
+			"south_boundary: row.south_boundary, north_boundary: row.north_boundary, "
+			"west_boundary: row.west_boundary, east_boundary: row.east_boundary}) "
+			"SET d.extent_sw = point({latitude: row.south_boundary, longitude: row.west_boundary}), "
+			"d.extent_ne = point({latitude: row.north_boundary, longitude: row.east_boundary}) "
+			"WITH d, row UNWIND row.chunks AS chunk "
+			"CREATE (t:TextChunk:embedded {doc_id: chunk.doc_id, content: chunk.content}) "
+			"CREATE (t)-[:DESCRIPTION_OF]->(d) "
+			"WITH t, chunk CALL db.create.setNodeVectorProperty(t, 'embedding', chunk.embedding)",
+			rows=rows,
+		)
+		print(
+			f"\r  loaded {min(start + batch_size, datasets):,}/{datasets:,} datasets",
+			end="",
+			flush=True,
+		)
+	print()
+	for statement in [
+		"CREATE VECTOR INDEX vec_lookup IF NOT EXISTS FOR (n:embedded) ON n.embedding",
+		"CREATE POINT INDEX dataset_extent_sw IF NOT EXISTS FOR (d:Dataset) ON d.extent_sw",
+		"CREATE POINT INDEX dataset_extent_ne IF NOT EXISTS FOR (d:Dataset) ON d.extent_ne",
+	]:
+		await driver.execute_query(statement)
+	await driver.execute_query("CALL db.awaitIndexes(600)")
+
+
+def _random_box(size: float) -> BoundingBox:
+	south = random.uniform(_UK.south, _UK.north - size)
+	west = random.uniform(_UK.west, _UK.east - size * 1.6)
+	return BoundingBox(
+		south=south, north=south + size, west=west, east=west + size * 1.6
+	)
+
+
+async def _time(session, query, **params) -> tuple[float, int]:
+	t0 = time.perf_counter()
+	rows = await session.execute_read(query, **params)
+	return time.perf_counter() - t0, len(rows)
+
+
+async def main(args) -> None:
+	load_dotenv()
+	driver = AsyncGraphDatabase.driver(
+		args.uri
+		or f"bolt://{os.getenv('NEO4J_HOST', 'localhost')}:{os.getenv('NEO4J_PORT', '7687')}",
+		auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+	)
+	try:
+		if not args.skip_load:
+			print(
+				f"Loading {args.datasets:,} datasets × {args.chunks} chunks ({args.dim}-d embeddings)"
+			)
+			await _load(driver, args.datasets, args.chunks, args.dim)
+
+		print(f"{args.queries} queries per box size, top {args.limit}, label TextChunk")
+		async with driver.session(database="neo4j") as session:
+			for size in _BOX_SIZES:
+				timings: dict[str, list[float]] = {"postfilter": [], "prefilter": []}
+				hits: dict[str, list[int]] = {"postfilter": [], "prefilter": []}
+				candidates: list[int] = []
+				for _ in range(args.queries):
+					box = _random_box(size)
+					embedding = _random_vector(args.dim)
+					candidates.append(
+						await session.execute_read(spatial_candidate_count_query, box)
+					)
+					for mode, query in [
+						("postfilter", search_query),
+						("prefilter", prefiltered_search_query),
+					]:
+						elapsed, rows = await _time(
+							session,
+							query,
+							embedding=embedding,
+							bounding_box=box,
+							limit=args.limit,
+							label="TextChunk",
+						)
+						timings[mode].append(elapsed)
+						hits[mode].append(rows)
+				print(
+					f"{size:>4}° box, median {statistics.median(candidates):,.0f} datasets in the expanded box"
+				)
+				for mode in timings:
+					print(
+						f"    {mode:<10} p50 {statistics.median(timings[mode]) * 1000:>7.1f}ms  "
+						f"max {max(timings[mode]) * 1000:>7.1f}ms  "
+						f"mean results {statistics.mean(hits[mode]):>5.1f}/{args.limit}"
+					)
+	finally:
+		await driver.close()
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Benchmark spatial pre-filtering against post-filtering"
+	)
+	parser.add_argument(
+		"--uri", help="Bolt URI, defaults to NEO4J_HOST/NEO4J_PORT from .env"
+	)
+	parser.add_argument(
+		"--wipe", action="store_true", help="Confirm the target database may be emptied"
+	)
+	parser.add_argument(
+		"--skip-load",
+		action="store_true",
+		help="Reuse a catalogue loaded by a previous run",
+	)
+	parser.add_argument("--datasets", type=int, default=50000)
+	parser.add_argument("--chunks", type=int, default=3, help="Text chunks per dataset")
+	parser.add_argument("--dim", type=int, default=256, help="Embedding dimension")
+	parser.add_argument("--queries", type=int, default=20, help="Queries per box size")
+	parser.add_argument(
+		"--limit", type=int, default=20, help="Candidates requested per query"
+	)
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+	if not (args.wipe or args.skip_load):
+		parser.error(
+			"loading the catalogue deletes everything in the database; pass --wipe to confirm"
+		)
+	random.seed(args.seed)
+	asyncio.run(main(args))
@@ -0,0 +1,104 @@
+"""
+Measure how long the MCP server takes to start serving.
+
+Starts the server as a subprocess several times and reports, from process start:
+  - live: /health/live first answers, i.e. the server accepts connections
+  - first request: the first tool call (sent as soon as the server is live) returns
+  - ready: /health/ready first answers 200, i.e. models are loaded and Neo4j is warm
+Each run is repeated with STARTUP_PRELOAD on and off, to compare background preloading with
+loading everything on first use. Needs the same .env as the server (Neo4j, Bedrock).
+
+	uv run scripts/benchmark-startup.py --runs 3 --tool search
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from fastmcp import Client
+
+_SERVER = Path(__file__).resolve().parents[1] / "src" / "serka-mcp" / "main.py"
+
+
+async def _wait_for(
+	client: httpx.AsyncClient, url: str, t0: float, timeout: float, status: int = 200
+) -> float:
+	while time.perf_counter() - t0 < timeout:
+		try:
+			if (await client.get(url)).status_code == status:
+				return time.perf_counter() - t0
+		except httpx.TransportError:
+			pass
+		await asyncio.sleep(0.05)
+	raise TimeoutError(f"{url} did not answer {status} within {timeout:.0f}s")
+
+
+async def _run(args, preload: bool) -> dict[str, float]:
+	env = {**os.environ, "STARTUP_PRELOAD": "true" if preload else "false"}
+	t0 = time.perf_counter()
+	server = subprocess.Popen(
+		[sys.executable, str(_SERVER)],
+		cwd=_SERVER.parents[2],
+		env=env,
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.DEVNULL,
+	)
+	try:
+		async with httpx.AsyncClient(timeout=1.0) as http:
+			live = await _wait_for(
+				http, f"{args.base_url}/health/live", t0, args.timeout
+			)
+			async with Client(f"{args.base_url}/mcp/") as mcp:
+				await mcp.call_tool(
+					args.tool,
+					{"search_term": "soil moisture"} if args.tool == "search" else {},
+				)
+			first_request = time.perf_counter() - t0
+			ready = await _wait_for(
+				http, f"{args.base_url}/health/ready", t0, args.timeout
+			)
+		return {"live": live, "first request": first_request, "ready": ready}
+	finally:
+		server.send_signal(signal.SIGINT)
+		try:
+			server.wait(timeout=10)
+		except subprocess.TimeoutExpired:
+			server.kill()
+
+
+async def main(args) -> None:
+	print(f"{args.runs} runs per mode, first request: {args.tool}")
+	for preload in (True, False):
+		runs = [await _run(args, preload) for _ in range(args.runs)]
+		print(f"STARTUP_PRELOAD={str(preload).lower()}")
+		for step in runs[0]:
+			times = [run[step] for run in runs]
+			print(
+				f"    {step:<14} median {statistics.median(times):>6.2f}s  max {max(times):>6.2f}s"
+			)
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Benchmark MCP server startup")
+	parser.add_argument(
+		"--base-url",
+		default="http://localhost:8000",
+		help="Where the started server listens",
+	)
+	parser.add_argument(
+		"--tool",
+		default="search",
+		choices=["search", "list_datasets", "get_graph_schema"],
+	)
+	parser.add_argument("--runs", type=int, default=3)
+	parser.add_argument(
+		"--timeout", type=float, default=120.0, help="Seconds to wait for each step"
+	)
+	asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,134 @@
+"""
+Build an offline gazetteer file for geocode_location.
+
+Geocodes a list of UK place names (one per line) through Nominatim at its limit of one request
+per second and writes them, with their bounding boxes, to a tab-separated file that the server
+loads when GAZETTEER_PATH points at it. Places already in the output are skipped, so an
+interrupted run can be resumed. Results cached by the server can be added with --from-cache.
+
+	uv run scripts/build-gazetteer.py places.txt gazetteer.tsv
+	uv run scripts/build-gazetteer.py --from-cache .cache/geocodes.sqlite3 gazetteer.tsv
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from geopy.geocoders.nominatim import Nominatim
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "serka-mcp"))
+
+from geocoding import GAZETTEER_COLUMNS, Gazetteer  # noqa: E402
+
+_NOMINATIM_INTERVAL = 1.0
+
+
+def _known_places(path: Path) -> set[str]:
+	if not path.exists():
+		return set()
+	with open(path, newline="", encoding="utf-8") as f:
+		return {row["name"] for row in csv.DictReader(f, delimiter="\t")}
+
+
+def _open_output(path: Path):
+	exists = path.exists() and path.stat().st_size > 0
+	f = open(path, "a", newline="", encoding="utf-8")
+	writer = csv.DictWriter(f, fieldnames=GAZETTEER_COLUMNS, delimiter="\t")
+	if not exists:
+		writer.writeheader()
+	return f, writer
+
+
+def _from_nominatim(places: list[str], output: Path) -> int:
+	geolocator = Nominatim(user_agent="serka_gazetteer_builder")
+	known = _known_places(output)
+	todo = [place for place in places if place not in known]
+	written = 0
+	f, writer = _open_output(output)
+	with f:
+		for i, place in enumerate(todo, start=1):
+			t0 = time.monotonic()
+			result = geolocator.geocode(place, country_codes="GB")
+			if result is None or "boundingbox" not in result.raw:
+				print(f"  not found: {place}")
+			else:
+				south, north, west, east = (float(v) for v in result.raw["boundingbox"])
+				writer.writerow(
+					{
+						"name": place,
+						"display_name": result.raw["display_name"],
+						"south": south,
+						"north": north,
+						"west": west,
+						"east": east,
+						"importance": result.raw.get("importance", 0.0),
+					}
+				)
+				f.flush()
+				written += 1
+			print(f"\r  {i}/{len(todo)} places", end="", flush=True)
+			time.sleep(max(0.0, _NOMINATIM_INTERVAL - (time.monotonic() - t0)))
+	print()
+	return written
+
+
+def _from_cache(cache: Path, output: Path) -> int:
+	known = _known_places(output)
+	with sqlite3.connect(cache) as db:
+		rows = db.execute(
+			"SELECT query, name, south, north, west, east FROM geocodes"
+		).fetchall()
+	f, writer = _open_output(output)
+	written = 0
+	with f:
+		for query, name, south, north, west, east in rows:
+			if query not in known:
+				writer.writerow(
+					{
+						"name": query,
+						"display_name": name,
+						"south": south,
+						"north": north,
+						"west": west,
+						"east": east,
+					}
+				)
+				written += 1
+	return written
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Build an offline UK gazetteer for the MCP server"
+	)
+	parser.add_argument(
+		"places", type=Path, nargs="?", help="File of place names, one per line"
+	)
+	parser.add_argument("output", type=Path, help="Gazetteer file to write or extend")
+	parser.add_argument(
+		"--from-cache",
+		type=Path,
+		help="Add the places in a geocode cache database instead",
+	)
+	args = parser.parse_args()
+
+	if args.from_cache:
+		written = _from_cache(args.from_cache, args.output)
+	elif args.places:
+		places = [
+			line.strip()
+			for line in args.places.read_text(encoding="utf-8").splitlines()
+			if line.strip()
+		]
+		written = _from_nominatim(places, args.output)
+	else:
+		parser.error("give a file of place names or --from-cache")
+
+	t0 = time.perf_counter()
+	gazetteer = Gazetteer.from_file(args.output)
+	print(
+		f"Wrote {written} places; {args.output} now holds {len(gazetteer)}, loaded in {time.perf_counter() - t0:.2f}s"
+	)
@@ -0,0 +1,98 @@
+"""
+Measure MCP tool throughput as the number of concurrent clients grows.
+
+Start the server against a local Neo4j with ingested data first, then run e.g.
+	uv run scripts/load-test.py --clients 1 2 4 8 16 --duration 20
+Each client holds its own MCP session and calls the tool back to back; requests/s should
+rise with the client count until Neo4j, Bedrock or the reranker saturate.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastmcp import Client
+
+_TERMS = [
+	"soil moisture",
+	"river flow in the Thames",
+	"butterfly monitoring",
+	"land cover map",
+	"rainfall 2010",
+	"freshwater invertebrates",
+	"carbon flux measurements",
+	"bird population trends",
+]
+
+
+async def _client_loop(
+	url: str,
+	tool: str,
+	deadline: float,
+	offset: int,
+	latencies: list[float],
+	errors: list[str],
+):
+	async with Client(url) as client:
+		i = offset
+		while time.perf_counter() < deadline:
+			args = {"search_term": _TERMS[i % len(_TERMS)]} if tool == "search" else {}
+			t0 = time.perf_counter()
+			try:
+				await client.call_tool(tool, args)
+				latencies.append(time.perf_counter() - t0)
+			except Exception as e:
+				errors.append(str(e))
+			i += 1
+
+
+async def _run_level(url: str, tool: str, clients: int, duration: float) -> None:
+	latencies: list[float] = []
+	errors: list[str] = []
+	deadline = time.perf_counter() + duration
+	t0 = time.perf_counter()
+	await asyncio.gather(
+		*(
+			_client_loop(url, tool, deadline, n, latencies, errors)
+			for n in range(clients)
+		)
+	)
+	elapsed = time.perf_counter() - t0
+	p50 = statistics.median(latencies) * 1000 if latencies else 0.0
+	p95 = (
+		statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) >= 2 else p50
+	)
+	print(
+		f"{clients:>4} clients {len(latencies) / elapsed:>8.2f} req/s  "
+		f"p50 {p50:>7.0f}ms  p95 {p95:>7.0f}ms  errors {len(errors)}"
+	)
+
+
+async def main(args) -> None:
+	print(f"{args.tool} against {args.url}, {args.duration:.0f}s per level")
+	for clients in args.clients:
+		await _run_level(args.url, args.tool, clients, args.duration)
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Load test the Serka MCP server")
+	parser.add_argument(
+		"--url", default="http://localhost:8000/mcp/", help="MCP endpoint"
+	)
+	parser.add_argument(
+		"--tool",
+		default="search",
+		choices=["search", "list_datasets", "get_graph_schema"],
+	)
+	parser.add_argument(
+		"--clients",
+		type=int,
+		nargs="+",
+		default=[1, 2, 4, 8, 16],
+		help="Concurrency levels",
+	)
+	parser.add_argument(
+		"--duration", type=float, default=20.0, help="Seconds to run each level"
+	)
+	asyncio.run(main(parser.parse_args()))
@@ -1,15 +1,19 @@
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
+from pathlib import Path
+from typing import Optional
 
+from caches import QueryEmbeddingCache, RerankScoreCache
 from dotenv import load_dotenv
+from embedders import create_embedder
 from fastmcp import FastMCP
+from geocoding import GeocodeCache, Gazetteer
 from geopy.geocoders.nominatim import Nominatim
-from haystack_integrations.components.embedders.amazon_bedrock import (
-	AmazonBedrockTextEmbedder,
-)
-from neo4j import Driver, GraphDatabase
-from sentence_transformers import CrossEncoder
+from neo4j import AsyncDriver, AsyncGraphDatabase
+from rerankers import DEFAULT_RERANKER_MODEL, create_reranker
+from resources import LazyResource
 
 load_dotenv()
 
@@ -24,23 +28,145 @@ logging.basicConfig(
 logger: Logger = logging.getLogger("serka_mcp")
 
 mcp: FastMCP = FastMCP("Serka")
-geolocator: Nominatim = Nominatim(user_agent="serka_geocoder")
+geolocator: LazyResource[Nominatim] = LazyResource(
+	"geolocator", lambda: Nominatim(user_agent="serka_geocoder")
+)
+# Place names are looked up in the offline gazetteer first, if one is configured, then in the
+# persistent cache of earlier Nominatim results, and only then sent to Nominatim
+geocode_cache: Optional[GeocodeCache] = (
+	GeocodeCache(
+		Path(os.getenv("GEOCODE_CACHE_PATH", ".cache/geocodes.sqlite3")),
+		ttl=float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 86400))),
+		missing_ttl=float(os.getenv("GEOCODE_CACHE_MISSING_TTL", "86400")),
+	)
+	if os.getenv("GEOCODE_CACHE", "true").lower() == "true"
+	else None
+)
+gazetteer: Optional[LazyResource[Gazetteer]] = (
+	LazyResource(
+		"gazetteer", lambda: Gazetteer.from_file(Path(os.environ["GAZETTEER_PATH"]))
+	)
+	if os.getenv("GAZETTEER_PATH")
+	else None
+)
 
 
 def create_neo4j_driver(
 	uri: str,
 	user: str,
 	password: str,
-) -> Driver:
-	return GraphDatabase.driver(uri, auth=(user, password))
+	max_pool_size: int = 100,
+	acquisition_timeout: float = 60.0,
+	max_connection_lifetime: float = 3600.0,
+) -> AsyncDriver:
+	"""Create the driver shared by all tools.
 
+	Args:
+	    uri (str): Bolt URI of the Neo4j server.
+	    user (str): Neo4j username.
+	    password (str): Neo4j password.
+	    max_pool_size (int): Maximum connections held open; a search uses up to two at once.
+	    acquisition_timeout (float): Seconds a query waits for a free connection before failing.
+	    max_connection_lifetime (float): Seconds after which idle connections are replaced, kept
+	        below any load balancer or firewall idle timeout.
+	"""
+	return AsyncGraphDatabase.driver(
+		uri,
+		auth=(user, password),
+		max_connection_pool_size=max_pool_size,
+		connection_acquisition_timeout=acquisition_timeout,
+		max_connection_lifetime=max_connection_lifetime,
+	)
 
-neo4j_driver: Driver = create_neo4j_driver(
+
+neo4j_driver: AsyncDriver = create_neo4j_driver(
 	f"bolt://{os.getenv('NEO4J_HOST')}:{os.getenv('NEO4J_PORT')}",
 	f"{os.getenv('NEO4J_USERNAME')}",
 	f"{os.getenv('NEO4J_PASSWORD')}",
+	max_pool_size=int(os.getenv("NEO4J_MAX_POOL_SIZE", "100")),
+	acquisition_timeout=float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60")),
+	max_connection_lifetime=float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600")),
+)
+# Connections opened and tool queries run once at startup; 0 connections skips the warm-up
+neo4j_warmup_connections = min(
+	int(os.getenv("NEO4J_WARMUP_CONNECTIONS", "8")),
+	int(os.getenv("NEO4J_MAX_POOL_SIZE", "100")),
+)
+
+embedding_dimensions = (
+	int(os.getenv("MODELS_EMBEDDING_DIMENSIONS"))
+	if os.getenv("MODELS_EMBEDDING_DIMENSIONS")
+	else None
 )
 
-embedder = AmazonBedrockTextEmbedder(model=f"{os.getenv('MODELS_EMBEDDING')}")
-reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2", backend="onnx")
+embedder = LazyResource(
+	"embedder",
+	lambda: create_embedder(f"{os.getenv('MODELS_EMBEDDING')}", embedding_dimensions),
+)
+query_embeddings = QueryEmbeddingCache(
+	lambda text: embedder.get().run(text)["embedding"],
+	model=f"{os.getenv('MODELS_EMBEDDING')}",
+	dimensions=embedding_dimensions,
+	maxsize=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024")),
+	ttl=float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "3600")),
+	disk=os.getenv("QUERY_EMBEDDING_CACHE_DISK", "false").lower() == "true",
+)
+reranker = LazyResource(
+	"reranker",
+	lambda: create_reranker(
+		model=os.getenv("RERANKER_MODEL", DEFAULT_RERANKER_MODEL),
+		precision=os.getenv("RERANKER_PRECISION", "fp32"),
+		onnx_file=os.getenv("RERANKER_ONNX_FILE") or None,
+		intra_op_threads=int(os.getenv("RERANKER_INTRA_OP_THREADS", "0")),
+		inter_op_threads=int(os.getenv("RERANKER_INTER_OP_THREADS", "0")),
+		max_length=int(os.getenv("RERANKER_MAX_LENGTH"))
+		if os.getenv("RERANKER_MAX_LENGTH")
+		else None,
+	),
+)
+# Candidates kept from each of the vector and full-text searches, as a multiple of result_limit;
+# typed searches filter by label inside the index, so they need fewer
+search_candidate_factor = float(os.getenv("SEARCH_CANDIDATE_FACTOR", "4"))
+search_typed_candidate_factor = float(os.getenv("SEARCH_TYPED_CANDIDATE_FACTOR", "2"))
+# Index neighbours requested per kept candidate, the ef-style breadth of the search; raise it when
+# bounding-box or date filters leave too few candidates
+search_index_oversample = float(os.getenv("SEARCH_INDEX_OVERSAMPLE", "1"))
+# How vector and full-text candidates are merged, see fusion.fuse; the search tool can override the method
+search_fusion = os.getenv("SEARCH_FUSION", "rrf")
+search_fusion_weights = (
+	float(os.getenv("SEARCH_FUSION_VECTOR_WEIGHT", "1")),
+	float(os.getenv("SEARCH_FUSION_TEXT_WEIGHT", "1")),
+)
+search_fusion_rrf_k = int(os.getenv("SEARCH_FUSION_RRF_K", "60"))
 reranking_enabled = os.getenv("RERANKING_ENABLED", "true").lower() == "true"
+# Reranking budget: only the top fused candidates are cross-encoded, passages are cut to a number of
+# whitespace tokens, and scoring stops once the time budget is spent; the rest keep their fused order
+rerank_max_pairs = int(os.getenv("RERANK_MAX_PAIRS", "64"))
+rerank_max_tokens = int(os.getenv("RERANK_MAX_TOKENS", "128"))
+rerank_time_budget_ms = float(os.getenv("RERANK_TIME_BUDGET_MS", "500"))
+rerank_batch_size = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+rerank_scores = RerankScoreCache(
+	maxsize=int(os.getenv("RERANK_CACHE_SIZE", "50000")),
+	generation_interval=float(os.getenv("RERANK_CACHE_GENERATION_INTERVAL", "30")),
+)
+# Bounding-box searches score only the neighbours of datasets inside the box ("prefilter") when the
+# extent point indexes select at most SPATIAL_PREFILTER_MAX_DATASETS of them, and otherwise filter the
+# vector index's top candidates ("postfilter"); "auto" picks per query
+spatial_search_mode = os.getenv("SPATIAL_SEARCH_MODE", "auto").lower()
+spatial_prefilter_max_datasets = int(
+	os.getenv("SPATIAL_PREFILTER_MAX_DATASETS", "5000")
+)
+# Models and the Neo4j warm-up are loaded in the background once the server is up, see main.prepare;
+# without preloading each model is built by the first request that needs it
+startup_preload = os.getenv("STARTUP_PRELOAD", "true").lower() == "true"
+neo4j_status: dict = {"ready": False, "load_ms": None, "error": None}
+preloaded_resources: list[LazyResource] = (
+	[embedder, geolocator]
+	+ ([reranker] if reranking_enabled else [])
+	+ ([gazetteer] if gazetteer else [])
+)
+# Cross-encoder inference is CPU bound and multi-threaded inside ONNX Runtime, so it gets its own
+# small executor rather than competing with blocking I/O in the event loop's default one
+rerank_executor = ThreadPoolExecutor(
+	max_workers=int(os.getenv("RERANK_WORKERS", "1")), thread_name_prefix="rerank"
+)
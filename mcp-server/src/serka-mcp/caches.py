@@ -0,0 +1,189 @@
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+
+def normalise_query(text: str) -> str:
+	"""Case-fold and collapse whitespace so trivially different queries share a cache entry."""
+	return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class TTLCache:
+	"""Thread-safe LRU cache whose entries also expire after a fixed time to live.
+
+	Args:
+	    maxsize (int): Maximum number of entries; the least recently used is evicted first.
+	    ttl (float): Seconds an entry stays valid after it is stored. 0 disables expiry.
+	"""
+
+	def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self.hits = 0
+		self.misses = 0
+		self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get(self, key: Hashable) -> Optional[Any]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if (
+				entry is not None
+				and self.ttl
+				and time.monotonic() - entry[0] > self.ttl
+			):
+				del self._entries[key]
+				entry = None
+			if entry is None:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return entry[1]
+
+	def put(self, key: Hashable, value: Any) -> None:
+		if self.maxsize <= 0:
+			return
+		with self._lock:
+			self._entries[key] = (time.monotonic(), value)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+	def stats(self) -> dict:
+		lookups = self.hits + self.misses
+		return {
+			"size": len(self._entries),
+			"maxsize": self.maxsize,
+			"ttl": self.ttl,
+			"hits": self.hits,
+			"misses": self.misses,
+			"hit_rate": self.hits / lookups if lookups else 0.0,
+		}
+
+
+class QueryEmbeddingCache:
+	"""Caches search term embeddings keyed on the normalised term and the embedding model.
+
+	Lookups go to an in-process TTLCache keyed on the normalised term first and, when disk is
+	enabled, to the packed on-disk embedding store shared with ingest.
+
+	Args:
+	    embed (Callable[[str], List[float]]): Embeds a search term on a cache miss.
+	    model (str): Embedding model id, part of every key so a model change never serves stale vectors.
+	    dimensions (Optional[int]): Requested output dimension of the model.
+	    maxsize (int): Maximum number of in-process entries.
+	    ttl (float): Seconds an in-process entry stays valid.
+	    disk (bool): Also read and write the on-disk store.
+	"""
+
+	def __init__(
+		self,
+		embed: Callable[[str], List[float]],
+		model: str,
+		dimensions: Optional[int] = None,
+		maxsize: int = 1024,
+		ttl: float = 3600.0,
+		disk: bool = False,
+	):
+		self.embed = embed
+		self.model = model
+		self.dimensions = dimensions
+		self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+		self.disk_hits = 0
+		self.disk = disk
+		self._disk_store = None
+		if disk:
+			# Imported here rather than at module level: importing serka configures logging, which
+			# must not run before the server has set up its own
+			from serka import cache as disk_store
+
+			self._disk_store = disk_store
+
+	def lookup(self, search_term: str) -> tuple[List[float], str]:
+		"""Return the embedding of a search term and where it came from: "memory", "disk" or "model"."""
+		term = normalise_query(search_term)
+		key = (self.model, self.dimensions, term)
+		embedding = self.memory.get(key)
+		if embedding is not None:
+			return embedding, "memory"
+		source = "model"
+		# The disk store maps text to the embedding of exactly that text, so it is keyed on the raw term
+		if self.disk:
+			embedding = self._disk_store.get_embedding(
+				search_term, model=self.model, dimensions=self.dimensions
+			)
+			if embedding is not None:
+				self.disk_hits += 1
+				source = "disk"
+		if embedding is None:
+			embedding = self.embed(search_term)
+			if self.disk:
+				self._disk_store.save_embedding(
+					search_term, embedding, model=self.model, dimensions=self.dimensions
+				)
+		self.memory.put(key, embedding)
+		return embedding, source
+
+	def get(self, search_term: str) -> List[float]:
+		return self.lookup(search_term)[0]
+
+	def stats(self) -> dict:
+		return {**self.memory.stats(), "disk": self.disk, "disk_hits": self.disk_hits}
+
+
+def text_key(text: str) -> str:
+	"""Compact key for passages that have no id of their own."""
+	return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class RerankScoreCache:
+	"""Caches cross-encoder scores keyed on the normalised query and a passage key, the chunk
+	doc_id for text chunks or text_key() of the passage otherwise.
+
+	Passages only change when the graph is re-ingested, so entries never expire on their own;
+	instead the whole cache is dropped when the ingest generation recorded in Neo4j changes.
+
+	Args:
+	    maxsize (int): Maximum number of (query, passage) scores kept.
+	    generation_interval (float): Seconds between checks of the ingest generation.
+	"""
+
+	def __init__(self, maxsize: int = 50000, generation_interval: float = 30.0):
+		self.scores = TTLCache(maxsize=maxsize, ttl=0)
+		self.generation_interval = generation_interval
+		self.generation: Optional[int] = None
+		self._checked_at = float("-inf")
+
+	def generation_due(self) -> bool:
+		return time.monotonic() - self._checked_at >= self.generation_interval
+
+	def set_generation(self, generation: Optional[int]) -> None:
+		self._checked_at = time.monotonic()
+		if generation != self.generation:
+			self.scores.clear()
+			self.generation = generation
+
+	def get_many(self, query: str, passage_keys: List[str]) -> List[Optional[float]]:
+		query = normalise_query(query)
+		return [self.scores.get((query, key)) for key in passage_keys]
+
+	def put_many(
+		self, query: str, passage_keys: List[str], scores: List[float]
+	) -> None:
+		query = normalise_query(query)
+		for key, score in zip(passage_keys, scores):
+			self.scores.put((query, key), score)
+
+	def stats(self) -> dict:
+		return {**self.scores.stats(), "generation": self.generation}
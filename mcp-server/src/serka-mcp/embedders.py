@@ -0,0 +1,25 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+	from haystack_integrations.components.embedders.amazon_bedrock import (
+		AmazonBedrockTextEmbedder,
+	)
+
+
+def create_embedder(
+	model: str, dimensions: Optional[int] = None
+) -> "AmazonBedrockTextEmbedder":
+	"""Build the Bedrock embedder for search terms, configured as ingest's embedders are.
+
+	Args:
+	    model (str): Bedrock embedding model id.
+	    dimensions (Optional[int]): Output dimension requested from Titan models, None for the model's default.
+	"""
+	# Imported here rather than at module level: Haystack takes a second or more to import, and
+	# importing serka configures logging, which must not run before the server has set up its own
+	from haystack_integrations.components.embedders.amazon_bedrock import (
+		AmazonBedrockTextEmbedder,
+	)
+	from serka.graph.embedders import with_dimensions
+
+	return with_dimensions(AmazonBedrockTextEmbedder(model=model), dimensions)
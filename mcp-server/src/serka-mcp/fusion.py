@@ -0,0 +1,91 @@
+from typing import Hashable, List, Literal, Optional, Sequence, Tuple, get_args
+
+import numpy as np
+
+FusionMethod = Literal["rrf", "weighted_rrf", "minmax", "zscore"]
+FUSION_METHODS: Tuple[str, ...] = get_args(FusionMethod)
+
+
+def _candidate_matrices(
+	keys: Sequence[Sequence[Hashable]], scores: Sequence[Sequence[float]]
+) -> Tuple[List[Hashable], np.ndarray, np.ndarray]:
+	"""Align ranked lists on the union of their keys.
+
+	Returns the keys in first-seen order and (lists × keys) arrays of 1-based ranks and raw scores,
+	NaN where a list does not contain the key. A key repeated within a list keeps its first position.
+	"""
+	index: dict[Hashable, int] = {}
+	for ranked in keys:
+		for key in ranked:
+			index.setdefault(key, len(index))
+	ranks = np.full((len(keys), len(index)), np.nan)
+	raw = np.full((len(keys), len(index)), np.nan)
+	for i, (ranked, list_scores) in enumerate(zip(keys, scores)):
+		columns = np.fromiter(
+			(index[key] for key in ranked), dtype=np.intp, count=len(ranked)
+		)
+		columns, first = np.unique(columns, return_index=True)
+		ranks[i, columns] = first + 1
+		raw[i, columns] = np.asarray(list_scores, dtype=float)[first]
+	return list(index), ranks, raw
+
+
+def _normalise(raw: np.ndarray, method: str) -> np.ndarray:
+	# Each list is scaled on its own, so cosine similarities and BM25 scores become comparable;
+	# keys missing from a list get that list's lowest normalised score
+	with np.errstate(invalid="ignore", divide="ignore"):
+		if method == "minmax":
+			low = np.nanmin(raw, axis=1, keepdims=True)
+			spread = np.nanmax(raw, axis=1, keepdims=True) - low
+			normalised = np.where(spread > 0, (raw - low) / spread, 1.0)
+		else:
+			spread = np.nanstd(raw, axis=1, keepdims=True)
+			normalised = np.where(
+				spread > 0, (raw - np.nanmean(raw, axis=1, keepdims=True)) / spread, 0.0
+			)
+	floor = np.nanmin(
+		np.where(np.isnan(raw), np.nan, normalised), axis=1, keepdims=True
+	)
+	return np.where(np.isnan(raw), floor, normalised)
+
+
+def fuse(
+	keys: Sequence[Sequence[Hashable]],
+	scores: Sequence[Sequence[float]],
+	method: FusionMethod = "rrf",
+	weights: Optional[Sequence[float]] = None,
+	k: int = 60,
+) -> List[Tuple[Hashable, float]]:
+	"""Fuse ranked candidate lists into one ranking.
+
+	Args:
+	    keys (Sequence[Sequence[Hashable]]): Candidate keys of each list, best first.
+	    scores (Sequence[Sequence[float]]): Raw scores of each list, aligned with keys.
+	    method (FusionMethod): "rrf" sums 1 / (k + rank) over lists; "weighted_rrf" weights each
+	        list's term; "minmax" and "zscore" sum the weighted raw scores after normalising each list.
+	    weights (Optional[Sequence[float]]): Weight per list, 1 each by default. Ignored by "rrf".
+	    k (int): Rank offset of (weighted) RRF; larger values flatten the contribution of top ranks.
+
+	Returns:
+	    List[Tuple[Hashable, float]]: Keys with their fused score, best first; ties keep first-seen order.
+	"""
+	if method not in FUSION_METHODS:
+		raise ValueError(f"Unknown fusion method: {method!r}")
+	non_empty = [i for i, ranked in enumerate(keys) if len(ranked)]
+	if not non_empty:
+		return []
+	keys = [keys[i] for i in non_empty]
+	scores = [scores[i] for i in non_empty]
+	w = (
+		np.ones(len(keys))
+		if weights is None or method == "rrf"
+		else np.asarray(weights, dtype=float)[non_empty]
+	)
+
+	union, ranks, raw = _candidate_matrices(keys, scores)
+	if method in ("rrf", "weighted_rrf"):
+		fused = w @ np.nan_to_num(1.0 / (k + ranks), nan=0.0)
+	else:
+		fused = w @ _normalise(raw, method)
+	order = np.argsort(-fused, kind="stable")
+	return [(union[i], float(fused[i])) for i in order]
@@ -0,0 +1,248 @@
+import bisect
+import csv
+import heapq
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from caches import normalise_query
+from models import BoundingBox, GeoCodedLocation
+
+# Columns of a gazetteer file, tab separated with a header row; importance is optional
+GAZETTEER_COLUMNS = [
+	"name",
+	"display_name",
+	"south",
+	"north",
+	"west",
+	"east",
+	"importance",
+]
+
+
+class GeocodeCache:
+	"""Persistent cache of geocoding results keyed on the normalised place name, in SQLite.
+
+	Places Nominatim could not find are remembered too, for a shorter time, so repeated lookups of
+	a misspelt or unknown name do not each wait on the rate-limited service.
+
+	Args:
+	    path (Path): Database file, created with its parent directory if missing.
+	    ttl (float): Seconds a result stays valid. 0 keeps results forever.
+	    missing_ttl (float): Seconds a place stays known as not found. 0 keeps it forever.
+	"""
+
+	def __init__(
+		self, path: Path, ttl: float = 30 * 86400.0, missing_ttl: float = 86400.0
+	):
+		path.parent.mkdir(parents=True, exist_ok=True)
+		self.path = path
+		self.ttl = ttl
+		self.missing_ttl = missing_ttl
+		self.hits = 0
+		self.misses = 0
+		self.missing_hits = 0
+		self._lock = threading.Lock()
+		self._db = sqlite3.connect(path, check_same_thread=False)
+		self._db.execute(
+			"CREATE TABLE IF NOT EXISTS geocodes (query TEXT PRIMARY KEY, name TEXT NOT NULL, "
+			"south REAL NOT NULL, north REAL NOT NULL, west REAL NOT NULL, east REAL NOT NULL, stored_at REAL NOT NULL)"
+		)
+		self._db.execute(
+			"CREATE TABLE IF NOT EXISTS missing (query TEXT PRIMARY KEY, stored_at REAL NOT NULL)"
+		)
+		self._db.commit()
+
+	def get(self, place: str) -> Optional[GeoCodedLocation]:
+		with self._lock:
+			row = self._db.execute(
+				"SELECT name, south, north, west, east, stored_at FROM geocodes WHERE query = ?",
+				(normalise_query(place),),
+			).fetchone()
+			if row is None or (self.ttl and time.time() - row[5] > self.ttl):
+				self.misses += 1
+				return None
+			self.hits += 1
+		name, south, north, west, east, _ = row
+		return GeoCodedLocation(
+			name=name,
+			boundary=BoundingBox(south=south, north=north, west=west, east=east),
+		)
+
+	def known_missing(self, place: str) -> bool:
+		"""Whether Nominatim recently found nothing for the place."""
+		with self._lock:
+			row = self._db.execute(
+				"SELECT stored_at FROM missing WHERE query = ?",
+				(normalise_query(place),),
+			).fetchone()
+			if row is None or (
+				self.missing_ttl and time.time() - row[0] > self.missing_ttl
+			):
+				return False
+			self.missing_hits += 1
+		return True
+
+	def put(self, place: str, location: GeoCodedLocation) -> None:
+		bb = location.boundary
+		key = normalise_query(place)
+		with self._lock:
+			self._db.execute(
+				"INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?, ?, ?)",
+				(key, location.name, bb.south, bb.north, bb.west, bb.east, time.time()),
+			)
+			self._db.execute("DELETE FROM missing WHERE query = ?", (key,))
+			self._db.commit()
+
+	def put_missing(self, place: str) -> None:
+		with self._lock:
+			self._db.execute(
+				"INSERT OR REPLACE INTO missing VALUES (?, ?)",
+				(normalise_query(place), time.time()),
+			)
+			self._db.commit()
+
+	def stats(self) -> dict:
+		with self._lock:
+			size = self._db.execute("SELECT count(*) FROM geocodes").fetchone()[0]
+			missing = self._db.execute("SELECT count(*) FROM missing").fetchone()[0]
+		lookups = self.hits + self.misses
+		return {
+			"size": size,
+			"missing": missing,
+			"ttl": self.ttl,
+			"missing_ttl": self.missing_ttl,
+			"hits": self.hits,
+			"misses": self.misses,
+			"missing_hits": self.missing_hits,
+			"hit_rate": self.hits / lookups if lookups else 0.0,
+		}
+
+
+def _trigrams(text: str) -> set[str]:
+	padded = f"  {text} "
+	return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+	"""In-memory index of place names with bounding boxes, for geocoding without a network call.
+
+	A place is looked up by its normalised name exactly, then as a prefix of a longer name, then
+	fuzzily through a trigram index to tolerate misspellings. A prefix or fuzzy match is only
+	returned when it is the sole candidate and close to the whole name, so "Edinburg" finds
+	Edinburgh but "Kent" never resolves to Kentish Town; anything less certain is a miss, left
+	to Nominatim.
+
+	Args:
+	    entries (Iterable[Tuple[str, GeoCodedLocation, float]]): (place name, location, importance).
+	    min_prefix (int): Shortest query matched as a prefix, so "ca" never resolves to one town.
+	    min_similarity (float): Minimum difflib similarity ratio between the query and the name of
+	        a prefix or fuzzy match.
+	    max_postings (int): Trigrams shared by more names than this are left out of the fuzzy
+	        search, which bounds its cost however large the gazetteer.
+	"""
+
+	def __init__(
+		self,
+		entries: Iterable[Tuple[str, GeoCodedLocation, float]],
+		min_prefix: int = 4,
+		min_similarity: float = 0.9,
+		max_postings: int = 1000,
+	):
+		self.min_prefix = min_prefix
+		self.min_similarity = min_similarity
+		self.max_postings = max_postings
+		self.hits = 0
+		self.misses = 0
+		best: dict[str, Tuple[float, GeoCodedLocation]] = {}
+		for name, location, importance in entries:
+			key = normalise_query(name)
+			if key and (key not in best or importance > best[key][0]):
+				best[key] = (importance, location)
+		self._places = best
+		self._names: List[str] = sorted(best)
+		self._trigrams: dict[str, List[str]] = defaultdict(list)
+		for key in self._names:
+			for gram in _trigrams(key):
+				self._trigrams[gram].append(key)
+
+	def __len__(self) -> int:
+		return len(self._names)
+
+	@classmethod
+	def from_file(cls, path: Path, **kwargs) -> "Gazetteer":
+		"""Load a tab-separated file with the GAZETTEER_COLUMNS header."""
+		with open(path, newline="", encoding="utf-8") as f:
+			entries = [
+				(
+					row["name"],
+					GeoCodedLocation(
+						name=row.get("display_name") or row["name"],
+						boundary=BoundingBox(
+							south=float(row["south"]),
+							north=float(row["north"]),
+							west=float(row["west"]),
+							east=float(row["east"]),
+						),
+					),
+					float(row.get("importance") or 0.0),
+				)
+				for row in csv.DictReader(f, delimiter="\t")
+			]
+		return cls(entries, **kwargs)
+
+	def _similar(self, key: str, name: str) -> bool:
+		return SequenceMatcher(None, key, name).ratio() >= self.min_similarity
+
+	def _prefix(self, key: str) -> Optional[str]:
+		if len(key) < self.min_prefix:
+			return None
+		start = bisect.bisect_left(self._names, key)
+		end = bisect.bisect_left(
+			self._names, key + "\uffff", lo=start, hi=min(start + 2, len(self._names))
+		)
+		if end - start != 1:
+			return None
+		return self._names[start] if self._similar(key, self._names[start]) else None
+
+	def _fuzzy(self, key: str, candidates: int = 20) -> Optional[str]:
+		shared: dict[str, int] = defaultdict(int)
+		for gram in _trigrams(key):
+			names = self._trigrams.get(gram, ())
+			if len(names) <= self.max_postings:
+				for name in names:
+					shared[name] += 1
+		close = [
+			name
+			for name in heapq.nlargest(candidates, shared, key=shared.get)
+			if self._similar(key, name)
+		]
+		return close[0] if len(close) == 1 else None
+
+	def lookup(self, place: str) -> Optional[Tuple[GeoCodedLocation, str]]:
+		"""Return the location of a place and how it matched ("exact", "prefix" or "fuzzy"), or None."""
+		key = normalise_query(place)
+		if key in self._places:
+			match, kind = key, "exact"
+		elif (match := self._prefix(key)) is not None:
+			kind = "prefix"
+		elif (match := self._fuzzy(key)) is not None:
+			kind = "fuzzy"
+		else:
+			self.misses += 1
+			return None
+		self.hits += 1
+		return self._places[match][1], kind
+
+	def stats(self) -> dict:
+		lookups = self.hits + self.misses
+		return {
+			"places": len(self._names),
+			"hits": self.hits,
+			"misses": self.misses,
+			"hit_rate": self.hits / lookups if lookups else 0.0,
+		}
@@ -1,9 +1,70 @@
+import asyncio
+import time
+
 import prompts  # noqa: F401 — registers prompts with mcp
+import routes  # noqa: F401 — registers HTTP routes with mcp
 import tools  # noqa: F401 — registers tools with mcp
-from app import logger, mcp, neo4j_driver
+from app import (
+	logger,
+	mcp,
+	neo4j_driver,
+	neo4j_status,
+	neo4j_warmup_connections,
+	preloaded_resources,
+	rerank_executor,
+	startup_preload,
+)
+from resources import LazyResource
+from warmup import warm_up
+
+
+async def _load(resource: LazyResource) -> None:
+	try:
+		await asyncio.to_thread(resource.get)
+		logger.info(f"Loaded {resource.name} in {resource.load_ms:.0f}ms")
+	except Exception as e:
+		logger.error(f"Loading {resource.name} failed, retrying on first use: {e}")
+
+
+async def _warm_neo4j() -> None:
+	t0 = time.perf_counter()
+	try:
+		if neo4j_warmup_connections > 0:
+			await warm_up(neo4j_driver, neo4j_warmup_connections, logger)
+		else:
+			await neo4j_driver.verify_connectivity()
+		neo4j_status.update(ready=True, error=None)
+	except Exception as e:
+		# The server still serves; the first requests just pay the setup cost
+		neo4j_status["error"] = str(e)
+		logger.warning(f"Neo4j warm-up failed: {e}")
+	neo4j_status["load_ms"] = (time.perf_counter() - t0) * 1000
+
+
+async def prepare() -> None:
+	"""Load the models and warm up Neo4j concurrently while the server already accepts connections."""
+	t0 = time.perf_counter()
+	await asyncio.gather(
+		_warm_neo4j(), *(_load(resource) for resource in preloaded_resources)
+	)
+	logger.info(
+		f"Startup preload finished in {(time.perf_counter() - t0) * 1000:.0f}ms"
+	)
+
+
+async def serve() -> None:
+	preload = asyncio.create_task(prepare()) if startup_preload else None
+	try:
+		await mcp.run_async(transport="http", host="0.0.0.0", port=8000)
+	finally:
+		if preload is not None:
+			preload.cancel()
+		# The async driver must be closed on the event loop its connections belong to
+		await neo4j_driver.close()
+		rerank_executor.shutdown(wait=False)
+
 
 if __name__ == "__main__":
 	logger.info("Starting MCP server...")
-	mcp.run(transport="http", host="0.0.0.0", port=8000)
-	neo4j_driver.close()
+	asyncio.run(serve())
 	logger.info("Stopping MCP server")
@@ -20,6 +20,10 @@ class Organisation(BaseModel):
 class TextChunk(BaseModel):
 	"""Represents a searchable chunk of text."""
 
+	doc_id: Optional[str] = Field(
+		None,
+		description="Stable identifier of the chunk, unchanged until the chunk's content changes.",
+	)
 	content: str = Field(description="The textual content of the chunk of text.")
 
 
@@ -105,6 +109,15 @@ class ResultItem(BaseModel):
 	)
 
 
+class ConnectedDataset(BaseModel):
+	"""A dataset connected to a search result, with the relationship linking them."""
+
+	dataset: Dataset = Field(description="The connected dataset.")
+	relationship: str = Field(
+		description="The type of relationship between the result item and the dataset, e.g. AUTHORED_BY."
+	)
+
+
 class SearchResult(BaseModel):
 	"""Represents results of performing a semantic search on the Serka knowledge graph."""
 
@@ -120,6 +133,14 @@ class SearchResult(BaseModel):
 	description: str | None = Field(
 		description="Description of the contents relationship to the dataset. Could be a description, metadata, or some other kind of supporting documentation."
 	)
+	other_datasets: List[ConnectedDataset] = Field(
+		default_factory=list,
+		description="Further datasets connected to the result item, most cited first. Bounded, so may be fewer than dataset_count - 1.",
+	)
+	dataset_count: int = Field(
+		1,
+		description="Total number of datasets connected to the result item that match the search filters.",
+	)
 
 
 class SupportingDocument(BaseModel):
@@ -1,5 +1,5 @@
 import re
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Tuple
 
 from models import BoundingBox
 
@@ -7,13 +7,22 @@ _LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
 
 _ALLOWED_NODE_TYPES = {"Dataset", "Person", "Organisation", "TextChunk"}
 _ALLOWED_SORT_FIELDS = {"citations", "publication_date"}
+# Per-label vector/fulltext indexes are named vec_<suffix> and ft_<suffix> by the graph writer
+_LABEL_INDEX_SUFFIX = {
+	"TextChunk": "textchunk",
+	"Person": "person",
+	"Organisation": "organisation",
+}
+# Text chunks have no vector index of their own: they make up most of vec_lookup, so a chunk
+# search queries it and filters by label
+_SHARED_VECTOR_INDEX_LABELS = {"TextChunk"}
 
 
 def escape_fts_query(query: str) -> str:
 	return _LUCENE_SPECIAL.sub(r"\\\1", query)
 
 
-def list_query(
+async def list_query(
 	tx,
 	type: str = "Dataset",
 	limit: int = 25,
@@ -25,37 +34,112 @@ def list_query(
 	if sort_by not in _ALLOWED_SORT_FIELDS:
 		raise ValueError(f"Invalid sort field: {sort_by!r}")
 	cypher_order = "ASC" if order == "ascending" else "DESC"
-	query = f"MATCH (n:{type}) RETURN apoc.map.removeKey(properties(n), 'embedding') AS dataset ORDER BY n.{sort_by} {cypher_order} LIMIT {limit}"
-	return tx.run(query).data()
+	query = f"MATCH (n:{type}) RETURN apoc.map.removeKey(properties(n), 'embedding') AS dataset ORDER BY n.{sort_by} {cypher_order} LIMIT $limit"
+	result = await tx.run(query, limit=limit)
+	return await result.data()
 
 
-def dataset_cypher_query(tx, uri: str):
-	return tx.run("MATCH (d:Dataset {uri: $uri}) RETURN d", uri=uri).single()
+async def dataset_cypher_query(tx, uri: str):
+	result = await tx.run("MATCH (d:Dataset {uri: $uri}) RETURN d", uri=uri)
+	return await result.single()
 
 
-def search_query(
-	tx,
-	embedding: List[float],
-	limit: int = 10,
-	bounding_box: Optional[BoundingBox] = None,
-	published_after: Optional[str] = None,
-	published_before: Optional[str] = None,
-	min_citations: Optional[int] = None,
-):
-	params: dict = {"embedding": embedding, "limit": limit}
-	conditions: List[str] = []
+async def dataset_documents_query(tx, uri: str):
+	result = await tx.run(
+		"MATCH (d:Dataset {uri: $uri})-[r]-(t:TextChunk) "
+		"RETURN coalesce(t.filename, type(r)) AS filename, t.content AS content",
+		uri=uri,
+	)
+	return await result.data()
+
 
+async def datasets_by_author_query(tx, uri: str):
+	result = await tx.run(
+		"MATCH (p:Person {uri: $uri})-[]-(d:Dataset) "
+		"RETURN DISTINCT apoc.map.removeKey(properties(d), 'embedding') AS dataset",
+		uri=uri,
+	)
+	return await result.data()
+
+
+async def related_datasets_query(tx, uri: str):
+	result = await tx.run(
+		"MATCH (d:Dataset {uri: $uri})-[]-(mid)-[]-(related:Dataset) "
+		"WHERE related.uri <> $uri "
+		"RETURN DISTINCT apoc.map.removeKey(properties(related), 'embedding') AS dataset",
+		uri=uri,
+	)
+	return await result.data()
+
+
+async def graph_schema_query(tx):
+	labels = await (await tx.run("CALL db.labels() YIELD label")).data()
+	rel_types = await (
+		await tx.run("CALL db.relationshipTypes() YIELD relationshipType")
+	).data()
+	prop_keys = await (await tx.run("CALL db.propertyKeys() YIELD propertyKey")).data()
+	return {
+		"node_labels": [r["label"] for r in labels],
+		"relationship_types": [r["relationshipType"] for r in rel_types],
+		"property_keys": [r["propertyKey"] for r in prop_keys],
+	}
+
+
+async def sample_embedding_query(tx) -> Optional[List[float]]:
+	result = await tx.run(
+		"MATCH (n:embedded) WHERE n.embedding IS NOT NULL RETURN n.embedding AS embedding LIMIT 1"
+	)
+	record = await result.single()
+	return record["embedding"] if record else None
+
+
+async def ingest_generation_query(tx) -> Optional[int]:
+	result = await tx.run(
+		"MATCH (s:IngestState {id: 'serka'}) RETURN s.generation AS generation"
+	)
+	record = await result.single()
+	return record["generation"] if record else None
+
+
+# A dataset extent intersects the box when its south-west corner lies below and left of the box's
+# north-east corner and its north-east corner lies above and right of the box's south-west corner;
+# both are range lookups on the point indexes over extent_sw / extent_ne
+_EXTENT_INTERSECTS = [
+	"point.withinBBox(connected_node.extent_sw, point({latitude: -90.0, longitude: -180.0}), "
+	"point({latitude: $north, longitude: $east}))",
+	"point.withinBBox(connected_node.extent_ne, point({latitude: $south, longitude: $west}), "
+	"point({latitude: 90.0, longitude: 180.0}))",
+]
+
+
+def _dataset_filters(
+	bounding_box: Optional[BoundingBox],
+	published_after: Optional[str],
+	published_before: Optional[str],
+	min_citations: Optional[int],
+	spatial_index: bool = False,
+) -> Tuple[List[str], dict]:
+	conditions: List[str] = []
+	params: dict = {}
 	if bounding_box:
 		bb = bounding_box.expand(20)
-		conditions += [
-			"'Dataset' IN labels(connected_node)",
-			"connected_node.north_boundary >= $south",
-			"connected_node.south_boundary <= $north",
-			"connected_node.east_boundary >= $west",
-			"connected_node.west_boundary <= $east",
-		]
+		if spatial_index:
+			conditions += _EXTENT_INTERSECTS
+		else:
+			conditions += [
+				"connected_node.north_boundary >= $south",
+				"connected_node.south_boundary <= $north",
+				"connected_node.east_boundary >= $west",
+				"connected_node.west_boundary <= $east",
+			]
+		# Clamped, since point() rejects coordinates outside WGS-84 ranges
 		params.update(
-			{"south": bb.south, "north": bb.north, "west": bb.west, "east": bb.east}
+			{
+				"south": max(bb.south, -90.0),
+				"north": min(bb.north, 90.0),
+				"west": max(bb.west, -180.0),
+				"east": min(bb.east, 180.0),
+			}
 		)
 	if published_after:
 		conditions.append("connected_node.publication_date >= $published_after")
@@ -66,78 +150,202 @@ def search_query(
 	if min_citations is not None:
 		conditions.append("connected_node.citations >= $min_citations")
 		params["min_citations"] = min_citations
+	return conditions, params
+
+
+def _index_call(
+	procedure: str,
+	shared_index: str,
+	label_index_prefix: str,
+	label: Optional[str],
+	use_label_index: bool,
+) -> Tuple[str, str]:
+	"""Pick the index to query and the label predicate applied straight after it.
+
+	With a label the per-label index is queried, so every candidate it returns is of that label.
+	Graphs ingested before the per-label indexes existed fall back to the shared index, and the
+	predicate then discards other labels before any relationships are expanded.
+	"""
+	if label is None:
+		return procedure.format(index=shared_index), ""
+	if label not in _LABEL_INDEX_SUFFIX:
+		raise ValueError(f"Invalid search label: {label!r}")
+	index = (
+		f"{label_index_prefix}_{_LABEL_INDEX_SUFFIX[label]}"
+		if use_label_index
+		else shared_index
+	)
+	return procedure.format(index=index), f"WHERE start_node:{label} "
+
+
+# One row per hit: its connected datasets are ranked by citations and only the first
+# $max_datasets are projected, so high-degree people and organisations stay cheap to return
+_SEARCH_RETURN = (
+	"WITH start_node, score, r, connected_node "
+	"ORDER BY coalesce(connected_node.citations, 0) DESC, connected_node.title "
+	"WITH start_node, score, count(*) AS dataset_count, "
+	"collect([connected_node, r])[..$max_datasets] AS top "
+	"RETURN apoc.map.removeKeys(start_node, ['embedding']) as start_node, "
+	"coalesce(start_node.doc_id, elementId(start_node)) as start_node_id, "
+	"labels(start_node) as start_labels, "
+	"score, "
+	"dataset_count, "
+	"[pair IN top | {"
+	"dataset: apoc.map.removeKeys(pair[0], ['embedding']), "
+	"relationship_type: type(pair[1]), "
+	"relationship_direction: CASE WHEN startNode(pair[1]) = start_node THEN 'outgoing' ELSE 'incoming' END"
+	"}] as datasets "
+	"ORDER BY score DESC"
+)
+# Index neighbours are requested as $k and hits are cut to $limit after filtering, so filtered
+# searches can over-fetch from the index without returning more rows
+_SEARCH_LIMIT = " LIMIT $limit"
 
+
+def _search_cypher(index_call: str, label_predicate: str, conditions: List[str]) -> str:
 	where = ("WHERE " + " AND ".join(conditions) + " ") if conditions else ""
-	query = (
-		"CALL db.index.vector.queryNodes('vec_lookup', $limit, $embedding) "
-		"YIELD node AS start_node, score "
-		"MATCH (start_node)-[r]-(connected_node) "
+	return (
+		index_call
+		+ "YIELD node AS start_node, score "
+		+ label_predicate
+		# Results are always reported against a dataset, so only dataset neighbours are expanded
+		+ "MATCH (start_node)-[r]-(connected_node:Dataset) "
 		+ where
-		+ "WITH start_node, r, connected_node, score, "
-		"CASE WHEN startNode(r) = start_node THEN 'outgoing' ELSE 'incoming' END as direction "
-		"RETURN apoc.map.removeKeys(start_node, ['embedding']) as start_node, "
-		"id(start_node) as start_node_id, "
-		"labels(start_node) as start_labels, "
-		"type(r) as relationship_type, "
-		"direction as relationship_direction, "
-		"apoc.map.removeKeys(connected_node, ['embedding']) as connected_node, "
-		"id(connected_node) as connected_node_id, "
-		"labels(connected_node) as connected_labels, "
-		"score"
-	)
-	return tx.run(query, **params).data()
-
-
-def fulltext_search_query(
+		+ _SEARCH_RETURN
+		+ _SEARCH_LIMIT
+	)
+
+
+async def search_query(
+	tx,
+	embedding: List[float],
+	limit: int = 10,
+	label: Optional[str] = None,
+	max_datasets: int = 5,
+	bounding_box: Optional[BoundingBox] = None,
+	published_after: Optional[str] = None,
+	published_before: Optional[str] = None,
+	min_citations: Optional[int] = None,
+	use_label_index: bool = True,
+	k: Optional[int] = None,
+):
+	conditions, params = _dataset_filters(
+		bounding_box, published_after, published_before, min_citations
+	)
+	index_call, label_predicate = _index_call(
+		"CALL db.index.vector.queryNodes('{index}', $k, $embedding) ",
+		"vec_lookup",
+		"vec",
+		label,
+		use_label_index and label not in _SHARED_VECTOR_INDEX_LABELS,
+	)
+	query = _search_cypher(index_call, label_predicate, conditions)
+	result = await tx.run(
+		query,
+		embedding=embedding,
+		k=max(k or limit, limit),
+		limit=limit,
+		max_datasets=max_datasets,
+		**params,
+	)
+	return await result.data()
+
+
+async def fulltext_search_query(
 	tx,
 	search_term: str,
 	limit: int = 50,
+	label: Optional[str] = None,
+	max_datasets: int = 5,
 	bounding_box: Optional[BoundingBox] = None,
 	published_after: Optional[str] = None,
 	published_before: Optional[str] = None,
 	min_citations: Optional[int] = None,
+	use_label_index: bool = True,
+	k: Optional[int] = None,
 ):
-	params: dict = {"search_term": search_term, "limit": limit}
-	conditions: List[str] = []
+	conditions, params = _dataset_filters(
+		bounding_box, published_after, published_before, min_citations
+	)
+	index_call, label_predicate = _index_call(
+		"CALL db.index.fulltext.queryNodes('{index}', $search_term, {{limit: $k}}) ",
+		"ft_search",
+		"ft",
+		label,
+		use_label_index,
+	)
+	query = _search_cypher(index_call, label_predicate, conditions)
+	result = await tx.run(
+		query,
+		search_term=search_term,
+		k=max(k or limit, limit),
+		limit=limit,
+		max_datasets=max_datasets,
+		**params,
+	)
+	return await result.data()
 
-	if bounding_box:
-		bb = bounding_box.expand(20)
-		conditions += [
-			"'Dataset' IN labels(connected_node)",
-			"connected_node.north_boundary >= $south",
-			"connected_node.south_boundary <= $north",
-			"connected_node.east_boundary >= $west",
-			"connected_node.west_boundary <= $east",
-		]
-		params.update(
-			{"south": bb.south, "north": bb.north, "west": bb.west, "east": bb.east}
-		)
-	if published_after:
-		conditions.append("connected_node.publication_date >= $published_after")
-		params["published_after"] = published_after
-	if published_before:
-		conditions.append("connected_node.publication_date <= $published_before")
-		params["published_before"] = published_before
-	if min_citations is not None:
-		conditions.append("connected_node.citations >= $min_citations")
-		params["min_citations"] = min_citations
 
-	where = ("WHERE " + " AND ".join(conditions) + " ") if conditions else ""
+async def spatial_candidate_count_query(
+	tx,
+	bounding_box: BoundingBox,
+	published_after: Optional[str] = None,
+	published_before: Optional[str] = None,
+	min_citations: Optional[int] = None,
+) -> int:
+	conditions, params = _dataset_filters(
+		bounding_box,
+		published_after,
+		published_before,
+		min_citations,
+		spatial_index=True,
+	)
+	result = await tx.run(
+		"MATCH (connected_node:Dataset) WHERE "
+		+ " AND ".join(conditions)
+		+ " RETURN count(*) AS datasets",
+		**params,
+	)
+	record = await result.single()
+	return record["datasets"]
+
+
+async def prefiltered_search_query(
+	tx,
+	embedding: List[float],
+	bounding_box: BoundingBox,
+	limit: int = 10,
+	label: Optional[str] = None,
+	max_datasets: int = 5,
+	published_after: Optional[str] = None,
+	published_before: Optional[str] = None,
+	min_citations: Optional[int] = None,
+):
+	"""Vector search restricted to nodes connected to datasets intersecting the bounding box.
+
+	Candidate datasets come from the extent point indexes, and only their neighbours are scored,
+	by exact cosine similarity, so a tight box never spends the top-k on nodes outside it.
+	"""
+	if label is not None and label not in _LABEL_INDEX_SUFFIX:
+		raise ValueError(f"Invalid search label: {label!r}")
+	conditions, params = _dataset_filters(
+		bounding_box,
+		published_after,
+		published_before,
+		min_citations,
+		spatial_index=True,
+	)
+	label_expression = label or "|".join(_LABEL_INDEX_SUFFIX)
 	query = (
-		"CALL db.index.fulltext.queryNodes('ft_search', $search_term, {limit: $limit}) "
-		"YIELD node AS start_node, score "
-		"MATCH (start_node)-[r]-(connected_node) "
-		+ where
-		+ "WITH start_node, r, connected_node, score, "
-		"CASE WHEN startNode(r) = start_node THEN 'outgoing' ELSE 'incoming' END as direction "
-		"RETURN apoc.map.removeKeys(start_node, ['embedding']) as start_node, "
-		"id(start_node) as start_node_id, "
-		"labels(start_node) as start_labels, "
-		"type(r) as relationship_type, "
-		"direction as relationship_direction, "
-		"apoc.map.removeKeys(connected_node, ['embedding']) as connected_node, "
-		"id(connected_node) as connected_node_id, "
-		"labels(connected_node) as connected_labels, "
-		"score"
-	)
-	return tx.run(query, **params).data()
+		"MATCH (connected_node:Dataset) WHERE "
+		+ " AND ".join(conditions)
+		+ f" MATCH (start_node:{label_expression})-[r]-(connected_node) "
+		"WHERE start_node.embedding IS NOT NULL "
+		"WITH start_node, r, connected_node, vector.similarity.cosine(start_node.embedding, $embedding) AS score "
+		+ _SEARCH_RETURN
+		+ _SEARCH_LIMIT
+	)
+	result = await tx.run(
+		query, embedding=embedding, limit=limit, max_datasets=max_datasets, **params
+	)
+	return await result.data()
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Callable, List, Literal, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+	from sentence_transformers import CrossEncoder
+
+DEFAULT_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# ONNX exports published alongside the model; quint8 AVX2 runs on any x86-64 host from the last decade
+ONNX_FILES: dict[str, str] = {
+	"fp32": "onnx/model.onnx",
+	"int8": "onnx/model_quint8_avx2.onnx",
+}
+
+
+def create_reranker(
+	model: str = DEFAULT_RERANKER_MODEL,
+	precision: Literal["fp32", "int8"] = "fp32",
+	onnx_file: Optional[str] = None,
+	intra_op_threads: int = 0,
+	inter_op_threads: int = 0,
+	max_length: Optional[int] = None,
+) -> "CrossEncoder":
+	"""Load the ONNX cross-encoder used to rerank search results.
+
+	Args:
+	    model (str): Hugging Face id of the cross-encoder.
+	    precision (Literal["fp32", "int8"]): Selects the full precision or int8-quantised export.
+	    onnx_file (Optional[str]): Path of the ONNX file within the model repo, overriding precision,
+	        e.g. "onnx/model_qint8_avx512_vnni.onnx" on hosts with VNNI.
+	    intra_op_threads (int): ONNX Runtime threads used within an operator, 0 for its default.
+	    inter_op_threads (int): ONNX Runtime threads used across operators, 0 for its default.
+	    max_length (Optional[int]): Maximum tokens per (query, passage) pair, None for the model's limit.
+
+	Returns:
+	    CrossEncoder: The loaded cross-encoder.
+	"""
+	# Imported here, as sentence-transformers pulls in torch and takes seconds to import
+	import onnxruntime
+	from sentence_transformers import CrossEncoder
+
+	session_options = onnxruntime.SessionOptions()
+	session_options.intra_op_num_threads = intra_op_threads
+	session_options.inter_op_num_threads = inter_op_threads
+	return CrossEncoder(
+		model,
+		backend="onnx",
+		max_length=max_length,
+		model_kwargs={
+			"file_name": onnx_file or ONNX_FILES[precision],
+			"provider": "CPUExecutionProvider",
+			"session_options": session_options,
+		},
+	)
+
+
+async def predict_within_budget(
+	predict: Callable[[List[Tuple[str, str]]], Sequence[float]],
+	pairs: List[Tuple[str, str]],
+	batch_size: int,
+	deadline: float,
+	executor: Optional[Executor] = None,
+) -> List[float]:
+	"""Score (query, passage) pairs in batches, in order, until a time.perf_counter() deadline passes.
+
+	A batch is only started before the deadline, so the last one can overrun it by one batch.
+
+	Args:
+	    predict (Callable): Scores a batch of pairs, e.g. a bound CrossEncoder.predict.
+	    pairs (List[Tuple[str, str]]): Pairs to score, most promising first.
+	    batch_size (int): Pairs per predict call.
+	    deadline (float): perf_counter time after which no further batch starts.
+	    executor (Optional[Executor]): Where predict runs, the event loop's default executor if None.
+
+	Returns:
+	    List[float]: Scores of the leading pairs that were scored, possibly fewer than given.
+	"""
+	scores: List[float] = []
+	for start in range(0, len(pairs), batch_size):
+		if time.perf_counter() >= deadline:
+			break
+		batch = pairs[start : start + batch_size]
+		predicted = await asyncio.get_running_loop().run_in_executor(
+			executor, predict, batch
+		)
+		scores += [float(score) for score in predicted]
+	return scores
+
+
+def rerank_order(
+	scores: Sequence[Optional[float]],
+) -> List[Tuple[int, Optional[float]]]:
+	"""Order fused candidates by their cross-encoder scores.
+
+	Scored candidates come first, best first. Candidates the reranker did not reach follow in their
+	fused order and are given the lowest cross-encoder score. Their fusion scores are on another
+	scale, so keeping them could rank an unscored candidate above a reranked one.
+
+	Args:
+	    scores (Sequence[Optional[float]]): Cross-encoder score of each candidate in fused order,
+	        None where it was not scored.
+
+	Returns:
+	    List[Tuple[int, Optional[float]]]: Candidate indices with the score to report, in their new
+	        order. The score is None if nothing was scored, in which case the fusion scores stand.
+	"""
+	scored = sorted(
+		((i, score) for i, score in enumerate(scores) if score is not None),
+		key=lambda pair: pair[1],
+		reverse=True,
+	)
+	floor = scored[-1][1] if scored else None
+	return scored + [(i, floor) for i, score in enumerate(scores) if score is None]
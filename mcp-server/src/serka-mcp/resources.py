@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyResource(Generic[T]):
+	"""A resource built on first use, at most once, from any thread.
+
+	The server preloads these in the background at startup, so models load concurrently while
+	the server already accepts connections; anything still loading is built by whichever call
+	needs it first.
+
+	Args:
+	    name (str): Name reported by the readiness probe.
+	    factory (Callable[[], T]): Builds the resource; retried on the next use if it raises.
+	"""
+
+	def __init__(self, name: str, factory: Callable[[], T]):
+		self.name = name
+		self.load_ms: Optional[float] = None
+		self.error: Optional[str] = None
+		self._factory = factory
+		self._value: Optional[T] = None
+		self._ready = False
+		self._lock = threading.Lock()
+
+	@property
+	def ready(self) -> bool:
+		return self._ready
+
+	def get(self) -> T:
+		if self._ready:
+			return self._value
+		with self._lock:
+			if not self._ready:
+				t0 = time.perf_counter()
+				try:
+					self._value = self._factory()
+				except Exception as e:
+					self.error = str(e)
+					raise
+				self.load_ms = (time.perf_counter() - t0) * 1000
+				self.error = None
+				self._ready = True
+		return self._value
+
+	def load_in_background(self) -> None:
+		"""Start building the resource on a daemon thread unless it is built or being built."""
+		if not self._ready and not self._lock.locked():
+			threading.Thread(
+				target=self._load_quietly, name=f"load-{self.name}", daemon=True
+			).start()
+
+	def _load_quietly(self) -> None:
+		try:
+			self.get()
+		except Exception:
+			pass  # recorded in self.error and retried on the next get()
+
+	def status(self) -> dict:
+		return {"ready": self._ready, "load_ms": self.load_ms, "error": self.error}
@@ -0,0 +1,58 @@
+from app import (
+	gazetteer,
+	geocode_cache,
+	mcp,
+	neo4j_driver,
+	neo4j_status,
+	preloaded_resources,
+	query_embeddings,
+	rerank_scores,
+	startup_preload,
+)
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+
+@mcp.custom_route("/cache-stats", methods=["GET"])
+async def cache_stats(request: Request) -> JSONResponse:
+	"""Hit/miss counters of the in-process caches used by the tools."""
+	return JSONResponse(
+		{
+			"query_embeddings": query_embeddings.stats(),
+			"rerank_scores": rerank_scores.stats(),
+			"geocodes": geocode_cache.stats() if geocode_cache else None,
+			"gazetteer": gazetteer.get().stats()
+			if gazetteer and gazetteer.ready
+			else None,
+		}
+	)
+
+
+@mcp.custom_route("/health/live", methods=["GET"])
+async def liveness(request: Request) -> JSONResponse:
+	"""The process is up and serving HTTP; models may still be loading."""
+	return JSONResponse({"status": "alive"})
+
+
+@mcp.custom_route("/health/ready", methods=["GET"])
+async def readiness(request: Request) -> JSONResponse:
+	"""Ready once Neo4j answers and, when preloading, every model has loaded; 503 until then."""
+	# Without a warm-up in flight, Neo4j is checked here so the probe notices it coming back
+	if not neo4j_status["ready"] and (neo4j_status["error"] or not startup_preload):
+		try:
+			await neo4j_driver.verify_connectivity()
+			neo4j_status.update(ready=True, error=None)
+		except Exception as e:
+			neo4j_status["error"] = str(e)
+	checks = {
+		"neo4j": dict(neo4j_status),
+		**{resource.name: resource.status() for resource in preloaded_resources},
+	}
+	required = ["neo4j"] + (
+		[resource.name for resource in preloaded_resources] if startup_preload else []
+	)
+	ready = all(checks[name]["ready"] for name in required)
+	return JSONResponse(
+		{"status": "ready" if ready else "starting", "checks": checks},
+		status_code=200 if ready else 503,
+	)
@@ -1,10 +1,41 @@
+import asyncio
+import math
 import time
+from functools import partial
 from typing import Annotated, List, Literal, Optional, Union
 
-from app import embedder, geolocator, logger, mcp, neo4j_driver, reranker, reranking_enabled
+from app import (
+	gazetteer,
+	geocode_cache,
+	geolocator,
+	logger,
+	mcp,
+	neo4j_driver,
+	query_embeddings,
+	rerank_batch_size,
+	rerank_executor,
+	rerank_max_pairs,
+	rerank_max_tokens,
+	rerank_scores,
+	rerank_time_budget_ms,
+	reranker,
+	reranking_enabled,
+	search_candidate_factor,
+	search_fusion,
+	search_fusion_rrf_k,
+	search_fusion_weights,
+	search_index_oversample,
+	search_typed_candidate_factor,
+	spatial_prefilter_max_datasets,
+	spatial_search_mode,
+)
+from caches import text_key
+from fusion import FusionMethod, fuse
 from geopy.location import Location
+from neo4j.exceptions import ClientError
 from models import (
 	BoundingBox,
+	ConnectedDataset,
 	Dataset,
 	Error,
 	GeoCodedLocation,
@@ -15,7 +46,29 @@ from models import (
 	SupportingDocument,
 	TextChunk,
 )
-from queries import dataset_cypher_query, escape_fts_query, fulltext_search_query, list_query, search_query
+from queries import (
+	dataset_cypher_query,
+	dataset_documents_query,
+	datasets_by_author_query,
+	escape_fts_query,
+	fulltext_search_query,
+	graph_schema_query,
+	ingest_generation_query,
+	list_query,
+	prefiltered_search_query,
+	related_datasets_query,
+	search_query,
+	spatial_candidate_count_query,
+)
+from rerankers import predict_within_budget, rerank_order
+
+_ITEM_MODELS: dict[str, type[TextChunk | Person | Organisation]] = {
+	"TextChunk": TextChunk,
+	"Person": Person,
+	"Organisation": Organisation,
+}
+# Upper bound on the connected datasets returned with each search result
+_MAX_DATASETS_PER_RESULT = 5
 
 _RESULT_TYPE_LABEL: dict[str, str] = {
 	"dataset": "TextChunk",
@@ -26,68 +79,157 @@ _RESULT_TYPE_LABEL: dict[str, str] = {
 
 def _result_key(sr: SearchResult) -> str:
 	if sr.result.type == "TextChunk":
-		return f"TextChunk::{hash(sr.result.item.content)}"
+		return f"TextChunk::{sr.result.item.doc_id}"
 	return f"{sr.result.type}::{sr.result.item.uri}"
 
 
-def _rrf_merge(lists: list[list[SearchResult]], k: int = 60) -> list[SearchResult]:
-	scores: dict[str, float] = {}
+def _fuse_results(
+	lists: list[list[SearchResult]], method: FusionMethod
+) -> list[SearchResult]:
 	items: dict[str, SearchResult] = {}
+	keys: list[list[str]] = []
 	for ranked_list in lists:
-		for rank, sr in enumerate(ranked_list, start=1):
-			key = _result_key(sr)
-			scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
-			if key not in items:
-				items[key] = sr
-	return [items[k] for k in sorted(scores, key=lambda k: scores[k], reverse=True)]
+		keys.append([_result_key(sr) for sr in ranked_list])
+		for key, sr in zip(keys[-1], ranked_list):
+			items.setdefault(key, sr)
+	fused = fuse(
+		keys,
+		[[sr.score for sr in ranked_list] for ranked_list in lists],
+		method=method,
+		weights=search_fusion_weights,
+		k=search_fusion_rrf_k,
+	)
+	return [items[key] for key, _ in fused]
 
 
-def _build_search_results(
-	nodes: list[dict], label_filter: str | None
-) -> list[SearchResult]:
+def _build_search_results(nodes: list[dict]) -> list[SearchResult]:
 	results: list[SearchResult] = []
 	for n in nodes:
-		labels = n["start_labels"]
-		if label_filter and label_filter not in labels:
+		item_type = next((t for t in _ITEM_MODELS if t in n["start_labels"]), None)
+		if item_type is None or not n["datasets"]:
 			continue
-		if "TextChunk" in labels:
-			results.append(
-				SearchResult(
-					result=ResultItem(item=TextChunk(**n["start_node"]), type="TextChunk"),
-					dataset=Dataset(**n["connected_node"]),
-					score=n["score"],
-					description=n["relationship_type"],
-				)
-			)
-		elif "Person" in labels and "Dataset" in n["connected_labels"]:
-			results.append(
-				SearchResult(
-					result=ResultItem(item=Person(**n["start_node"]), type="Person"),
-					dataset=Dataset(**n["connected_node"]),
-					score=n["score"],
-					description=n["relationship_type"],
-				)
+		primary, *others = n["datasets"]
+		# Chunks ingested without a doc_id fall back to their element id, so every chunk has a stable key
+		item = (
+			{**n["start_node"], "doc_id": n["start_node_id"]}
+			if item_type == "TextChunk"
+			else n["start_node"]
+		)
+		results.append(
+			SearchResult(
+				result=ResultItem(item=_ITEM_MODELS[item_type](**item), type=item_type),
+				dataset=Dataset(**primary["dataset"]),
+				score=n["score"],
+				description=primary["relationship_type"],
+				other_datasets=[
+					ConnectedDataset(
+						dataset=Dataset(**d["dataset"]),
+						relationship=d["relationship_type"],
+					)
+					for d in others
+				],
+				dataset_count=n["dataset_count"],
 			)
-		elif "Organisation" in labels and "Dataset" in n["connected_labels"]:
-			results.append(
-				SearchResult(
-					result=ResultItem(
-						item=Organisation(**n["start_node"]), type="Organisation"
-					),
-					dataset=Dataset(**n["connected_node"]),
-					score=n["score"],
-					description=n["relationship_type"],
+		)
+	return results
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+	tokens = text.split()
+	return text if len(tokens) <= max_tokens else " ".join(tokens[:max_tokens])
+
+
+async def _read_search(session, query, label: Optional[str], **params) -> list[dict]:
+	try:
+		return await session.execute_read(query, label=label, **params)
+	except ClientError as e:
+		if label is None:
+			raise
+		# Graphs ingested before the per-label indexes existed only have the shared index
+		logger.warning(
+			f"Per-label index for {label} unavailable, using the shared index: {e}"
+		)
+		return await session.execute_read(
+			query, label=label, use_label_index=False, **params
+		)
+
+
+async def _use_spatial_prefilter(
+	session, bounding_box: Optional[BoundingBox], **filters
+) -> bool:
+	"""Whether a bounding-box search should rank only the datasets inside the box."""
+	if bounding_box is None or spatial_search_mode == "postfilter":
+		return False
+	if spatial_search_mode == "prefilter":
+		return True
+	try:
+		datasets = await session.execute_read(
+			spatial_candidate_count_query, bounding_box, **filters
+		)
+	except ClientError as e:
+		logger.warning(f"Dataset extent lookup failed, post-filtering instead: {e}")
+		return False
+	# No matches usually means a graph ingested before extents were stored
+	return 0 < datasets <= spatial_prefilter_max_datasets
+
+
+async def _cross_encoder_scores(
+	search_term: str, passages: list[str], passage_keys: list[str], deadline: float
+) -> tuple[list[Optional[float]], int]:
+	"""Score passages against the search term, only running the cross-encoder on unseen pairs.
+
+	Unseen pairs are scored in batches in the given (fused) order until the perf_counter deadline
+	passes; passages left unscored get None. Returns the scores and how many pairs were scored.
+	"""
+	if rerank_scores.generation_due():
+		try:
+			async with neo4j_driver.session(database="neo4j") as session:
+				rerank_scores.set_generation(
+					await session.execute_read(ingest_generation_query)
 				)
+		except Exception as e:
+			logger.warning(
+				f"Could not read ingest generation, keeping cached rerank scores: {e}"
 			)
-	return results
+
+	scores = rerank_scores.get_many(search_term, passage_keys)
+	missing = [i for i, score in enumerate(scores) if score is None]
+	if missing and not reranker.ready:
+		# Loading the model takes longer than any search can wait; until then only cached scores apply
+		reranker.load_in_background()
+		missing = []
+	if not missing:
+		return scores, 0
+	predicted = await predict_within_budget(
+		partial(
+			reranker.get().predict,
+			batch_size=rerank_batch_size,
+			show_progress_bar=False,
+		),
+		[(search_term, passages[i]) for i in missing],
+		rerank_batch_size,
+		deadline,
+		rerank_executor,
+	)
+	scored = missing[: len(predicted)]
+	rerank_scores.put_many(search_term, [passage_keys[i] for i in scored], predicted)
+	for i, score in zip(scored, predicted):
+		scores[i] = score
+	return scores, len(predicted)
+
+
+def _cached_geocode(location: str) -> tuple[Optional[GeoCodedLocation], bool]:
+	"""The cached location of a place, and whether it is cached as not found."""
+	cached = geocode_cache.get(location)
+	return cached, cached is None and geocode_cache.known_missing(location)
 
 
 @mcp.resource("dataset://{uri}")
-def get_dataset(uri: str) -> Union[Dataset, Error]:
+async def get_dataset(uri: str) -> Union[Dataset, Error]:
 	logger.info(f"Retrieving dataset {uri}")
 	try:
-		with neo4j_driver.session(database="neo4j") as session:
-			result = session.execute_read(dataset_cypher_query, uri=uri)
+		async with neo4j_driver.session(database="neo4j") as session:
+			result = await session.execute_read(dataset_cypher_query, uri=uri)
 		if result is None:
 			return Error(msg=f"Dataset '{uri}' not found")
 		return Dataset(**result["d"])
@@ -97,12 +239,13 @@ def get_dataset(uri: str) -> Union[Dataset, Error]:
 
 
 @mcp.tool()
-def geocode_location(location: str) -> Union[GeoCodedLocation, Error]:
+async def geocode_location(location: str) -> Union[GeoCodedLocation, Error]:
 	"""Geocode a location name to get its geographic boundaries within the UK.
 
 	This function uses the Nominatim geocoding service to convert a place name
 	into geographic coordinates and bounding box information. The search is
-	biased towards UK locations using the country code "GB".
+	biased towards UK locations using the country code "GB". Places found in the
+	offline gazetteer or in earlier lookups are answered without a network call.
 
 	Args:
 	    location (str): The location name to geocode. Can be a city, town,
@@ -117,18 +260,40 @@ def geocode_location(location: str) -> Union[GeoCodedLocation, Error]:
 	          data, or if there's a network/service error
 	"""
 	try:
-		result: Location = geolocator.geocode(location, country_codes="GB")
+		if gazetteer is not None and not gazetteer.ready:
+			gazetteer.load_in_background()
+		elif gazetteer is not None:
+			match = gazetteer.get().lookup(location)
+			if match is not None:
+				logger.info(
+					f"Geocoded {location} from the gazetteer ({match[1]} match)"
+				)
+				return match[0]
+		if geocode_cache is not None:
+			cached, missing = await asyncio.to_thread(_cached_geocode, location)
+			if cached is not None:
+				return cached
+			if missing:
+				return Error(msg=f"Location '{location}' not found")
+		result: Location = await asyncio.to_thread(
+			lambda: geolocator.get().geocode(location, country_codes="GB")
+		)
 		if result is None:
+			if geocode_cache is not None:
+				await asyncio.to_thread(geocode_cache.put_missing, location)
 			return Error(msg=f"Location '{location}' not found")
 		boundary: BoundingBox = BoundingBox.from_nominatim(result.raw["boundingbox"])
-		return GeoCodedLocation(name=result.raw["display_name"], boundary=boundary)
+		geocoded = GeoCodedLocation(name=result.raw["display_name"], boundary=boundary)
+		if geocode_cache is not None:
+			await asyncio.to_thread(geocode_cache.put, location, geocoded)
+		return geocoded
 	except Exception as e:
 		logger.error(f"Error geocoding location {location}: {str(e)}")
 		return Error(msg=f"Error geocoding location {location}: {str(e)}")
 
 
 @mcp.tool()
-def list_datasets(
+async def list_datasets(
 	limit: int = 25,
 	sort_by: Literal["citations", "publication_date"] = "citations",
 	order: Literal["ascending", "descending"] = "descending",
@@ -147,8 +312,8 @@ def list_datasets(
 	"""
 	logger.info("Listing datasets in Serka knowledge graph.")
 	try:
-		with neo4j_driver.session(database="neo4j") as session:
-			nodes = session.execute_read(
+		async with neo4j_driver.session(database="neo4j") as session:
+			nodes = await session.execute_read(
 				list_query, limit=limit, sort_by=sort_by, order=order
 			)
 			return [Dataset(**n["dataset"]) for n in nodes]
@@ -158,7 +323,7 @@ def list_datasets(
 
 
 @mcp.tool()
-def search(
+async def search(
 	search_term: Annotated[str, "A term to use to search the EIDC catalogue."],
 	result_type: Annotated[
 		Optional[Literal["dataset", "person", "organisation"]],
@@ -182,6 +347,10 @@ def search(
 		Optional[int], "Minimum number of citations a dataset must have to be included."
 	] = None,
 	result_limit: Annotated[int, "How many result to return."] = 25,
+	fusion: Annotated[
+		Optional[FusionMethod],
+		"How semantic and keyword matches are combined. Omit to use the server default.",
+	] = None,
 ) -> Union[List[SearchResult], Error]:
 	"""Performs a semantic search on the EIDC catalogue using the given search term.
 
@@ -198,9 +367,14 @@ def search(
 	    published_after (Optional[str]): Exclude datasets published before this ISO date.
 	    published_before (Optional[str]): Exclude datasets published after this ISO date.
 	    min_citations (Optional[int]): Exclude datasets with fewer than this many citations.
+	    result_limit (int): Maximum number of results returned.
+	    fusion (Optional[FusionMethod]): Merge semantic and keyword candidates by "rrf", "weighted_rrf",
+	        or a weighted sum of "minmax" or "zscore" normalised scores. Defaults to SEARCH_FUSION.
 
 	Returns:
 	    Union[List[SearchResult], Error]: A list of search results ranked by semantic similarity, or an Error.
+	        Each result appears once, with its most cited connected dataset in dataset, a few more in
+	        other_datasets, and the total number of connected datasets in dataset_count.
 	"""
 	logger.info(
 		f'Search: "{search_term}" [type={result_type}, bounding_box={bounding_box}, '
@@ -209,62 +383,149 @@ def search(
 	try:
 		t0 = time.perf_counter()
 
-		label_filter = _RESULT_TYPE_LABEL.get(result_type) if result_type else None
-		embedding = embedder.run(search_term)["embedding"]
-		logger.info(f"  embed:    {(time.perf_counter() - t0) * 1000:.0f}ms")
-
-		with neo4j_driver.session(database="neo4j") as session:
-			t1 = time.perf_counter()
-			vector_nodes = session.execute_read(
-				search_query,
-				embedding=embedding,
-				limit=result_limit * 4,
-				bounding_box=bounding_box,
-				published_after=published_after,
-				published_before=published_before,
-				min_citations=min_citations,
-			)
-			logger.info(f"  vector:   {(time.perf_counter() - t1) * 1000:.0f}ms ({len(vector_nodes)} rows)")
+		def elapsed(since: float) -> str:
+			return f"{(time.perf_counter() - since) * 1000:.0f}ms"
 
-			t2 = time.perf_counter()
-			try:
-				ft_nodes = session.execute_read(
+		label_filter = _RESULT_TYPE_LABEL.get(result_type) if result_type else None
+		candidate_limit = max(
+			result_limit,
+			math.ceil(
+				result_limit
+				* (
+					search_typed_candidate_factor
+					if label_filter
+					else search_candidate_factor
+				)
+			),
+		)
+		index_k = math.ceil(candidate_limit * max(search_index_oversample, 1.0))
+
+		async def run_fulltext() -> list[dict]:
+			# The full-text query needs no embedding, so it runs in its own session alongside embed+vector
+			t = time.perf_counter()
+			async with neo4j_driver.session(database="neo4j") as fts_session:
+				nodes = await _read_search(
+					fts_session,
 					fulltext_search_query,
+					label_filter,
 					search_term=escape_fts_query(search_term),
-					limit=result_limit * 4,
+					limit=candidate_limit,
+					k=index_k,
+					max_datasets=_MAX_DATASETS_PER_RESULT,
 					bounding_box=bounding_box,
 					published_after=published_after,
 					published_before=published_before,
 					min_citations=min_citations,
 				)
-				logger.info(f"  fts:      {(time.perf_counter() - t2) * 1000:.0f}ms ({len(ft_nodes)} rows)")
-			except Exception as fts_err:
-				logger.warning(f"FTS query failed, falling back to vector-only: {fts_err}")
-				ft_nodes = []
+			logger.info(
+				f"  fts:      {elapsed(t)} ({len(nodes)} rows, +{(t - t0) * 1000:.0f}ms → +{elapsed(t0)})"
+			)
+			return nodes
 
-			vector_results = _build_search_results(vector_nodes, label_filter)
-			ft_results = _build_search_results(ft_nodes, label_filter)
-			search_results = _rrf_merge([vector_results, ft_results])
+		fts_task = asyncio.create_task(run_fulltext())
+
+		try:
+			# Embedding calls Bedrock through blocking boto3, so it runs in a worker thread
+			embedding, source = await asyncio.to_thread(
+				query_embeddings.lookup, search_term
+			)
+			logger.info(f"  embed:    {elapsed(t0)} (from {source})")
+
+			t1 = time.perf_counter()
+			filters = {
+				"published_after": published_after,
+				"published_before": published_before,
+				"min_citations": min_citations,
+			}
+			async with neo4j_driver.session(database="neo4j") as session:
+				prefilter = await _use_spatial_prefilter(
+					session, bounding_box, **filters
+				)
+				if prefilter:
+					vector_nodes = await session.execute_read(
+						prefiltered_search_query,
+						embedding=embedding,
+						bounding_box=bounding_box,
+						limit=candidate_limit,
+						label=label_filter,
+						max_datasets=_MAX_DATASETS_PER_RESULT,
+						**filters,
+					)
+				else:
+					vector_nodes = await _read_search(
+						session,
+						search_query,
+						label_filter,
+						embedding=embedding,
+						limit=candidate_limit,
+						k=index_k,
+						max_datasets=_MAX_DATASETS_PER_RESULT,
+						bounding_box=bounding_box,
+						**filters,
+					)
+			logger.info(
+				f"  vector:   {elapsed(t1)} ({len(vector_nodes)} rows{', prefiltered' if prefilter else ''}, "
+				f"+{(t1 - t0) * 1000:.0f}ms → +{elapsed(t0)})"
+			)
+		except BaseException:
+			fts_task.cancel()
+			raise
+
+		try:
+			ft_nodes = await fts_task
+		except Exception as fts_err:
+			logger.warning(f"FTS query failed, falling back to vector-only: {fts_err}")
+			ft_nodes = []
+
+		vector_results = _build_search_results(vector_nodes)
+		ft_results = _build_search_results(ft_nodes)
+		search_results = _fuse_results(
+			[vector_results, ft_results], fusion or search_fusion
+		)
 
 		if reranking_enabled and len(search_results) > 1:
 			t3 = time.perf_counter()
-			pairs = [
-				(
-					search_term,
+			candidates = search_results[:rerank_max_pairs]
+			passages = [
+				_truncate_tokens(
 					sr.result.item.content
 					if sr.result.type == "TextChunk"
 					else f"{sr.result.item.name} {sr.dataset.title}",
+					rerank_max_tokens,
 				)
-				for sr in search_results
+				for sr in candidates
 			]
-			ce_scores = reranker.predict(pairs, batch_size=128, show_progress_bar=False)
-			for sr, score in zip(search_results, ce_scores):
-				sr.score = float(score)
-			search_results.sort(key=lambda sr: sr.score, reverse=True)
-			search_results = search_results[:result_limit]
-			logger.info(f"  rerank:   {(time.perf_counter() - t3) * 1000:.0f}ms ({len(pairs)} pairs → {len(search_results)} results)")
-
-		logger.info(f"  total:    {(time.perf_counter() - t0) * 1000:.0f}ms")
+			passage_keys = [
+				sr.result.item.doc_id
+				if sr.result.type == "TextChunk"
+				else text_key(passage)
+				for sr, passage in zip(candidates, passages)
+			]
+			deadline = (
+				t3 + rerank_time_budget_ms / 1000
+				if rerank_time_budget_ms > 0
+				else float("inf")
+			)
+			ce_scores, scored = await _cross_encoder_scores(
+				search_term, passages, passage_keys, deadline
+			)
+			# Candidates past the pair or time budget follow the reranked ones in fused order
+			ce_scores += [None] * (len(search_results) - len(candidates))
+			order = rerank_order(ce_scores)
+			for i, score in order:
+				if score is not None:
+					search_results[i].score = score
+			search_results = [search_results[i] for i, _ in order]
+			reranked = sum(score is not None for score in ce_scores)
+			logger.info(
+				f"  rerank:   {(time.perf_counter() - t3) * 1000:.0f}ms ({reranked}/{len(candidates)} pairs reranked, "
+				f"{scored} scored, {reranked - scored} cached)"
+			)
+
+		search_results = search_results[:result_limit]
+		logger.info(
+			f"  total:    {(time.perf_counter() - t0) * 1000:.0f}ms ({len(search_results)} results)"
+		)
 		return search_results
 	except Exception as e:
 		logger.error(f'Error performing semantic search for "{search_term}": {str(e)}')
@@ -274,7 +535,7 @@ def search(
 
 
 @mcp.tool()
-def get_dataset_documents(uri: str) -> Union[List[SupportingDocument], Error]:
+async def get_dataset_documents(uri: str) -> Union[List[SupportingDocument], Error]:
 	"""Retrieves the full text content of all supporting documents attached to a dataset.
 
 	Use this after identifying a dataset of interest (e.g. from search or list_datasets) to
@@ -294,14 +555,8 @@ def get_dataset_documents(uri: str) -> Union[List[SupportingDocument], Error]:
 	"""
 	logger.info(f"Fetching documents for dataset {uri}")
 	try:
-		with neo4j_driver.session(database="neo4j") as session:
-			results = session.execute_read(
-				lambda tx: tx.run(
-					"MATCH (d:Dataset {uri: $uri})-[r]-(t:TextChunk) "
-					"RETURN coalesce(t.filename, type(r)) AS filename, t.content AS content",
-					uri=uri,
-				).data()
-			)
+		async with neo4j_driver.session(database="neo4j") as session:
+			results = await session.execute_read(dataset_documents_query, uri=uri)
 			return [
 				SupportingDocument(filename=r["filename"], content=r["content"])
 				for r in results
@@ -312,7 +567,7 @@ def get_dataset_documents(uri: str) -> Union[List[SupportingDocument], Error]:
 
 
 @mcp.tool()
-def find_datasets_by_author(orcid_uri: str) -> Union[List[Dataset], Error]:
+async def find_datasets_by_author(orcid_uri: str) -> Union[List[Dataset], Error]:
 	"""Find all datasets in the EIDC catalogue contributed to by a specific person, identified by their ORCID URI.
 
 	Requires an exact ORCID URI to unambiguously identify a person — name-based lookup is
@@ -331,13 +586,9 @@ def find_datasets_by_author(orcid_uri: str) -> Union[List[Dataset], Error]:
 	"""
 	logger.info(f"Finding datasets by author URI: {orcid_uri}")
 	try:
-		with neo4j_driver.session(database="neo4j") as session:
-			results = session.execute_read(
-				lambda tx: tx.run(
-					"MATCH (p:Person {uri: $uri})-[]-(d:Dataset) "
-					"RETURN DISTINCT apoc.map.removeKey(properties(d), 'embedding') AS dataset",
-					uri=orcid_uri,
-				).data()
+		async with neo4j_driver.session(database="neo4j") as session:
+			results = await session.execute_read(
+				datasets_by_author_query, uri=orcid_uri
 			)
 			return [Dataset(**r["dataset"]) for r in results]
 	except Exception as e:
@@ -348,7 +599,7 @@ def find_datasets_by_author(orcid_uri: str) -> Union[List[Dataset], Error]:
 
 
 @mcp.tool()
-def find_related_datasets(uri: str) -> Union[List[Dataset], Error]:
+async def find_related_datasets(uri: str) -> Union[List[Dataset], Error]:
 	"""Find datasets that are related to a given dataset through shared graph connections.
 
 	Uses a two-hop traversal of the knowledge graph, so it surfaces datasets that share
@@ -367,15 +618,8 @@ def find_related_datasets(uri: str) -> Union[List[Dataset], Error]:
 	"""
 	logger.info(f"Finding datasets related to {uri}")
 	try:
-		with neo4j_driver.session(database="neo4j") as session:
-			results = session.execute_read(
-				lambda tx: tx.run(
-					"MATCH (d:Dataset {uri: $uri})-[]-(mid)-[]-(related:Dataset) "
-					"WHERE related.uri <> $uri "
-					"RETURN DISTINCT apoc.map.removeKey(properties(related), 'embedding') AS dataset",
-					uri=uri,
-				).data()
-			)
+		async with neo4j_driver.session(database="neo4j") as session:
+			results = await session.execute_read(related_datasets_query, uri=uri)
 			return [Dataset(**r["dataset"]) for r in results]
 	except Exception as e:
 		logger.error(f"Error finding related datasets for {uri}: {str(e)}")
@@ -383,7 +627,7 @@ def find_related_datasets(uri: str) -> Union[List[Dataset], Error]:
 
 
 @mcp.tool()
-def get_graph_schema() -> Union[dict, Error]:
+async def get_graph_schema() -> Union[dict, Error]:
 	"""Returns the live schema of the knowledge graph to support query planning and capability discovery.
 
 	Call this when you are unsure what node types, relationship types, or properties exist in
@@ -400,31 +644,8 @@ def get_graph_schema() -> Union[dict, Error]:
 	"""
 	logger.info("Fetching graph schema")
 	try:
-		with neo4j_driver.session(database="neo4j") as session:
-			labels = session.execute_read(
-				lambda tx: [
-					r["label"] for r in tx.run("CALL db.labels() YIELD label").data()
-				]
-			)
-			rel_types = session.execute_read(
-				lambda tx: [
-					r["relationshipType"]
-					for r in tx.run(
-						"CALL db.relationshipTypes() YIELD relationshipType"
-					).data()
-				]
-			)
-			prop_keys = session.execute_read(
-				lambda tx: [
-					r["propertyKey"]
-					for r in tx.run("CALL db.propertyKeys() YIELD propertyKey").data()
-				]
-			)
-			return {
-				"node_labels": labels,
-				"relationship_types": rel_types,
-				"property_keys": prop_keys,
-			}
+		async with neo4j_driver.session(database="neo4j") as session:
+			return await session.execute_read(graph_schema_query)
 	except Exception as e:
 		logger.error(f"Error fetching graph schema: {str(e)}")
 		return Error(msg=f"Error fetching graph schema: {str(e)}")
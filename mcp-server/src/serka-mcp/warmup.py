@@ -0,0 +1,117 @@
+import asyncio
+import time
+from logging import Logger
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from models import BoundingBox
+from neo4j import AsyncDriver
+from queries import (
+	dataset_cypher_query,
+	dataset_documents_query,
+	datasets_by_author_query,
+	fulltext_search_query,
+	graph_schema_query,
+	ingest_generation_query,
+	list_query,
+	prefiltered_search_query,
+	related_datasets_query,
+	sample_embedding_query,
+	search_query,
+	spatial_candidate_count_query,
+)
+
+_DUMMY_URI = "https://example.org/serka-warm-up"
+_DUMMY_BOX = BoundingBox(south=51.0, north=52.0, west=-1.0, east=0.0)
+_SEARCH_LABELS = [None, "TextChunk", "Person", "Organisation"]
+
+
+async def _open_connections(driver: AsyncDriver, connections: int) -> None:
+	async def ping() -> None:
+		async with driver.session(database="neo4j") as session:
+			await (await session.run("RETURN 1")).consume()
+
+	# Sessions held at the same time each check out their own connection, filling the pool
+	await asyncio.gather(*(ping() for _ in range(connections)))
+
+
+def _tool_queries(
+	embedding: List[float],
+) -> List[Tuple[str, Callable[..., Awaitable[Any]], dict]]:
+	queries: List[Tuple[str, Callable[..., Awaitable[Any]], dict]] = []
+	for label in _SEARCH_LABELS:
+		name = label or "all"
+		queries += [
+			(
+				f"vector:{name}",
+				search_query,
+				{"embedding": embedding, "limit": 1, "label": label},
+			),
+			(
+				f"fts:{name}",
+				fulltext_search_query,
+				{"search_term": "warm", "limit": 1, "label": label},
+			),
+		]
+	queries += [
+		(
+			"vector:bbox",
+			search_query,
+			{"embedding": embedding, "limit": 1, "bounding_box": _DUMMY_BOX},
+		),
+		("spatial:count", spatial_candidate_count_query, {"bounding_box": _DUMMY_BOX}),
+		(
+			"spatial:prefilter",
+			prefiltered_search_query,
+			{"embedding": embedding, "bounding_box": _DUMMY_BOX, "limit": 1},
+		),
+		("list", list_query, {}),
+		("dataset", dataset_cypher_query, {"uri": _DUMMY_URI}),
+		("documents", dataset_documents_query, {"uri": _DUMMY_URI}),
+		("author", datasets_by_author_query, {"uri": _DUMMY_URI}),
+		("related", related_datasets_query, {"uri": _DUMMY_URI}),
+		("schema", graph_schema_query, {}),
+		("generation", ingest_generation_query, {}),
+	]
+	return queries
+
+
+async def warm_up(
+	driver: AsyncDriver, connections: int, logger: Logger
+) -> dict[str, float]:
+	"""Open pool connections and run every tool query once, so Neo4j has their plans cached.
+
+	Queries run with dummy parameters and failures are only logged, e.g. on an empty graph.
+
+	Args:
+	    driver (AsyncDriver): The driver the tools use.
+	    connections (int): Connections to open up front, at most the pool size.
+	    logger (Logger): Logger for the summary and any failed queries.
+
+	Returns:
+	    dict[str, float]: Milliseconds taken by each step.
+	"""
+	timings: dict[str, float] = {}
+	t0 = time.perf_counter()
+	await driver.verify_connectivity()
+	await _open_connections(driver, connections)
+	timings["connections"] = (time.perf_counter() - t0) * 1000
+
+	async with driver.session(database="neo4j") as session:
+		embedding = await session.execute_read(sample_embedding_query)
+		if embedding is None:
+			logger.warning("Warm-up: no embedded nodes, skipping vector queries")
+		for name, query, params in _tool_queries(embedding or []):
+			if embedding is None and "embedding" in params:
+				continue
+			t = time.perf_counter()
+			try:
+				await session.execute_read(query, **params)
+			except Exception as e:
+				logger.warning(f"Warm-up: {name} query failed: {e}")
+			timings[name] = (time.perf_counter() - t) * 1000
+
+	logger.info(
+		f"Warm-up: {connections} connections and {len(timings) - 1} queries in {(time.perf_counter() - t0) * 1000:.0f}ms "
+		f"(slowest {max(timings, key=timings.get)} {max(timings.values()):.0f}ms)"
+	)
+	return timings
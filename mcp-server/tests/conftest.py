@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The server's modules are flat, imported by name as main.py does
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "serka-mcp"))
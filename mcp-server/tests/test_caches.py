@@ -0,0 +1,129 @@
+import sys
+import types
+
+import pytest
+
+import caches
+from caches import QueryEmbeddingCache, RerankScoreCache, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+	now = types.SimpleNamespace(value=1000.0)
+	monkeypatch.setattr(
+		caches, "time", types.SimpleNamespace(monotonic=lambda: now.value)
+	)
+	return now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+	cache = TTLCache(maxsize=2, ttl=0)
+	cache.put("a", 1)
+	cache.put("b", 2)
+	cache.get("a")
+	cache.put("c", 3)
+
+	assert cache.get("b") is None
+	assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_ttl_cache_expires_entries(clock):
+	cache = TTLCache(maxsize=10, ttl=60)
+	cache.put("a", 1)
+	clock.value += 59
+	assert cache.get("a") == 1
+	clock.value += 2
+	assert cache.get("a") is None
+	assert len(cache) == 0
+
+
+def test_ttl_cache_of_size_zero_stores_nothing():
+	cache = TTLCache(maxsize=0)
+	cache.put("a", 1)
+
+	assert cache.get("a") is None
+	assert cache.stats()["misses"] == 1
+
+
+def test_query_embedding_cache_embeds_each_normalised_term_once():
+	calls = []
+	cache = QueryEmbeddingCache(
+		lambda text: calls.append(text) or [0.1, 0.2], model="m"
+	)
+
+	assert cache.lookup("Soil  Moisture") == ([0.1, 0.2], "model")
+	assert cache.lookup(" soil moisture") == ([0.1, 0.2], "memory")
+	assert calls == ["Soil  Moisture"]
+
+
+def test_query_embedding_cache_keys_on_model_and_dimensions():
+	calls = []
+	cache = QueryEmbeddingCache(
+		lambda text: calls.append(text) or [0.0], model="m", dimensions=256
+	)
+	cache.memory.put(("m", 512, "rain"), [1.0])
+
+	assert cache.get("rain") == [0.0]
+	assert calls == ["rain"]
+
+
+def test_query_embedding_cache_reembeds_after_ttl(clock):
+	calls = []
+	cache = QueryEmbeddingCache(
+		lambda text: calls.append(text) or [0.0], model="m", ttl=10
+	)
+	cache.get("rain")
+	clock.value += 11
+	cache.get("rain")
+
+	assert calls == ["rain", "rain"]
+
+
+def test_query_embedding_cache_reads_and_writes_the_disk_store(monkeypatch):
+	saved = {}
+	store = types.SimpleNamespace(
+		get_embedding=lambda text, model, dimensions: saved.get(
+			(text, model, dimensions)
+		),
+		save_embedding=lambda text, embedding, model, dimensions: saved.update(
+			{(text, model, dimensions): embedding}
+		),
+	)
+	monkeypatch.setitem(sys.modules, "serka", types.SimpleNamespace(cache=store))
+
+	assert QueryEmbeddingCache(lambda text: [0.5], model="m", disk=True).lookup(
+		"rain"
+	) == ([0.5], "model")
+	assert QueryEmbeddingCache(lambda text: [9.9], model="m", disk=True).lookup(
+		"rain"
+	) == ([0.5], "disk")
+
+
+def test_rerank_score_cache_round_trip_and_eviction():
+	cache = RerankScoreCache(maxsize=2)
+	cache.put_many("Rivers", ["a", "b", "c"], [0.1, 0.2, 0.3])
+
+	assert cache.get_many("rivers", ["a", "b", "c"]) == [None, 0.2, 0.3]
+
+
+def test_rerank_score_cache_drops_scores_on_a_new_generation():
+	cache = RerankScoreCache()
+	cache.set_generation(1)
+	cache.put_many("rivers", ["a"], [0.5])
+	cache.set_generation(1)
+	assert cache.get_many("rivers", ["a"]) == [0.5]
+
+	cache.set_generation(2)
+	assert cache.get_many("rivers", ["a"]) == [None]
+	assert cache.stats()["generation"] == 2
+
+
+def test_rerank_score_cache_checks_generation_at_its_interval(clock):
+	cache = RerankScoreCache(generation_interval=30)
+	assert cache.generation_due()
+
+	cache.set_generation(1)
+	clock.value += 29
+	assert not cache.generation_due()
+	clock.value += 1
+	assert cache.generation_due()
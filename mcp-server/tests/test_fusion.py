@@ -0,0 +1,73 @@
+import pytest
+
+from fusion import FUSION_METHODS, fuse
+
+_KEYS = [["a", "b", "c"], ["c", "d"]]
+_SCORES = [[0.9, 0.8, 0.1], [12.0, 3.0]]
+
+
+def _ranking(fused):
+	return [key for key, _ in fused]
+
+
+def test_rrf_sums_reciprocal_ranks():
+	fused = dict(fuse(_KEYS, _SCORES, method="rrf", k=60))
+
+	assert fused["c"] == pytest.approx(1 / 63 + 1 / 61)
+	assert fused["a"] == pytest.approx(1 / 61)
+	assert _ranking(fuse(_KEYS, _SCORES, method="rrf"))[0] == "c"
+
+
+def test_rrf_ignores_weights():
+	assert fuse(_KEYS, _SCORES, method="rrf", weights=[5, 1]) == fuse(
+		_KEYS, _SCORES, method="rrf"
+	)
+
+
+def test_weighted_rrf_favours_the_heavier_list():
+	assert _ranking(fuse(_KEYS, _SCORES, method="weighted_rrf", weights=[1, 0]))[
+		:3
+	] == ["a", "b", "c"]
+	assert _ranking(fuse(_KEYS, _SCORES, method="weighted_rrf", weights=[0, 1]))[
+		:2
+	] == ["c", "d"]
+
+
+def test_minmax_scales_each_list_to_unit_range():
+	fused = dict(fuse(_KEYS, _SCORES, method="minmax"))
+
+	# c is last in the first list (0) and first in the second (1)
+	assert fused["c"] == pytest.approx(1.0)
+	assert fused["a"] == pytest.approx(1.0)
+	# d is missing from the first list, so gets that list's lowest score
+	assert fused["d"] == pytest.approx(0.0)
+
+
+def test_zscore_is_scale_invariant():
+	scaled = [[s * 100 for s in _SCORES[0]], _SCORES[1]]
+
+	assert _ranking(fuse(_KEYS, scaled, method="zscore")) == _ranking(
+		fuse(_KEYS, _SCORES, method="zscore")
+	)
+
+
+@pytest.mark.parametrize("method", FUSION_METHODS)
+def test_empty_lists_are_skipped(method):
+	assert fuse([[], []], [[], []], method=method) == []
+	assert _ranking(
+		fuse([["a", "b"], []], [[0.5, 0.2], []], method=method, weights=[1, 1])
+	) == ["a", "b"]
+
+
+@pytest.mark.parametrize("method", FUSION_METHODS)
+def test_every_candidate_appears_once(method):
+	fused = fuse(
+		[["a", "b", "a"], ["b", "c"]], [[0.9, 0.5, 0.1], [1.0, 0.5]], method=method
+	)
+
+	assert sorted(_ranking(fused)) == ["a", "b", "c"]
+
+
+def test_unknown_method_is_rejected():
+	with pytest.raises(ValueError):
+		fuse(_KEYS, _SCORES, method="borda")
@@ -0,0 +1,97 @@
+import time
+import types
+
+import pytest
+
+import geocoding
+from geocoding import Gazetteer, GeocodeCache
+from models import BoundingBox, GeoCodedLocation
+
+
+def _location(name):
+	return GeoCodedLocation(
+		name=name, boundary=BoundingBox(south=50.0, north=51.0, west=-2.0, east=-1.0)
+	)
+
+
+@pytest.fixture
+def gazetteer():
+	names = [
+		"Kentish Town",
+		"Kenton",
+		"Wellsbourne",
+		"Bristol",
+		"Edinburgh",
+		"Cambridge",
+		"Cambridge Heath",
+	]
+	return Gazetteer([(name, _location(name), 0.5) for name in names])
+
+
+def test_gazetteer_exact_match_ignores_case_and_spacing(gazetteer):
+	location, kind = gazetteer.lookup("  bristol ")
+
+	assert (location.name, kind) == ("Bristol", "exact")
+
+
+def test_gazetteer_matches_a_unique_close_prefix(gazetteer):
+	location, kind = gazetteer.lookup("Edinburg")
+
+	assert (location.name, kind) == ("Edinburgh", "prefix")
+
+
+def test_gazetteer_matches_a_close_misspelling(gazetteer):
+	location, kind = gazetteer.lookup("Cambrige")
+
+	assert (location.name, kind) == ("Cambridge", "fuzzy")
+
+
+@pytest.mark.parametrize("place", ["Kent", "Wells", "Bristow", "Cambr", "Glasgow"])
+def test_gazetteer_leaves_uncertain_places_to_nominatim(gazetteer, place):
+	assert gazetteer.lookup(place) is None
+
+
+def test_gazetteer_keeps_the_most_important_duplicate():
+	gazetteer = Gazetteer(
+		[
+			("Newport", _location("Newport, Wales"), 0.7),
+			("Newport", _location("Newport, IoW"), 0.4),
+		]
+	)
+
+	assert gazetteer.lookup("Newport")[0].name == "Newport, Wales"
+	assert gazetteer.stats()["hits"] == 1
+
+
+def test_geocode_cache_round_trip(tmp_path):
+	cache = GeocodeCache(tmp_path / "geocodes.sqlite3")
+	cache.put("Lake District", _location("Lake District, England"))
+
+	assert cache.get("lake  district").name == "Lake District, England"
+	assert cache.get("Peak District") is None
+	assert GeocodeCache(tmp_path / "geocodes.sqlite3").get("Lake District") is not None
+
+
+def test_geocode_cache_remembers_places_not_found(tmp_path):
+	cache = GeocodeCache(tmp_path / "geocodes.sqlite3")
+	assert not cache.known_missing("Atlantis")
+
+	cache.put_missing("Atlantis")
+	assert cache.known_missing("atlantis")
+
+	cache.put("Atlantis", _location("Atlantis"))
+	assert not cache.known_missing("Atlantis")
+
+
+def test_geocode_cache_entries_expire(tmp_path, monkeypatch):
+	now = time.time()
+	monkeypatch.setattr(geocoding, "time", types.SimpleNamespace(time=lambda: now))
+	cache = GeocodeCache(tmp_path / "geocodes.sqlite3", ttl=60, missing_ttl=10)
+	cache.put("Bath", _location("Bath"))
+	cache.put_missing("Atlantis")
+	now += 30
+
+	assert cache.get("Bath") is not None
+	assert not cache.known_missing("Atlantis")
+	now += 31
+	assert cache.get("Bath") is None
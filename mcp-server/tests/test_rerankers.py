@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from rerankers import predict_within_budget, rerank_order
+
+_PAIRS = [("rivers", f"passage {i}") for i in range(10)]
+
+
+def _predict(delay=0.0):
+	batches = []
+
+	def predict(pairs):
+		batches.append(len(pairs))
+		time.sleep(delay)
+		return [float(len(passage)) for _, passage in pairs]
+
+	return predict, batches
+
+
+def test_without_a_deadline_every_pair_is_scored_in_batches():
+	predict, batches = _predict()
+	scores = asyncio.run(predict_within_budget(predict, _PAIRS, 4, float("inf")))
+
+	assert scores == [9.0] * 10
+	assert batches == [4, 4, 2]
+
+
+def test_no_batch_starts_after_the_deadline():
+	predict, batches = _predict(delay=0.05)
+	deadline = time.perf_counter() + 0.075
+	scores = asyncio.run(predict_within_budget(predict, _PAIRS, 2, deadline))
+
+	assert batches == [2, 2]
+	assert len(scores) == 4
+
+
+def test_a_passed_deadline_scores_nothing():
+	predict, batches = _predict()
+	scores = asyncio.run(predict_within_budget(predict, _PAIRS, 4, time.perf_counter()))
+
+	assert scores == [] and batches == []
+
+
+def test_rerank_order_puts_unscored_candidates_last_in_fused_order():
+	order = rerank_order([0.2, None, 0.9, None])
+
+	assert order == [(2, 0.9), (0, 0.2), (1, 0.2), (3, 0.2)]
+
+
+def test_rerank_order_keeps_fusion_scores_when_nothing_was_scored():
+	assert rerank_order([None, None]) == [(0, None), (1, None)]
@@ -0,0 +1,70 @@
+"""
+Compare warm-cache lookup throughput of the legacy JSON embedding cache and the packed store.
+
+Usage:
+	uv run scripts/benchmark-embedding-cache.py [n] [--dim 1024]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import serka.cache as cache
+
+
+def _bench(label: str, fn, contents: list[str]) -> None:
+	t0 = time.perf_counter()
+	# Keep the results alive, as the embedders do, so all modes pay the same allocation cost
+	results = [fn(content) for content in contents]
+	assert None not in results
+	elapsed = time.perf_counter() - t0
+	print(
+		f"{label:<8} {len(contents) / elapsed:>12,.0f} lookups/s ({elapsed * 1000:.0f}ms)"
+	)
+
+
+def _legacy_get(content: str):
+	p = cache.root / "embeddings" / f"{cache._key(content).hex()}.json"
+	if p.exists():
+		return json.loads(p.read_text())
+	return None
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Benchmark embedding cache lookups")
+	parser.add_argument(
+		"n", type=int, default=5000, nargs="?", help="Number of embeddings"
+	)
+	parser.add_argument("--dim", type=int, default=1024, help="Embedding dimension")
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as tmp:
+		cache.root = Path(tmp)
+		contents = [f"benchmark document {i}" for i in range(args.n)]
+		legacy_dir = cache._dir("embeddings")
+		for content in contents:
+			embedding = [random.random() for _ in range(args.dim)]
+			(legacy_dir / f"{cache._key(content).hex()}.json").write_text(
+				json.dumps(embedding)
+			)
+			cache.save_embedding(content, embedding)
+
+		random.shuffle(contents)
+		# First pass warms the page cache for both layouts
+		for content in contents:
+			_legacy_get(content)
+			cache.get_embedding(content)
+
+		_bench("json", _legacy_get, contents)
+		_bench("packed", cache.get_embedding, contents)
+
+		t0 = time.perf_counter()
+		assert None not in cache.get_embeddings(contents)
+		elapsed = time.perf_counter() - t0
+		print(
+			f"{'batch':<8} {len(contents) / elapsed:>12,.0f} lookups/s ({elapsed * 1000:.0f}ms)"
+		)
+		cache._store().close()
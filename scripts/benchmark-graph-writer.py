@@ -0,0 +1,101 @@
+"""
+Compare Neo4jGraphWriter throughput in create and upsert mode on synthetic data, and
+with a single writer session against a pool of concurrent sessions.
+
+WARNING: deletes every node in the target database. Only run it against a throwaway
+local Neo4j, e.g. `podman-compose up neo4j -d` with an empty NEO4J_DATA_DIR.
+
+Usage:
+	uv run scripts/benchmark-graph-writer.py --wipe [--datasets 2000] [--dim 1024] [--workers 4]
+"""
+
+import argparse
+import random
+import time
+
+from haystack import Document
+
+from serka.graph.writers import Neo4jGraphWriter, WriteMetrics
+from serka.settings import Settings
+
+
+def _synthetic(n_datasets: int, dim: int):
+	datasets = [
+		{"uri": f"https://doi.org/bench/{i}", "title": f"Dataset {i}"}
+		for i in range(n_datasets)
+	]
+	people = [
+		{"uri": f"https://orcid.org/bench/{i}", "name": f"Person {i}"}
+		for i in range(n_datasets // 2)
+	]
+	authored_by = [(d["uri"], random.choice(people)["uri"]) for d in datasets]
+	docs = [
+		Document(
+			content=f"chunk {j} of dataset {i}",
+			meta={"field": "description", "uri": d["uri"]},
+			embedding=[random.random() for _ in range(dim)],
+		)
+		for i, d in enumerate(datasets)
+		for j in range(3)
+	]
+	return {"Dataset": datasets, "Person": people}, {"AUTHORED_BY": authored_by}, docs
+
+
+def _wipe(writer: Neo4jGraphWriter) -> None:
+	with writer._driver.session(database="neo4j") as session:
+		session.run(
+			"MATCH (n) CALL (n) { DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS"
+		).consume()
+
+
+def _run(label: str, writer: Neo4jGraphWriter, nodes, relations, docs) -> None:
+	rows = (
+		sum(len(v) for v in nodes.values())
+		+ len(docs)
+		+ sum(len(v) for v in relations.values())
+	)
+	writer._written_uris.clear()
+	t0 = time.perf_counter()
+	result = writer.run(nodes=nodes, relations=relations, docs=docs)
+	elapsed = time.perf_counter() - t0
+	metrics = WriteMetrics()
+	metrics.update(result["metrics"])
+	print(f"{label:<24} {rows / elapsed:>10,.0f} rows/s ({elapsed:.1f}s)")
+	print(f"{'':<24} {metrics.summary()}")
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Benchmark Neo4jGraphWriter create vs upsert"
+	)
+	parser.add_argument(
+		"--wipe", action="store_true", help="Confirm that the database may be wiped"
+	)
+	parser.add_argument(
+		"--datasets", type=int, default=2000, help="Number of synthetic datasets"
+	)
+	parser.add_argument("--dim", type=int, default=1024, help="Embedding dimension")
+	parser.add_argument(
+		"--workers", type=int, default=4, help="Concurrent writer sessions"
+	)
+	args = parser.parse_args()
+	if not args.wipe:
+		parser.error(
+			"this benchmark deletes all data in the database; pass --wipe to confirm"
+		)
+
+	s = Settings()
+	nodes, relations, docs = _synthetic(args.datasets, args.dim)
+	auth = (s.neo4j_host, s.neo4j_port, s.neo4j_username, s.neo4j_password)
+	serial = Neo4jGraphWriter(*auth, max_workers=1)
+	create = Neo4jGraphWriter(*auth, max_workers=args.workers)
+	upsert = Neo4jGraphWriter(*auth, upsert=True, max_workers=args.workers)
+
+	_wipe(create)
+	_run("create (1 session)", serial, nodes, relations, docs)
+	_wipe(create)
+	_run(f"create ({args.workers} sessions)", create, nodes, relations, docs)
+	_wipe(create)
+	_run("upsert (empty db)", upsert, nodes, relations, docs)
+	_run("upsert (re-run)", upsert, nodes, relations, docs)
+	_wipe(create)
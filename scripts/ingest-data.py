@@ -1,7 +1,10 @@
 import argparse
 import logging
+from collections import Counter
 from tqdm.contrib.logging import logging_redirect_tqdm
 
+from serka.fetchers import EIDCFetcher
+from serka.graph.writers import WriteMetrics
 from serka.pipelines import PipelineBuilder
 from serka.settings import Settings
 
@@ -20,7 +23,10 @@ def create_pipeline_builder() -> PipelineBuilder:
 		mcp_host=s.mcp_host,
 		mcp_port=s.mcp_port,
 		models_embedding=s.models_embedding,
+		models_embedding_dimensions=s.models_embedding_dimensions,
 		models_llm=s.models_llm,
+		fetch_max_workers=s.fetch_max_workers,
+		neo4j_write_workers=s.neo4j_write_workers,
 		chunk_length=150,
 		chunk_overlap=50,
 	)
@@ -42,6 +48,22 @@ if __name__ == "__main__":
 		type=greater_than_zero,
 		nargs="?",
 	)
+	parser.add_argument(
+		"--page-size",
+		type=greater_than_zero,
+		default=None,
+		help="Fetch and ingest records a page at a time instead of all at once",
+	)
+	parser.add_argument(
+		"--incremental",
+		action="store_true",
+		help="Re-download EIDC records and only re-ingest datasets that changed since the last run",
+	)
+	parser.add_argument(
+		"--upsert",
+		action="store_true",
+		help="MERGE into the graph instead of CREATE, so re-running does not duplicate nodes",
+	)
 	parser.add_argument("--debug", action="store_true", help="Enable DEBUG logging")
 	args = parser.parse_args()
 
@@ -51,11 +73,51 @@ if __name__ == "__main__":
 	)
 	file_handler = logging.FileHandler("ingest.log")
 	file_handler.setLevel(logging.WARNING)
-	file_handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+	file_handler.setFormatter(
+		logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s")
+	)
 	logging.getLogger().addHandler(file_handler)
 
 	pb = create_pipeline_builder()
-	p = pb.build_graph_pipeline()
 	with logging_redirect_tqdm():
-		result = p.run(data={"eidc_fetcher": {"rows": args.n}})
-	logger.info(f"{result['graph_writer']}")
+		if args.page_size:
+			p = pb.build_graph_pipeline(
+				paged=True, incremental=args.incremental, upsert=args.upsert
+			)
+			fetcher = EIDCFetcher(
+				max_workers=pb.fetch_max_workers, refresh=args.incremental
+			)
+			totals: dict = {"nodes_created": Counter(), "relations_created": Counter()}
+			write_metrics = WriteMetrics()
+			for i, page in enumerate(
+				fetcher.iter_pages(rows=args.n, page_size=args.page_size), start=1
+			):
+				result = p.run(
+					data=PipelineBuilder.record_inputs(
+						page, incremental=args.incremental
+					)
+				)
+				writer_result = result["graph_writer"]
+				page_counts = {key: writer_result[key] for key in totals}
+				logger.info(f"Page {i} ({len(page)} records): {page_counts}")
+				for key, counts in totals.items():
+					counts.update(page_counts[key])
+				write_metrics.update(writer_result["metrics"])
+			generation = p.get_component("graph_writer").finish_ingest()
+			if generation is not None:
+				logger.info("Ingest generation: %d", generation)
+			logger.info(
+				"Total: %s", {key: dict(counts) for key, counts in totals.items()}
+			)
+			logger.info("Total graph write: %s", write_metrics.summary())
+		else:
+			p = pb.build_graph_pipeline(
+				incremental=args.incremental, upsert=args.upsert
+			)
+			result = p.run(data={"eidc_fetcher": {"rows": args.n}})
+			writer_result = result["graph_writer"]
+			counts = {
+				key: writer_result[key]
+				for key in ("nodes_created", "relations_created")
+			}
+			logger.info(f"{counts}")
@@ -0,0 +1,54 @@
+"""
+Migrate the one-JSON-file-per-vector embedding cache into the packed embedding store.
+
+Usage:
+	uv run scripts/migrate-embedding-cache.py [--src .cache/embeddings] [--remove]
+		[--model <model-id> [--dimensions <dims>]]
+
+The embeddings go into the namespace of MODELS_EMBEDDING / MODELS_EMBEDDING_DIMENSIONS
+unless a model is given.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import serka.cache as cache
+
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Migrate JSON embeddings into the packed store"
+	)
+	parser.add_argument(
+		"--src", type=Path, default=None, help="Directory of <sha256>.json embeddings"
+	)
+	parser.add_argument(
+		"--remove", action="store_true", help="Delete JSON files once migrated"
+	)
+	parser.add_argument(
+		"--model",
+		help="Embedding model id of the vectors (defaults to MODELS_EMBEDDING)",
+	)
+	parser.add_argument(
+		"--dimensions", type=int, help="Their dimension, if one was requested"
+	)
+	args = parser.parse_args()
+
+	logging.basicConfig(
+		level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s"
+	)
+
+	model, dimensions = (
+		(args.model, args.dimensions) if args.model else cache._configured_model()
+	)
+	migrated = cache.migrate_json_embeddings(
+		args.src, remove=args.remove, model=model, dimensions=dimensions
+	)
+	logger.info(
+		"Migrated %d embedding(s) into %s",
+		migrated,
+		cache._store(model, dimensions).path,
+	)
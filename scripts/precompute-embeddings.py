@@ -0,0 +1,62 @@
+"""
+Fill the embedding cache namespace of another model without writing to Neo4j.
+
+Runs the ingest pipeline up to the embedders so that a later ingest with the new
+MODELS_EMBEDDING / MODELS_EMBEDDING_DIMENSIONS is served from cache. Each model and
+dimension pair has its own cache directory, so this can run alongside an ingest that
+is still using the current model.
+
+Usage:
+	uv run scripts/precompute-embeddings.py <n> --model <model-id> [--dimensions <dims>]
+"""
+
+import argparse
+import logging
+from tqdm.contrib.logging import logging_redirect_tqdm
+
+from serka.pipelines import PipelineBuilder
+from serka.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Precompute embeddings for a model")
+	parser.add_argument(
+		"n", help="Number of rows to process", default=10, type=int, nargs="?"
+	)
+	parser.add_argument(
+		"--model", help="Embedding model id (defaults to MODELS_EMBEDDING)"
+	)
+	parser.add_argument(
+		"--dimensions",
+		type=int,
+		help="Embedding dimensions (defaults to MODELS_EMBEDDING_DIMENSIONS)",
+	)
+	args = parser.parse_args()
+
+	logging.basicConfig(
+		level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s"
+	)
+
+	s = Settings()
+	pb = PipelineBuilder(
+		neo4j_host=s.neo4j_host,
+		neo4j_port=s.neo4j_port,
+		neo4j_user=s.neo4j_username,
+		neo4j_password=s.neo4j_password,
+		legilo_user=s.legilo_username,
+		legilo_password=s.legilo_password,
+		mcp_host=s.mcp_host,
+		mcp_port=s.mcp_port,
+		models_embedding=args.model or s.models_embedding,
+		models_embedding_dimensions=args.dimensions or s.models_embedding_dimensions,
+		models_llm=s.models_llm,
+		fetch_max_workers=s.fetch_max_workers,
+		chunk_length=150,
+		chunk_overlap=50,
+	)
+	p = pb.build_embedding_pipeline()
+	with logging_redirect_tqdm():
+		p.run(data={"eidc_fetcher": {"rows": args.n}})
+	logger.info("Embeddings cached for %s", pb.models_embedding)
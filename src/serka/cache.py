@@ -1,14 +1,25 @@
+import array
 import hashlib
 import json
 import logging
+import mmap
 import os
+import re
+import struct
+import threading
 from pathlib import Path
-from typing import Any, Optional
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 root = Path(os.environ.get("SERKA_CACHE_DIR", ".cache"))
 
+# sha256 digest, segment number, byte offset, vector dimension
+_INDEX_RECORD = struct.Struct("<32sIQI")
+_SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+
+DEFAULT_MODEL = "amazon.titan-embed-text-v2:0"
+
 
 def _dir(*parts: str) -> Path:
 	p = root.joinpath(*parts)
@@ -16,14 +27,336 @@ def _dir(*parts: str) -> Path:
 	return p
 
 
-def get_embedding(content: str) -> Optional[list[float]]:
-	h = hashlib.sha256(content.encode()).hexdigest()
-	p = root / "embeddings" / f"{h}.json"
-	if p.exists():
-		return json.loads(p.read_text())
-	return None
+def _key(content: str) -> bytes:
+	return hashlib.sha256(content.encode()).digest()
+
+
+class EmbeddingStore:
+	"""
+	Append-only packed store of float32 embedding vectors.
+
+	Vectors are appended to ``seg-NNNNN.f32`` segment files and located through an
+	``index.bin`` of fixed-size (sha256, segment, offset, dim) records that is loaded
+	into memory on open. Segments are read through mmap, so a warm lookup is a dict
+	probe and a slice copy rather than a file open and a JSON parse.
+	Args:
+		path (Path): Directory holding the segment and index files.
+		dimensions (int): If set, vectors of any other length are rejected.
+		segment_max_bytes (int): Size at which a new segment file is started.
+	"""
+
+	def __init__(
+		self,
+		path: Path,
+		dimensions: Optional[int] = None,
+		segment_max_bytes: int = _SEGMENT_MAX_BYTES,
+	):
+		self.path = path
+		self.dimensions = dimensions
+		self.segment_max_bytes = segment_max_bytes
+		self._lock = threading.Lock()
+		self._offsets: dict[bytes, tuple[int, int, int]] = {}
+		self._maps: dict[int, mmap.mmap] = {}
+		self._active = 0
+		self._segment_file = None
+		self._index_file = None
+		self._load_index()
+
+	def __len__(self) -> int:
+		return len(self._offsets)
+
+	def __contains__(self, key: bytes) -> bool:
+		return key in self._offsets
+
+	def _segment_path(self, segment: int) -> Path:
+		return self.path / f"seg-{segment:05d}.f32"
+
+	def _load_index(self) -> None:
+		self.path.mkdir(parents=True, exist_ok=True)
+		index = self.path / "index.bin"
+		data = index.read_bytes() if index.exists() else b""
+		usable = len(data) - len(data) % _INDEX_RECORD.size
+		if usable != len(data):
+			# A crash mid-append can leave a partial record; drop it so appends stay aligned
+			logger.warning(
+				"Embedding index %s has a truncated trailing record; discarding it",
+				index,
+			)
+			with open(index, "r+b") as f:
+				f.truncate(usable)
+
+		sizes: dict[int, int] = {}
+		for key, segment, offset, dim in _INDEX_RECORD.iter_unpack(data[:usable]):
+			if segment not in sizes:
+				p = self._segment_path(segment)
+				sizes[segment] = p.stat().st_size if p.exists() else 0
+			if offset + dim * 4 > sizes[segment]:
+				logger.warning(
+					"Embedding index entry %s points past end of segment %d; ignoring",
+					key.hex(),
+					segment,
+				)
+				continue
+			self._offsets[key] = (segment, offset, dim)
+			self._active = max(self._active, segment)
+
+	def _map(self, segment: int, end: int) -> mmap.mmap:
+		mm = self._maps.get(segment)
+		if mm is None or len(mm) < end:
+			# Segment has grown since it was mapped; readers holding the old map keep it alive
+			with open(self._segment_path(segment), "rb") as f:
+				mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+			self._maps[segment] = mm
+		return mm
+
+	def _writer(self):
+		if (
+			self._segment_file is not None
+			and self._segment_file.tell() >= self.segment_max_bytes
+		):
+			self._segment_file.close()
+			self._segment_file = None
+			self._active += 1
+		if self._segment_file is None:
+			self._segment_file = open(self._segment_path(self._active), "ab")
+			if self._segment_file.tell() >= self.segment_max_bytes:
+				return self._writer()
+		if self._index_file is None:
+			self._index_file = open(self.path / "index.bin", "ab")
+		return self._segment_file
+
+	def get(self, key: bytes) -> Optional[list[float]]:
+		loc = self._offsets.get(key)
+		if loc is None:
+			return None
+		segment, offset, dim = loc
+		end = offset + dim * 4
+		vec = array.array("f")
+		vec.frombytes(self._map(segment, end)[offset:end])
+		return vec.tolist()
+
+	def get_many(self, keys: list[bytes]) -> list[Optional[list[float]]]:
+		found: list[Optional[list[float]]] = [None] * len(keys)
+		hits = [
+			(self._offsets[key], i)
+			for i, key in enumerate(keys)
+			if key in self._offsets
+		]
+		# Visit hits in on-disk order so each segment is mapped once and read front to back
+		hits.sort()
+		for (segment, offset, dim), i in hits:
+			end = offset + dim * 4
+			vec = array.array("f")
+			vec.frombytes(self._map(segment, end)[offset:end])
+			found[i] = vec.tolist()
+		return found
+
+	def put(self, key: bytes, embedding: list[float]) -> None:
+		self.put_many([(key, embedding)], sync=False)
+
+	def put_many(
+		self, items: list[tuple[bytes, list[float]]], sync: bool = True
+	) -> None:
+		with self._lock:
+			f = self._writer()
+			offset = f.tell()
+			vectors = bytearray()
+			records = bytearray()
+			added: dict[bytes, tuple[int, int, int]] = {}
+			for key, embedding in items:
+				if key in self._offsets or key in added:
+					continue
+				vec = array.array("f", embedding)
+				if self.dimensions is not None and len(vec) != self.dimensions:
+					raise ValueError(
+						f"Embedding has {len(vec)} dimensions, store {self.path} expects {self.dimensions}"
+					)
+				added[key] = (self._active, offset + len(vectors), len(vec))
+				records += _INDEX_RECORD.pack(key, *added[key])
+				vectors += vec.tobytes()
+			if not added:
+				return
+			# Vector bytes must be on disk before the index records that point at them
+			f.write(vectors)
+			f.flush()
+			if sync:
+				os.fsync(f.fileno())
+			self._index_file.write(records)
+			self._index_file.flush()
+			if sync:
+				os.fsync(self._index_file.fileno())
+			self._offsets.update(added)
+
+	def close(self) -> None:
+		with self._lock:
+			for f in (self._segment_file, self._index_file):
+				if f is not None:
+					f.close()
+			self._segment_file = None
+			self._index_file = None
+			self._maps.clear()
+
+
+_stores: dict[Path, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def namespace(model: str = DEFAULT_MODEL, dimensions: Optional[int] = None) -> str:
+	"""
+	Directory name under ``<cache root>/vectors`` holding the embeddings of one model/dimension pair.
+	Args:
+		model (str): Embedding model id, e.g. ``amazon.titan-embed-text-v2:0``.
+		dimensions (int): Requested output dimension, None for the model's default.
+	"""
+	safe_model = re.sub(r"[^A-Za-z0-9._-]", "_", model)
+	return f"{safe_model}-{dimensions or 'default'}"
+
+
+def _store(
+	model: str = DEFAULT_MODEL, dimensions: Optional[int] = None
+) -> EmbeddingStore:
+	ns = namespace(model, dimensions)
+	path = root / "vectors" / ns
+	with _stores_lock:
+		if path not in _stores:
+			_stores[path] = EmbeddingStore(_dir("vectors", ns), dimensions=dimensions)
+		return _stores[path]
+
+
+def _configured_model() -> tuple[str, Optional[int]]:
+	# The embedding model and dimensions ingest and search run with, as in serka.settings
+	model = os.environ.get("MODELS_EMBEDDING", DEFAULT_MODEL)
+	dimensions = os.environ.get("MODELS_EMBEDDING_DIMENSIONS")
+	return model, int(dimensions) if dimensions else None
+
+
+def _legacy_path(
+	key: bytes, model: str = DEFAULT_MODEL, dimensions: Optional[int] = None
+) -> Optional[Path]:
+	# The one-file-per-vector cache predates namespacing and holds vectors of the model the
+	# deployment is configured with, so it is only served from that model's namespace
+	if namespace(model, dimensions) != namespace(*_configured_model()):
+		return None
+	return root / "embeddings" / f"{key.hex()}.json"
+
+
+def _read_legacy(
+	key: bytes, model: str = DEFAULT_MODEL, dimensions: Optional[int] = None
+) -> Optional[list[float]]:
+	path = _legacy_path(key, model, dimensions)
+	if path is None or not path.exists():
+		return None
+	embedding = json.loads(path.read_text())
+	# Vectors cached before dimensions were requested from Titan have the model's default size
+	if dimensions is not None and len(embedding) != dimensions:
+		return None
+	return embedding
+
+
+def get_embedding(
+	content: str, model: str = DEFAULT_MODEL, dimensions: Optional[int] = None
+) -> Optional[list[float]]:
+	key = _key(content)
+	store = _store(model, dimensions)
+	cached = store.get(key)
+	if cached is not None:
+		return cached
+	# Fall back to the one-file-per-vector layout and promote hits into the packed store
+	embedding = _read_legacy(key, model, dimensions)
+	if embedding is not None:
+		store.put(key, embedding)
+	return embedding
+
+
+def get_embeddings(
+	contents: list[str], model: str = DEFAULT_MODEL, dimensions: Optional[int] = None
+) -> list[Optional[list[float]]]:
+	"""
+	Look up the cached embeddings for a batch of contents in a single pass over the store.
+	Args:
+		contents (list[str]): The texts whose embeddings are wanted.
+		model (str): Embedding model id the vectors must come from.
+		dimensions (int): Requested output dimension, None for the model's default.
+	Returns:
+		list[Optional[list[float]]]: One entry per content, None where nothing is cached.
+	"""
+	keys = [_key(content) for content in contents]
+	store = _store(model, dimensions)
+	found = store.get_many(keys)
+	promoted = []
+	for i, key in enumerate(keys):
+		if found[i] is None:
+			found[i] = _read_legacy(key, model, dimensions)
+			if found[i] is not None:
+				promoted.append((key, found[i]))
+	if promoted:
+		store.put_many(promoted)
+	return found
+
+
+def save_embedding(
+	content: str,
+	embedding: list[float],
+	model: str = DEFAULT_MODEL,
+	dimensions: Optional[int] = None,
+) -> None:
+	_store(model, dimensions).put(_key(content), embedding)
+
+
+def save_embeddings(
+	pairs: list[tuple[str, list[float]]],
+	model: str = DEFAULT_MODEL,
+	dimensions: Optional[int] = None,
+) -> None:
+	"""
+	Append a batch of (content, embedding) pairs to the store with a single write and fsync.
+	Args:
+		pairs (list[tuple[str, list[float]]]): The texts and their embeddings.
+		model (str): Embedding model id that produced the vectors.
+		dimensions (int): Requested output dimension, None for the model's default.
+	"""
+	if pairs:
+		_store(model, dimensions).put_many(
+			[(_key(content), embedding) for content, embedding in pairs]
+		)
 
 
-def save_embedding(content: str, embedding: list[float]) -> None:
-	h = hashlib.sha256(content.encode()).hexdigest()
-	(_dir("embeddings") / f"{h}.json").write_text(json.dumps(embedding))
+def migrate_json_embeddings(
+	src: Optional[Path] = None,
+	remove: bool = False,
+	model: Optional[str] = None,
+	dimensions: Optional[int] = None,
+) -> int:
+	"""
+	Copy ``<sha256>.json`` embeddings from the legacy cache directory into the packed store
+	of the model namespace they belong to.
+	Args:
+		src (Path): Directory of legacy JSON embeddings, defaults to ``<cache root>/embeddings``.
+		remove (bool): Delete each JSON file once it has been migrated.
+		model (str): Embedding model id that produced the vectors, defaults to MODELS_EMBEDDING.
+		dimensions (int): Their dimension, defaults to MODELS_EMBEDDING_DIMENSIONS when no
+			model is given. Vectors of any other length are skipped and kept.
+	Returns:
+		int: Number of embeddings added to the packed store.
+	"""
+	if model is None:
+		model, dimensions = _configured_model()
+	src = src or root / "embeddings"
+	store = _store(model, dimensions)
+	migrated = 0
+	for p in sorted(src.glob("*.json")):
+		try:
+			key = bytes.fromhex(p.stem)
+		except ValueError:
+			continue
+		if len(key) != 32:
+			continue
+		if key not in store:
+			embedding = json.loads(p.read_text())
+			if dimensions is not None and len(embedding) != dimensions:
+				continue
+			store.put(key, embedding)
+			migrated += 1
+		if remove:
+			p.unlink()
+	return migrated
@@ -1,6 +1,11 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import time
+import weakref
+import requests
 import requests_cache
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from haystack import component, Document
 from serka.cache import root as _cache_root
@@ -16,10 +21,33 @@ class _TimeoutSession(requests_cache.CachedSession):
 
 
 _session = _TimeoutSession(str(_cache_root / "http"), backend="filesystem")
+_pool_sizes: "weakref.WeakKeyDictionary[requests.Session, int]" = (
+	weakref.WeakKeyDictionary()
+)
 
 
-def _eidc_url(id: str) -> str:
-	return f"https://catalogue.ceh.ac.uk/documents/{id}?format=json"
+def _mount_pool(session: requests_cache.CachedSession, pool_size: int) -> None:
+	# requests keeps 10 connections per host by default; size the pool to the worker count
+	# so concurrent fetches reuse connections instead of opening and discarding them.
+	# Fetchers share the module session, so the pool only grows: a fetcher built later with
+	# fewer workers must not shrink the pool of one built earlier with more
+	if pool_size <= _pool_sizes.get(session, 0):
+		return
+	adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+	_pool_sizes[session] = pool_size
+
+
+def _get(
+	session: requests_cache.CachedSession, url: str, refresh: bool = False, **kwargs
+) -> requests.Response:
+	res = session.get(url, refresh=refresh, **kwargs)
+	if refresh and getattr(res, "from_cache", False) and not res.revalidated:
+		# Only responses with an ETag or Last-Modified can be revalidated; the cached copy of
+		# any other is as likely to be stale, so it is downloaded again
+		res = session.get(url, force_refresh=True, **kwargs)
+	return res
 
 
 @component
@@ -28,31 +56,135 @@ class EIDCFetcher:
 	Haystack fetcher component for retrieving dataset information from the EIDC API.
 	Args:
 		url (str): The URL of the EIDC API endpoint.
+		document_url (str): Format string for a single dataset's JSON; {id} is the dataset ID.
+		max_workers (int): Maximum number of dataset documents fetched concurrently.
+		refresh (bool): Revalidate every cached response with the server, so changes published
+			since the last run are seen. Records the server reports unchanged (a conditional
+			request answered 304 Not Modified) are served from the cache, not downloaded again.
+		session (CachedSession): HTTP session to use, defaults to the shared cached session.
 	"""
 
-	def __init__(self, url: str = "https://catalogue.ceh.ac.uk/eidc/documents"):
+	def __init__(
+		self,
+		url: str = "https://catalogue.ceh.ac.uk/eidc/documents",
+		document_url: str = "https://catalogue.ceh.ac.uk/documents/{id}?format=json",
+		max_workers: int = 8,
+		refresh: bool = False,
+		session: Optional[requests_cache.CachedSession] = None,
+	):
 		self.url = url
+		self.document_url = document_url
+		self.max_workers = max_workers
+		self.refresh = refresh
+		self._session = session or _session
+		_mount_pool(self._session, max_workers)
 
-	def get_eidc_json(self, ids: List[str]) -> List[Dict[Any, Any]]:
-		cached_ids = [id for id in ids if _session.cache.contains(url=_eidc_url(id))]
-		to_fetch = [id for id in ids if not _session.cache.contains(url=_eidc_url(id))]
+	def _fetch_eidc_json(self, id: str) -> Optional[Dict[Any, Any]]:
+		try:
+			res = _get(
+				self._session, self.document_url.format(id=id), refresh=self.refresh
+			)
+			if res.status_code != 200:
+				logger.warning("EIDC: HTTP %d for dataset %s", res.status_code, id)
+				return None
+			return res.json()
+		except Exception as e:
+			logger.error("EIDC: error fetching dataset %s: %s", id, e, exc_info=True)
+			return None
 
-		results = []
-		for id in tqdm(cached_ids, desc="Loading cached EIDC data", unit="dataset"):
-			results.append(_session.get(_eidc_url(id)).json())
+	def get_eidc_json(self, ids: List[str]) -> List[Dict[Any, Any]]:
+		t0 = time.perf_counter()
+		cached = (
+			0
+			if self.refresh
+			else sum(
+				self._session.cache.contains(url=self.document_url.format(id=id))
+				for id in ids
+			)
+		)
 
-		for id in tqdm(to_fetch, desc="Fetching EIDC data", unit="dataset"):
-			try:
-				res = _session.get(_eidc_url(id))
-				if res.status_code != 200:
-					logger.warning("EIDC: HTTP %d for dataset %s", res.status_code, id)
-					continue
-				results.append(res.json())
-			except Exception as e:
-				logger.error("EIDC: error fetching dataset %s: %s", id, e, exc_info=True)
+		# map() yields in submission order, so results keep the order of ids
+		with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+			fetched = list(
+				tqdm(
+					pool.map(self._fetch_eidc_json, ids),
+					total=len(ids),
+					desc="Fetching EIDC data",
+					unit="dataset",
+				)
+			)
+		results = [r for r in fetched if r is not None]
 
+		elapsed = time.perf_counter() - t0
+		logger.info(
+			"EIDC: %d dataset(s) (%d cached) in %.1fs, %.1f datasets/s",
+			len(results),
+			cached,
+			elapsed,
+			len(results) / elapsed if elapsed > 0 else 0.0,
+		)
 		return results
 
+	def _search_ids(self, rows: int, page: int, term: str, **kwargs) -> List[str]:
+		res = _get(
+			self._session,
+			self.url,
+			refresh=self.refresh,
+			params={"rows": rows, "page": page, "term": term, **kwargs},
+		)
+		return [record["identifier"] for record in res.json()["results"]]
+
+	def _fetch_page(
+		self, page_size: int, page: int, limit: int, term: str, **kwargs
+	) -> Tuple[List[Dict[Any, Any]], bool]:
+		ids = self._search_ids(page_size, page, term, **kwargs)
+		exhausted = len(ids) < page_size
+		return self.get_eidc_json(ids[:limit]) if ids else [], exhausted
+
+	def iter_pages(
+		self,
+		rows: int = 10000,
+		page_size: int = 100,
+		term: str = "state:published AND recordType:Dataset",
+		**kwargs,
+	) -> Iterator[List[Dict[Any, Any]]]:
+		"""
+		Yield dataset JSON one search page at a time, downloading the next page in the
+		background while the caller processes the current one. At most two pages of
+		records are held at once, whatever the size of the catalogue.
+		Args:
+			rows (int): Total number of datasets to yield.
+			page_size (int): Number of datasets requested per search page.
+			term (str): EIDC search term.
+		"""
+		with ThreadPoolExecutor(max_workers=1) as prefetch:
+			page = 1
+			remaining = rows
+			future = prefetch.submit(
+				self._fetch_page,
+				page_size,
+				page,
+				min(remaining, page_size),
+				term,
+				**kwargs,
+			)
+			while future is not None:
+				records, exhausted = future.result()
+				remaining -= page_size
+				future = None
+				if remaining > 0 and not exhausted:
+					page += 1
+					future = prefetch.submit(
+						self._fetch_page,
+						page_size,
+						page,
+						min(remaining, page_size),
+						term,
+						**kwargs,
+					)
+				if records:
+					yield records
+
 	@component.output_types(data=List[Dict[Any, Any]])
 	def run(
 		self,
@@ -61,22 +193,29 @@ class EIDCFetcher:
 		term: str = "state:published AND recordType:Dataset",
 		**kwargs,
 	) -> List[Dict[Any, Any]]:
-		res = _session.get(
-			self.url,
-			params={"rows": rows, "page": page, "term": term, **kwargs},
-		)
-		eidc_data = res.json()
-		ids = [record["identifier"] for record in eidc_data["results"]]
+		ids = self._search_ids(rows, page, term, **kwargs)
 		data = self.get_eidc_json(ids)
 		return {"data": data}
 
 
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
 @component
 class LegiloFetcher:
 	"""
 	Haystack fetcher component for retrieving supporting documentation from the Legilo API.
 	Args:
 		legilo_url (str): Format string for the Legilo API endpoint; {id} is the dataset ID.
+		max_workers (int): Maximum number of datasets fetched concurrently.
+		max_retries (int): Retries per dataset on 429/5xx responses or connection errors.
+		backoff (float): Base delay in seconds, doubled on each retry.
+		timeout (float): Time budget in seconds for one dataset. No retry starts once it is spent,
+			and each attempt's read timeout (the longest wait between bytes) is capped at what
+			is left, so a response that keeps trickling in can still run past it.
+		refresh (bool): Revalidate cached responses with the server, as EIDCFetcher does, so an
+			incremental run sees the current documents of the datasets it re-ingests.
+		session (CachedSession): HTTP session to use, defaults to the shared cached session.
 	"""
 
 	def __init__(
@@ -84,9 +223,22 @@ class LegiloFetcher:
 		legilo_url: str = "https://legilo.eds-infra.ceh.ac.uk/{id}/documents",
 		username: str = None,
 		password: str = None,
+		max_workers: int = 8,
+		max_retries: int = 4,
+		backoff: float = 1.0,
+		timeout: float = 120.0,
+		refresh: bool = False,
+		session: Optional[requests_cache.CachedSession] = None,
 	):
 		self.legilo_url = legilo_url
 		self.auth = (username, password)
+		self.max_workers = max_workers
+		self.max_retries = max_retries
+		self.backoff = backoff
+		self.timeout = timeout
+		self.refresh = refresh
+		self._session = session or _session
+		_mount_pool(self._session, max_workers)
 
 	@staticmethod
 	def _is_prose(content: str, min_whitespace_ratio: float = 0.05) -> bool:
@@ -107,7 +259,12 @@ class LegiloFetcher:
 			extracted_docs.append(
 				Document(
 					content=content,
-					meta={"title": title, "field": "SUPPORTING_DOC", "uri": uri, "filename": filename},
+					meta={
+						"title": title,
+						"field": "SUPPORTING_DOC",
+						"uri": uri,
+						"filename": filename,
+					},
 				)
 			)
 		return extracted_docs
@@ -119,13 +276,86 @@ class LegiloFetcher:
 			extract_doi(dataset["resourceIdentifiers"]),
 		)
 
+	def _retry_delay(self, attempt: int, res=None) -> float:
+		delay = self.backoff * 2**attempt
+		retry_after = res.headers.get("Retry-After", "") if res is not None else ""
+		if retry_after.isdigit():
+			delay = max(delay, float(retry_after))
+		return delay
+
+	def _fetch_docs(self, dataset: Dict[Any, Any]) -> List[Document]:
+		dataset_id = dataset.get("id")
+		url = self.legilo_url.format(id=dataset_id)
+		deadline = time.monotonic() + self.timeout
+		for attempt in range(self.max_retries + 1):
+			remaining = deadline - time.monotonic()
+			res = None
+			try:
+				# A read timeout, not a deadline: the cached session reads the whole body before
+				# returning, so the budget cannot be enforced while the response streams in
+				res = _get(
+					self._session,
+					url,
+					refresh=self.refresh,
+					auth=self.auth,
+					timeout=(5, remaining),
+				)
+				if res.status_code == 200:
+					return self._docs_from_response(dataset, res)
+				if res.status_code not in _RETRY_STATUSES:
+					logger.warning(
+						"Legilo request failed for dataset %s: HTTP %d",
+						dataset_id,
+						res.status_code,
+					)
+					return []
+				failure = f"HTTP {res.status_code}"
+			except (requests.ConnectionError, requests.Timeout) as e:
+				failure = str(e)
+			except Exception as e:
+				logger.error(
+					"Legilo: error for dataset %s: %s", dataset_id, e, exc_info=True
+				)
+				return []
+
+			delay = self._retry_delay(attempt, res)
+			if attempt == self.max_retries or time.monotonic() + delay >= deadline:
+				break
+			logger.debug(
+				"Legilo: %s for dataset %s, retrying in %.1fs",
+				failure,
+				dataset_id,
+				delay,
+			)
+			time.sleep(delay)
+
+		logger.warning(
+			"Legilo: giving up on dataset %s after %d attempt(s): %s",
+			dataset_id,
+			attempt + 1,
+			failure,
+		)
+		return []
+
 	@component.output_types(documents=List[Document])
 	def run(self, datasets: List[Dict[Any, Any]]) -> List[Document]:
-		cached = [d for d in datasets if _session.cache.contains(url=self.legilo_url.format(id=d.get("id")))]
-		to_fetch = [d for d in datasets if not _session.cache.contains(url=self.legilo_url.format(id=d.get("id")))]
+		t0 = time.perf_counter()
+		to_fetch = [
+			d
+			for d in datasets
+			if self.refresh
+			or not self._session.cache.contains(
+				url=self.legilo_url.format(id=d.get("id"))
+			)
+		]
 
 		if to_fetch:
-			test_res = _session.get(self.legilo_url.format(id=to_fetch[0].get("id")), auth=self.auth)
+			test_res = _get(
+				self._session,
+				self.legilo_url.format(id=to_fetch[0].get("id")),
+				refresh=self.refresh,
+				auth=self.auth,
+			)
 			if test_res.status_code == 401:
 				logger.error(
 					"Legilo authentication failed (401 Unauthorized). "
@@ -138,26 +368,22 @@ class LegiloFetcher:
 				to_fetch[0].get("id"),
 			)
 
-		supporting_docs = []
-
-		for dataset in tqdm(cached, desc="Loading cached Legilo data", unit="dataset"):
-			dataset_id = dataset.get("id")
-			try:
-				res = _session.get(self.legilo_url.format(id=dataset_id), auth=self.auth)
-				supporting_docs.extend(self._docs_from_response(dataset, res))
-			except Exception as e:
-				logger.error("Legilo: error for dataset %s: %s", dataset_id, e, exc_info=True)
-
-		for dataset in tqdm(to_fetch, desc="Fetching Legilo data", unit="dataset"):
-			dataset_id = dataset.get("id")
-			try:
-				res = _session.get(self.legilo_url.format(id=dataset_id), auth=self.auth)
-				if res.status_code != 200:
-					logger.warning("Legilo request failed for dataset %s: HTTP %d", dataset_id, res.status_code)
-					continue
-				supporting_docs.extend(self._docs_from_response(dataset, res))
-			except Exception as e:
-				logger.error("Legilo: error for dataset %s: %s", dataset_id, e, exc_info=True)
+		with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+			fetched = list(
+				tqdm(
+					pool.map(self._fetch_docs, datasets),
+					total=len(datasets),
+					desc="Fetching Legilo data",
+					unit="dataset",
+				)
+			)
+		supporting_docs = [doc for docs in fetched for doc in docs]
 
-		logger.info("Legilo: %d supporting document(s) fetched in total", len(supporting_docs))
+		logger.info(
+			"Legilo: %d supporting document(s) from %d dataset(s) (%d uncached) in %.1fs",
+			len(supporting_docs),
+			len(datasets),
+			len(to_fetch),
+			time.perf_counter() - t0,
+		)
 		return {"documents": supporting_docs}
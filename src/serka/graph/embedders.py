@@ -1,6 +1,7 @@
+import json
 import logging
 from haystack import component, Document
-from typing import Dict, List, Any, Literal
+from typing import Dict, List, Any, Literal, Optional, Tuple
 from tqdm import tqdm
 from haystack_integrations.components.embedders.amazon_bedrock import (
 	AmazonBedrockDocumentEmbedder,
@@ -11,48 +12,88 @@ import serka.cache as cache
 logger = logging.getLogger(__name__)
 
 
+class _TitanDimensionsClient:
+	"""Bedrock runtime client that asks Titan for a given embedding dimension.
+
+	amazon-bedrock-haystack only sends ``inputText`` to Titan models, so without this Bedrock
+	returns vectors of the model's default size whatever dimension the embedder was given.
+	Args:
+		client: The boto3 bedrock-runtime client to wrap.
+		dimensions (int): Output dimension added to every request body.
+	"""
+
+	def __init__(self, client: Any, dimensions: int):
+		self._client = client
+		self.dimensions = dimensions
+
+	def invoke_model(self, body: str, **kwargs: Any) -> Any:
+		request = json.loads(body)
+		request["dimensions"] = self.dimensions
+		return self._client.invoke_model(body=json.dumps(request), **kwargs)
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._client, name)
+
+
+def with_dimensions(embedder: Any, dimensions: Optional[int]) -> Any:
+	"""
+	Make a Bedrock text or document embedder request ``dimensions`` from a Titan model.
+	Args:
+		embedder: An AmazonBedrockTextEmbedder or AmazonBedrockDocumentEmbedder.
+		dimensions (int): Requested output dimension, None for the model's default.
+	"""
+	if dimensions is not None and "titan" in embedder.model:
+		embedder._client = _TitanDimensionsClient(embedder._client, dimensions)
+	return embedder
+
+
 @component
 class BedrockNodeEmbedder:
 	def __init__(
 		self,
 		model: Literal["amazon.titan-embed-text-v2:0"] = "amazon.titan-embed-text-v2:0",
+		dimensions: Optional[int] = None,
 	):
-		self.embedder = AmazonBedrockTextEmbedder(model=model)
+		self.model = model
+		self.dimensions = dimensions
+		self.embedder = with_dimensions(
+			AmazonBedrockTextEmbedder(model=model), dimensions
+		)
 
 	def _prepare_nodes_to_embed(
 		self, node_type: str, nodes: List[Dict[str, Any]]
 	) -> List[str]:
 		return [f"{node_type}: {repr(node)}" for node in nodes]
 
-	def _embed_node(self, content: str) -> List[float]:
-		cached = cache.get_embedding(content)
-		if cached is not None:
-			return cached
-		embedding = self.embedder.run(text=content)["embedding"]
-		cache.save_embedding(content, embedding)
-		return embedding
-
 	def _embed_nodes(
 		self, node_type: str, nodes: List[Dict[str, Any]]
 	) -> List[Dict[str, Any]]:
 		result = []
 		contents = self._prepare_nodes_to_embed(node_type, nodes)
-		for node, content in tqdm(
-			zip(nodes, contents),
-			desc=f"Embedding {node_type} nodes",
-			unit="node",
-			total=len(nodes),
-		):
-			try:
-				result.append({**node, "embedding": self._embed_node(content)})
-			except Exception as e:
-				logger.error(
-					"Embedding failed for %s node %s: %s",
-					node_type,
-					node.get("uri", node.get("name", "?")),
-					e,
-					exc_info=True,
-				)
+		cached = cache.get_embeddings(contents, self.model, self.dimensions)
+		new_embeddings: List[Tuple[str, List[float]]] = []
+		try:
+			for node, content, embedding in tqdm(
+				zip(nodes, contents, cached),
+				desc=f"Embedding {node_type} nodes",
+				unit="node",
+				total=len(nodes),
+			):
+				try:
+					if embedding is None:
+						embedding = self.embedder.run(text=content)["embedding"]
+						new_embeddings.append((content, embedding))
+					result.append({**node, "embedding": embedding})
+				except Exception as e:
+					logger.error(
+						"Embedding failed for %s node %s: %s",
+						node_type,
+						node.get("uri", node.get("name", "?")),
+						e,
+						exc_info=True,
+					)
+		finally:
+			cache.save_embeddings(new_embeddings, self.model, self.dimensions)
 		return result
 
 	@component.output_types(node_embeddings=Dict[str, List[Dict[str, str]]])
@@ -67,16 +108,26 @@ class BedrockNodeEmbedder:
 
 @component
 class CachedDocumentEmbedder:
-	def __init__(self, model: str = "amazon.titan-embed-text-v2:0", max_chars: int = 30_000):
-		self.embedder = AmazonBedrockDocumentEmbedder(model=model, progress_bar=True)
+	def __init__(
+		self,
+		model: str = "amazon.titan-embed-text-v2:0",
+		dimensions: Optional[int] = None,
+		max_chars: int = 30_000,
+	):
+		self.model = model
+		self.dimensions = dimensions
+		self.embedder = with_dimensions(
+			AmazonBedrockDocumentEmbedder(model=model, progress_bar=True), dimensions
+		)
 		self.max_chars = max_chars
 
 	@component.output_types(documents=List[Document], meta=Dict[str, Any])
 	def run(self, documents: List[Document]) -> Dict[str, Any]:
 		result: list[Document | None] = [None] * len(documents)
 		to_embed: list[tuple[int, Document]] = []
+		to_lookup: list[tuple[int, Document]] = []
 
-		for i, doc in tqdm(enumerate(documents), total=len(documents), desc="Loading cached embeddings", unit="doc"):
+		for i, doc in enumerate(documents):
 			if not doc.content:
 				result[i] = doc
 				continue
@@ -92,20 +143,39 @@ class CachedDocumentEmbedder:
 					doc.content[:300],
 				)
 				continue
-			cached = cache.get_embedding(doc.content)
+			to_lookup.append((i, doc))
+
+		cached_embeddings = cache.get_embeddings(
+			[doc.content for _, doc in to_lookup], self.model, self.dimensions
+		)
+		for (i, doc), cached in zip(to_lookup, cached_embeddings):
 			if cached is not None:
-				result[i] = Document(content=doc.content, meta=doc.meta, embedding=cached)
+				result[i] = Document(
+					content=doc.content, meta=doc.meta, embedding=cached
+				)
 			else:
 				to_embed.append((i, doc))
+		logger.info(
+			"Loaded %d cached embedding(s), %d to embed",
+			len(to_lookup) - len(to_embed),
+			len(to_embed),
+		)
 
 		if to_embed:
 			indices, docs = zip(*to_embed)
 			try:
 				emb_result = self.embedder.run(documents=list(docs))
 				for i, embedded_doc in zip(indices, emb_result["documents"]):
-					if embedded_doc.embedding and embedded_doc.content:
-						cache.save_embedding(embedded_doc.content, embedded_doc.embedding)
 					result[i] = embedded_doc
+				cache.save_embeddings(
+					[
+						(d.content, d.embedding)
+						for d in emb_result["documents"]
+						if d.embedding and d.content
+					],
+					self.model,
+					self.dimensions,
+				)
 			except Exception as e:
 				logger.error(
 					"Document embedding failed for batch of %d docs: %s",
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import logging
 from typing import Any, Dict, List, Tuple
 
@@ -13,6 +15,13 @@ def extract_doi(resource_identifiers, default="") -> str:
 	return default
 
 
+def record_fingerprint(record: Dict[Any, Any]) -> str:
+	"""Stable hash of an EIDC record's content, independent of key order."""
+	return hashlib.sha256(
+		json.dumps(record, sort_keys=True, default=str).encode()
+	).hexdigest()
+
+
 @component
 class EntityExtractor:
 	def _extract_boundary(self, record):
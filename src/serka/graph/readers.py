@@ -1,6 +1,10 @@
+import logging
 from typing import List, Any, Dict
 from haystack import component
 from neo4j import GraphDatabase
+from serka.graph.extractors import extract_doi, record_fingerprint
+
+logger = logging.getLogger(__name__)
 
 
 @component
@@ -94,3 +98,61 @@ class Neo4jGraphReader:
 				Neo4jGraphReader.query_nodes, embedding=embedding
 			)
 		return {"nodes": nodes, "markdown_nodes": ""}
+
+
+@component
+class DatasetChangeFilter:
+	"""
+	Haystack component that drops EIDC records unchanged since they were last ingested, by
+	comparing each record's fingerprint with the one stored on its Dataset node.
+	Args:
+		host (str): Neo4j host.
+		port (int): Neo4j bolt port.
+	"""
+
+	def __init__(
+		self, host: str, port: int, username: str = "neo4j", password: str = "neo4j"
+	):
+		self.url = f"bolt://{host}:{port}"
+		self._driver = GraphDatabase.driver(self.url, auth=(username, password))
+
+	@staticmethod
+	def query_fingerprints(tx, uris: List[str]) -> Dict[str, str]:
+		result = tx.run(
+			"UNWIND $uris AS uri "
+			"MATCH (d:Dataset {uri: uri}) "
+			"RETURN d.uri AS uri, d.fingerprint AS fingerprint",
+			uris=uris,
+		)
+		return {r["uri"]: r["fingerprint"] for r in result}
+
+	@component.output_types(data=List[Dict[Any, Any]], fingerprints=Dict[str, str])
+	def run(self, data: List[Dict[Any, Any]]):
+		fingerprints = {
+			extract_doi(record.get("resourceIdentifiers", [])): record_fingerprint(
+				record
+			)
+			for record in data
+		}
+		with self._driver.session(database="neo4j") as session:
+			stored = session.execute_read(
+				DatasetChangeFilter.query_fingerprints, uris=list(fingerprints)
+			)
+
+		changed_uris = {
+			uri for uri, fp in fingerprints.items() if stored.get(uri) != fp
+		}
+		changed = [
+			record
+			for record in data
+			if extract_doi(record.get("resourceIdentifiers", [])) in changed_uris
+		]
+		logger.info(
+			"Incremental ingest: %d of %d dataset(s) new or changed",
+			len(changed),
+			len(data),
+		)
+		return {
+			"data": changed,
+			"fingerprints": {uri: fingerprints[uri] for uri in changed_uris if uri},
+		}
@@ -1,70 +1,268 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from haystack import component, Document
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from neo4j import GraphDatabase
 
+logger = logging.getLogger(__name__)
+
 _BATCH_SIZE = 500
+# Rows per batch are bounded by an estimate of the Bolt payload rather than a fixed
+# count, so embedding-heavy batches stay small and relation batches can grow large
+_BATCH_BYTES = 2 * 1024 * 1024
+_MAX_BATCH_ROWS = 5000
+# Dataset extents as corner points, so bounding-box search can use point indexes instead of
+# scanning every dataset's scalar boundaries
+_DATASET_EXTENTS = (
+	"SET n.extent_sw = CASE WHEN -90 <= node.south_boundary <= 90 AND -180 <= node.west_boundary <= 180 "
+	"THEN point({latitude: node.south_boundary, longitude: node.west_boundary}) END, "
+	"n.extent_ne = CASE WHEN -90 <= node.north_boundary <= 90 AND -180 <= node.east_boundary <= 180 "
+	"THEN point({latitude: node.north_boundary, longitude: node.east_boundary}) END "
+)
+# (label, index name suffix, full-text field, own vector index) of the per-label search indexes.
+# Text chunks make up most of vec_lookup, so chunk searches filter its results by label rather
+# than keep every chunk embedding a second time in an index of their own
+_LABEL_SEARCH_INDEXES = [
+	("TextChunk", "textchunk", "content", False),
+	("Person", "person", "name", True),
+	("Organisation", "organisation", "name", True),
+]
 
 
 def _batched(lst: list, n: int):
-    for i in range(0, len(lst), n):
-        yield lst[i : i + n]
+	for i in range(0, len(lst), n):
+		yield lst[i : i + n]
+
+
+def _payload_bytes(row: Any) -> int:
+	values = row.values() if isinstance(row, dict) else row
+	size = 0
+	for v in values:
+		if isinstance(v, (list, tuple)):
+			# Bolt sends floats as a marker byte plus a float64
+			size += 9 * len(v)
+		elif isinstance(v, str):
+			size += len(v) + 5
+		else:
+			size += 9
+	return size
+
+
+def _batched_by_bytes(lst: list, max_bytes: int, max_rows: int = _MAX_BATCH_ROWS):
+	batch: list = []
+	size = 0
+	for row in lst:
+		row_size = _payload_bytes(row)
+		if batch and (size + row_size > max_bytes or len(batch) >= max_rows):
+			yield batch
+			batch, size = [], 0
+		batch.append(row)
+		size += row_size
+	if batch:
+		yield batch
+
+
+class WriteMetrics:
+	"""
+	Rows, estimated Bolt payload bytes and wall-clock seconds per phase of graph writes.
+	One instance covers one writer run; update() folds in other runs, e.g. the pages of a
+	paged ingest.
+	"""
+
+	_FIELDS = ("rows", "bytes", "seconds")
+
+	def __init__(self):
+		self.phases: Dict[str, Dict[str, float]] = {}
+
+	def _phase(self, name: str) -> Dict[str, float]:
+		return self.phases.setdefault(name, dict.fromkeys(self._FIELDS, 0))
+
+	def count(self, name: str, rows: list) -> None:
+		phase = self._phase(name)
+		phase["rows"] += len(rows)
+		phase["bytes"] += sum(_payload_bytes(row) for row in rows)
+
+	@contextmanager
+	def timed(self, name: str):
+		t0 = time.perf_counter()
+		try:
+			yield
+		finally:
+			self._phase(name)["seconds"] += time.perf_counter() - t0
+
+	def update(self, metrics: Dict[str, Dict[str, float]]) -> None:
+		for name, values in metrics.items():
+			if name == "total":
+				continue
+			phase = self._phase(name)
+			for field in self._FIELDS:
+				phase[field] += values.get(field, 0)
+
+	@staticmethod
+	def _with_rate(values: Dict[str, float]) -> Dict[str, float]:
+		rate = values["rows"] / values["seconds"] if values["seconds"] else 0.0
+		return {**values, "rows_per_s": rate}
+
+	def as_dict(self) -> Dict[str, Dict[str, float]]:
+		result = {name: self._with_rate(values) for name, values in self.phases.items()}
+		total = {
+			field: sum(v[field] for v in self.phases.values()) for field in self._FIELDS
+		}
+		result["total"] = self._with_rate(total)
+		return result
+
+	def summary(self) -> str:
+		return "; ".join(
+			f"{name} {v['rows']:,} rows {v['bytes'] / 1e6:,.1f} MB {v['seconds']:.2f}s ({v['rows_per_s']:,.0f} rows/s)"
+			for name, v in self.as_dict().items()
+		)
 
 
 @component
 class Neo4jGraphWriter:
+	"""
+	Haystack component writing extracted nodes, text chunks and relations to Neo4j.
+	Args:
+		host (str): Neo4j host.
+		port (int): Neo4j bolt port.
+		upsert (bool): MERGE nodes on uri, text chunks on doc_id and relations on their
+			endpoints instead of CREATE, so re-running an ingest does not duplicate anything.
+		max_workers (int): Number of sessions writing batches concurrently. Node batches of
+			every label run in parallel, then each relation type is written by its own worker.
+		batch_bytes (int): Approximate Bolt payload size each write batch is cut at.
+		paged (bool): run is called once per page of a single ingest, so entities written by
+			an earlier page are skipped instead of being written again. Call finish_ingest
+			after the last page.
+	"""
+
 	def __init__(
-		self, host: str, port: int, username: str = "neo4j", password: str = "neo4j"
+		self,
+		host: str,
+		port: int,
+		username: str = "neo4j",
+		password: str = "neo4j",
+		upsert: bool = False,
+		max_workers: int = 4,
+		batch_bytes: int = _BATCH_BYTES,
+		paged: bool = False,
 	):
 		self.url = f"bolt://{host}:{port}"
 		self.username = username
 		self.password = password
+		self.upsert = upsert
+		self.max_workers = max(1, max_workers)
+		self.batch_bytes = batch_bytes
+		self.paged = paged
 		self._driver = GraphDatabase.driver(self.url, auth=(username, password))
+		# Entities shared between pages of a paged ingest (e.g. an author of datasets on
+		# several pages) must only be created once
+		self._written_uris: set[str] = set()
+		# Whether anything was written since the ingest generation was last bumped
+		self._unannounced = False
 
 	@staticmethod
-	def _write_nodes(tx, node_type: str, batch: List[Dict[str, Any]]) -> int:
+	def _write_nodes(
+		tx, node_type: str, batch: List[Dict[str, Any]], merge: bool = False
+	) -> int:
+		if merge:
+			clause = f"MERGE (n:{node_type}:embedded {{uri: node.uri}}) "
+		else:
+			clause = f"CREATE (n:{node_type}:embedded) "
+		# Replacing a dataset's properties must keep its stored fingerprint, or the next
+		# incremental run would see every upserted dataset as changed
+		props = (
+			"node{.*, fingerprint: n.fingerprint}"
+			if merge and node_type == "Dataset"
+			else "node"
+		)
 		result = tx.run(
 			"UNWIND $nodes as node "
-			f"CREATE (n:{node_type}:embedded) "
-			"SET n = node "
-			"RETURN n",
+			+ clause
+			+ f"SET n = {props} "
+			+ (_DATASET_EXTENTS if node_type == "Dataset" else ""),
 			nodes=batch,
 		)
-		return len(result.data())
+		# MERGE also matches existing nodes, so count from the summary rather than the rows
+		return result.consume().counters.nodes_created
 
 	@staticmethod
-	def _write_doc_nodes(tx, batch: List[Dict[str, Any]]) -> int:
+	def _write_doc_nodes(tx, batch: List[Dict[str, Any]], merge: bool = False) -> int:
+		if merge:
+			clause = "MERGE (d:TextChunk:embedded {doc_id: doc.id}) SET d.content = doc.content, d.embedding = doc.embedding "
+		else:
+			clause = "CREATE (d:TextChunk:embedded {doc_id: doc.id, content: doc.content, embedding: doc.embedding}) "
 		result = tx.run(
-			"UNWIND $docs as doc "
-			"CREATE (d:TextChunk:embedded {doc_id: doc.id, content: doc.content, embedding: doc.embedding}) "
-			"RETURN d",
+			"UNWIND $docs as doc " + clause,
 			docs=batch,
 		)
-		return len(result.data())
+		return result.consume().counters.nodes_created
 
 	@staticmethod
-	def _write_relations(tx, relation_type: str, batch: List[Tuple[str, str]]) -> int:
+	def _write_relations(
+		tx, relation_type: str, batch: List[Tuple[str, str]], merge: bool = False
+	) -> int:
+		verb = "MERGE" if merge else "CREATE"
 		result = tx.run(
 			"UNWIND $relations as relation "
 			f"MATCH (a:embedded {{uri: relation[0]}}), (b:embedded {{uri: relation[1]}}) "
-			f"CREATE (a)-[:{relation_type}]->(b) "
-			"RETURN count(*) AS created",
+			f"{verb} (a)-[:{relation_type}]->(b)",
 			relations=batch,
 		)
-		return result.data()[0]["created"]
+		return result.consume().counters.relationships_created
 
 	@staticmethod
-	def _write_doc_relations(tx, relation_type: str, batch: List[Tuple[str, str]]) -> int:
+	def _write_doc_relations(
+		tx, relation_type: str, batch: List[Tuple[str, str]], merge: bool = False
+	) -> int:
+		verb = "MERGE" if merge else "CREATE"
 		result = tx.run(
 			"UNWIND $relations as relation "
 			f"MATCH (a:TextChunk {{doc_id: relation[0]}}), (b:embedded {{uri: relation[1]}}) "
-			f"CREATE (a)-[:{relation_type}]->(b) "
-			"RETURN count(*) AS created",
+			f"{verb} (a)-[:{relation_type}]->(b)",
 			relations=batch,
 		)
-		return result.data()[0]["created"]
+		return result.consume().counters.relationships_created
+
+	@staticmethod
+	def _delete_dataset_content(tx, uris: List[str]) -> int:
+		# Chunks and relations of a changed dataset are rebuilt from its new record
+		chunks = tx.run(
+			"UNWIND $uris AS uri "
+			"MATCH (:Dataset {uri: uri})<-[]-(t:TextChunk) "
+			"DETACH DELETE t",
+			uris=uris,
+		).consume()
+		tx.run(
+			"UNWIND $uris AS uri " "MATCH (:Dataset {uri: uri})-[r]-() " "DELETE r",
+			uris=uris,
+		).consume()
+		return chunks.counters.nodes_deleted
 
 	@staticmethod
-	def _unpack_doc_relations(docs: List[Dict[str, Any]]) -> Dict[str, List[Tuple[str, str]]]:
+	def _write_fingerprints(tx, batch: List[Tuple[str, str]]) -> None:
+		tx.run(
+			"UNWIND $fingerprints AS fp "
+			"MATCH (d:Dataset {uri: fp[0]}) "
+			"SET d.fingerprint = fp[1]",
+			fingerprints=batch,
+		).consume()
+
+	@staticmethod
+	def _bump_generation(tx) -> int:
+		# Readers (e.g. the MCP reranker score cache) drop anything derived from older generations
+		record = tx.run(
+			"MERGE (s:IngestState {id: 'serka'}) "
+			"SET s.generation = coalesce(s.generation, 0) + 1 "
+			"RETURN s.generation AS generation"
+		).single()
+		return record["generation"]
+
+	@staticmethod
+	def _unpack_doc_relations(
+		docs: List[Dict[str, Any]],
+	) -> Dict[str, List[Tuple[str, str]]]:
 		relations: Dict[str, List[Tuple[str, str]]] = {}
 		for doc in docs:
 			rel_type = str(doc.get("field", "")).upper() + "_OF"
@@ -73,17 +271,47 @@ class Neo4jGraphWriter:
 
 	@staticmethod
 	def _create_lookup_indexes(tx) -> None:
-		tx.run("CREATE CONSTRAINT embedded_uri IF NOT EXISTS FOR (n:embedded) REQUIRE n.uri IS UNIQUE")
-		tx.run("CREATE INDEX textchunk_doc_id IF NOT EXISTS FOR (n:TextChunk) ON (n.doc_id)")
+		tx.run(
+			"CREATE CONSTRAINT embedded_uri IF NOT EXISTS FOR (n:embedded) REQUIRE n.uri IS UNIQUE"
+		)
+		tx.run(
+			"CREATE INDEX textchunk_doc_id IF NOT EXISTS FOR (n:TextChunk) ON (n.doc_id)"
+		)
+
+	@staticmethod
+	def _backfill_dataset_extents(tx) -> None:
+		# Datasets written before extents were stored, e.g. left untouched by an incremental run
+		tx.run(
+			"MATCH (n:Dataset) WHERE n.extent_sw IS NULL AND n.south_boundary IS NOT NULL "
+			"WITH n, n AS node " + _DATASET_EXTENTS
+		)
 
 	@staticmethod
 	def _create_search_indexes(tx) -> None:
-		tx.run("CREATE VECTOR INDEX vec_lookup IF NOT EXISTS FOR (n:embedded) ON n.embedding")
+		tx.run(
+			"CREATE VECTOR INDEX vec_lookup IF NOT EXISTS FOR (n:embedded) ON n.embedding"
+		)
 		tx.run(
 			"CREATE FULLTEXT INDEX ft_search IF NOT EXISTS "
 			"FOR (n:Dataset|TextChunk|Person|Organisation) ON EACH [n.title, n.content, n.name] "
 			"OPTIONS {indexConfig: {`fulltext.analyzer`: 'english'}}"
 		)
+		tx.run(
+			"CREATE POINT INDEX dataset_extent_sw IF NOT EXISTS FOR (d:Dataset) ON d.extent_sw"
+		)
+		tx.run(
+			"CREATE POINT INDEX dataset_extent_ne IF NOT EXISTS FOR (d:Dataset) ON d.extent_ne"
+		)
+		# Per-label indexes let typed searches (e.g. only people) filter inside the index query
+		for label, suffix, field, vector in _LABEL_SEARCH_INDEXES:
+			if vector:
+				tx.run(
+					f"CREATE VECTOR INDEX vec_{suffix} IF NOT EXISTS FOR (n:{label}) ON n.embedding"
+				)
+			tx.run(
+				f"CREATE FULLTEXT INDEX ft_{suffix} IF NOT EXISTS FOR (n:{label}) ON EACH [n.{field}] "
+				"OPTIONS {indexConfig: {`fulltext.analyzer`: 'english'}}"
+			)
 
 	@staticmethod
 	def doc_to_dict(doc: Document) -> Dict[str, Any]:
@@ -95,53 +323,180 @@ class Neo4jGraphWriter:
 			"embedding": doc.embedding,
 		}
 
+	def _execute(self, fn, *args) -> Any:
+		# Sessions are not thread safe, so every task checks out its own from the driver pool
+		with self._driver.session(database="neo4j") as session:
+			return session.execute_write(fn, *args)
+
+	def _execute_batches(self, fn, relation_type: str, rows: list, merge: bool) -> int:
+		with self._driver.session(database="neo4j") as session:
+			return sum(
+				session.execute_write(fn, relation_type, batch, merge)
+				for batch in _batched_by_bytes(rows, self.batch_bytes)
+			)
+
+	def _build_search_indexes(self) -> None:
+		self._execute(Neo4jGraphWriter._backfill_dataset_extents)
+		self._execute(Neo4jGraphWriter._create_search_indexes)
+
+	def _announce(self) -> Optional[int]:
+		if not self._unannounced:
+			return None
+		self._unannounced = False
+		return self._execute(Neo4jGraphWriter._bump_generation)
+
+	def finish_ingest(self) -> Optional[int]:
+		"""
+		End a paged ingest: build the search indexes and bump the ingest generation once for
+		all its pages, and forget the entities written, so the next ingest writes them again.
+		Returns the new generation, or None when no page wrote anything and the generation was
+		left as it was.
+		"""
+		self._written_uris.clear()
+		self._build_search_indexes()
+		return self._announce()
+
 	@component.output_types(
-		nodes_created=Dict[str, int], relations_created=Dict[str, int]
+		nodes_created=Dict[str, int],
+		relations_created=Dict[str, int],
+		metrics=Dict[str, Dict[str, float]],
 	)
 	def run(
 		self,
 		nodes: Dict[str, List[Dict[str, Any]]],
 		relations: Dict[str, List[Tuple[str, str]]],
 		docs: List[Document],
+		fingerprints: Optional[Dict[str, str]] = None,
 	) -> Dict[str, Any]:
+		"""
+		Write nodes, text chunks and relations to Neo4j. When fingerprints (dataset uri to
+		record fingerprint) are given, the run is incremental: the text chunks and relations
+		of those datasets are replaced, everything is upserted as in upsert mode, and the
+		fingerprints are stored once everything else has been written.
+		The metrics output holds rows, estimated bytes sent and seconds for each write phase.
+		"""
+		if not self.paged:
+			# Each run is a whole ingest, which may follow a wipe of the graph
+			self._written_uris.clear()
 		docs_as_dicts = [self.doc_to_dict(doc) for doc in docs]
+		merge = self.upsert or fingerprints is not None
+		metrics = WriteMetrics()
 
-		with self._driver.session(database="neo4j") as session:
-			# Phase 1: bulk-create nodes in batches
-			node_result: Dict[str, int] = {}
-			for node_type, node_list in nodes.items():
-				unique = list({n["uri"]: n for n in node_list}.values())
-				node_result[node_type] = sum(
-					session.execute_write(Neo4jGraphWriter._write_nodes, node_type, batch)
-					for batch in _batched(unique, _BATCH_SIZE)
+		if merge:
+			# Keyed MERGE is a full label scan per row without the uri/doc_id lookups
+			with metrics.timed("lookup_indexes"):
+				self._execute(Neo4jGraphWriter._create_lookup_indexes)
+		if fingerprints:
+			with metrics.timed("delete"):
+				self._execute(
+					Neo4jGraphWriter._delete_dataset_content, list(fingerprints)
 				)
 
-			unique_docs = list({d["id"]: d for d in docs_as_dicts}.values())
-			node_result["Document"] = sum(
-				session.execute_write(Neo4jGraphWriter._write_doc_nodes, batch)
-				for batch in _batched(unique_docs, _BATCH_SIZE)
-			)
+		with ThreadPoolExecutor(
+			max_workers=self.max_workers, thread_name_prefix="neo4j-writer"
+		) as pool:
+			# Phase 1: write node and text chunk batches in parallel; rows are unique by key,
+			# so concurrent batches never touch the same node
+			with metrics.timed("nodes"):
+				node_futures: Dict[str, list] = {}
+				for node_type, node_list in nodes.items():
+					unique = [
+						n
+						for uri, n in {n["uri"]: n for n in node_list}.items()
+						if uri not in self._written_uris
+					]
+					metrics.count("nodes", unique)
+					node_futures[node_type] = [
+						(
+							pool.submit(
+								self._execute,
+								Neo4jGraphWriter._write_nodes,
+								node_type,
+								batch,
+								merge,
+							),
+							batch,
+						)
+						for batch in _batched_by_bytes(unique, self.batch_bytes)
+					]
+
+				unique_docs = list({d["id"]: d for d in docs_as_dicts}.values())
+				metrics.count("nodes", unique_docs)
+				doc_futures = [
+					pool.submit(
+						self._execute, Neo4jGraphWriter._write_doc_nodes, batch, merge
+					)
+					for batch in _batched_by_bytes(unique_docs, self.batch_bytes)
+				]
+
+				node_result = {}
+				for node_type, futures in node_futures.items():
+					node_result[node_type] = 0
+					for future, batch in futures:
+						node_result[node_type] += future.result()
+						# Only a committed batch may be skipped by later pages
+						self._written_uris.update(n["uri"] for n in batch)
+				node_result["Document"] = sum(f.result() for f in doc_futures)
 
 			# Phase 2: lookup indexes before relationship MATCH
-			session.execute_write(Neo4jGraphWriter._create_lookup_indexes)
-
-			# Phase 3: create relationships in batches
-			relation_result: Dict[str, int] = {}
-			for relation_type, relation_list in relations.items():
-				unique = list({(r[0], r[1]): r for r in relation_list}.values())
-				relation_result[relation_type] = sum(
-					session.execute_write(Neo4jGraphWriter._write_relations, relation_type, batch)
-					for batch in _batched(unique, _BATCH_SIZE)
-				)
+			if not merge:
+				with metrics.timed("lookup_indexes"):
+					self._execute(Neo4jGraphWriter._create_lookup_indexes)
 
-			for rel_type, rel_list in Neo4jGraphWriter._unpack_doc_relations(docs_as_dicts).items():
-				unique = list({(r[0], r[1]): r for r in rel_list}.values())
-				relation_result[rel_type] = sum(
-					session.execute_write(Neo4jGraphWriter._write_doc_relations, rel_type, batch)
-					for batch in _batched(unique, _BATCH_SIZE)
-				)
+			# Phase 3: one worker per relationship type; batches of the same type run in turn
+			# so they never contend for the same endpoint locks
+			with metrics.timed("relations"):
+				relation_futures: Dict[str, Any] = {}
+				for relation_type, relation_list in relations.items():
+					unique = list({(r[0], r[1]): r for r in relation_list}.values())
+					metrics.count("relations", unique)
+					relation_futures[relation_type] = pool.submit(
+						self._execute_batches,
+						Neo4jGraphWriter._write_relations,
+						relation_type,
+						unique,
+						merge,
+					)
+
+				for rel_type, rel_list in Neo4jGraphWriter._unpack_doc_relations(
+					docs_as_dicts
+				).items():
+					unique = list({(r[0], r[1]): r for r in rel_list}.values())
+					metrics.count("relations", unique)
+					relation_futures[rel_type] = pool.submit(
+						self._execute_batches,
+						Neo4jGraphWriter._write_doc_relations,
+						rel_type,
+						unique,
+						merge,
+					)
+				relation_result = {k: f.result() for k, f in relation_futures.items()}
 
-			# Phase 4: build search indexes over the completed dataset
-			session.execute_write(Neo4jGraphWriter._create_search_indexes)
+		# Phase 4: build search indexes over the completed dataset; a paged ingest builds them
+		# once, after its last page
+		if not self.paged:
+			with metrics.timed("search_indexes"):
+				self._build_search_indexes()
 
-		return {"nodes_created": node_result, "relations_created": relation_result}
+		# Phase 5: record fingerprints last, so an interrupted run is redone next time
+		if fingerprints:
+			with metrics.timed("fingerprints"):
+				fingerprint_rows = list(fingerprints.items())
+				metrics.count("fingerprints", fingerprint_rows)
+				for batch in _batched(fingerprint_rows, _BATCH_SIZE):
+					self._execute(Neo4jGraphWriter._write_fingerprints, batch)
+
+		# Phase 6: announce the new graph contents to readers caching derived results, once
+		# the ingest is complete. A run that wrote nothing, e.g. an incremental one without
+		# changed datasets, leaves their caches valid
+		self._unannounced = self._unannounced or metrics.as_dict()["total"]["rows"] > 0
+		if not self.paged:
+			with metrics.timed("generation"):
+				self._announce()
+
+		logger.info("Graph write: %s", metrics.summary())
+		return {
+			"nodes_created": node_result,
+			"relations_created": relation_result,
+			"metrics": metrics.as_dict(),
+		}
@@ -1,11 +1,16 @@
 from dataclasses import dataclass
 from haystack import Pipeline
 from haystack.components.preprocessors import DocumentSplitter
-from serka.graph.embedders import BedrockNodeEmbedder, CachedDocumentEmbedder
+from serka.graph.embedders import (
+	BedrockNodeEmbedder,
+	CachedDocumentEmbedder,
+	with_dimensions,
+)
 from serka.graph.writers import Neo4jGraphWriter
+from serka.graph.readers import DatasetChangeFilter
 from serka.graph.extractors import EntityExtractor, TextExtractor, DocumentTruncator
 from serka.fetchers import EIDCFetcher, LegiloFetcher
-from typing import Optional, Callable
+from typing import Any, Callable, Dict, List, Optional
 from haystack_integrations.components.embedders.amazon_bedrock import (
 	AmazonBedrockTextEmbedder,
 )
@@ -33,15 +38,25 @@ class PipelineBuilder:
 	legilo_password: str
 	chunk_length: int
 	chunk_overlap: int
+	models_embedding_dimensions: Optional[int] = None
+	fetch_max_workers: int = 8
+	neo4j_write_workers: int = 4
 
 	def _create_text_embedder(self):
-		return AmazonBedrockTextEmbedder(model=self.models_embedding)
+		return with_dimensions(
+			AmazonBedrockTextEmbedder(model=self.models_embedding),
+			self.models_embedding_dimensions,
+		)
 
 	def _create_node_embedder(self):
-		return BedrockNodeEmbedder(model=self.models_embedding)
+		return BedrockNodeEmbedder(
+			model=self.models_embedding, dimensions=self.models_embedding_dimensions
+		)
 
 	def _create_document_embedder(self):
-		return CachedDocumentEmbedder(model=self.models_embedding)
+		return CachedDocumentEmbedder(
+			model=self.models_embedding, dimensions=self.models_embedding_dimensions
+		)
 
 	def _create_llm_generator(
 		self, streaming_callback: Optional[Callable[[StreamingChunk], None]] = None
@@ -60,12 +75,15 @@ class PipelineBuilder:
 		generator = AmazonBedrockChatGenerator(model=self.models_llm)
 		return Agent(chat_generator=generator, tools=toolset, exit_conditions=["text"])
 
-	def build_graph_pipeline(self) -> Pipeline:
-		p = Pipeline()
-		p.add_component("eidc_fetcher", EIDCFetcher())
+	def _add_embedding_components(self, p: Pipeline, refresh: bool = False) -> None:
 		p.add_component(
 			"legilo_fetcher",
-			LegiloFetcher(username=self.legilo_user, password=self.legilo_password),
+			LegiloFetcher(
+				username=self.legilo_user,
+				password=self.legilo_password,
+				max_workers=self.fetch_max_workers,
+				refresh=refresh,
+			),
 		)
 		p.add_component("ent_extractor", EntityExtractor())
 		p.add_component("text_extractor", TextExtractor(["description", "lineage"]))
@@ -77,6 +95,63 @@ class PipelineBuilder:
 		p.add_component("truncator", DocumentTruncator())
 		p.add_component("doc_emb", self._create_document_embedder())
 		p.add_component("node_emb", self._create_node_embedder())
+
+		p.connect("text_extractor.documents", "joiner.documents")
+		p.connect("legilo_fetcher.documents", "joiner.documents")
+
+		p.connect("joiner", "splitter")
+		p.connect("splitter", "truncator")
+		p.connect("truncator", "doc_emb")
+
+		p.connect("ent_extractor", "node_emb")
+
+	@staticmethod
+	def _connect_records(p: Pipeline, source: str) -> None:
+		p.connect(source, "ent_extractor")
+		p.connect(source, "text_extractor")
+		p.connect(source, "legilo_fetcher")
+
+	def _add_eidc_fetcher(self, p: Pipeline, refresh: bool = False) -> None:
+		p.add_component(
+			"eidc_fetcher",
+			EIDCFetcher(max_workers=self.fetch_max_workers, refresh=refresh),
+		)
+
+	@staticmethod
+	def record_inputs(
+		records: List[Dict[Any, Any]], incremental: bool = False
+	) -> Dict[str, Dict[str, Any]]:
+		"""Pipeline run data feeding a page of EIDC records to a paged graph pipeline."""
+		if incremental:
+			return {"change_filter": {"data": records}}
+		return {
+			"ent_extractor": {"data": records},
+			"text_extractor": {"records": records},
+			"legilo_fetcher": {"datasets": records},
+		}
+
+	def build_embedding_pipeline(self) -> Pipeline:
+		"""Fetch, extract and embed without writing to Neo4j, filling the embedding cache."""
+		p = Pipeline()
+		self._add_embedding_components(p)
+		self._add_eidc_fetcher(p)
+		self._connect_records(p, "eidc_fetcher")
+		return p
+
+	def build_graph_pipeline(
+		self, paged: bool = False, incremental: bool = False, upsert: bool = False
+	) -> Pipeline:
+		"""
+		Build the ingest pipeline. A paged pipeline has no EIDC fetcher; run it once per
+		page from EIDCFetcher.iter_pages with PipelineBuilder.record_inputs(page), then call
+		finish_ingest() on its graph_writer.
+		An incremental pipeline revalidates cached EIDC records and Legilo documents with
+		the server, skips datasets whose content is unchanged since they were last written
+		and replaces the ones that changed.
+		An upsert pipeline MERGEs into the graph so it can be re-run without duplicates.
+		"""
+		p = Pipeline()
+		self._add_embedding_components(p, refresh=incremental)
 		p.add_component(
 			"graph_writer",
 			Neo4jGraphWriter(
@@ -84,23 +159,32 @@ class PipelineBuilder:
 				port=self.neo4j_port,
 				username=self.neo4j_user,
 				password=self.neo4j_password,
+				upsert=upsert,
+				max_workers=self.neo4j_write_workers,
+				paged=paged,
 			),
 		)
-
-		p.connect("eidc_fetcher", "ent_extractor")
-		p.connect("eidc_fetcher", "text_extractor")
-		p.connect("eidc_fetcher", "legilo_fetcher")
-
-		p.connect("text_extractor.documents", "joiner.documents")
-		p.connect("legilo_fetcher.documents", "joiner.documents")
-
-		p.connect("joiner", "splitter")
-		p.connect("splitter", "truncator")
-		p.connect("truncator", "doc_emb")
 		p.connect("doc_emb", "graph_writer.docs")
-
-		p.connect("ent_extractor", "node_emb")
 		p.connect("node_emb", "graph_writer.nodes")
 		p.connect("ent_extractor.relationships", "graph_writer.relations")
-		return p
 
+		if incremental:
+			p.add_component(
+				"change_filter",
+				DatasetChangeFilter(
+					host=self.neo4j_host,
+					port=self.neo4j_port,
+					username=self.neo4j_user,
+					password=self.neo4j_password,
+				),
+			)
+			self._connect_records(p, "change_filter.data")
+			p.connect("change_filter.fingerprints", "graph_writer.fingerprints")
+
+		if not paged:
+			self._add_eidc_fetcher(p, refresh=incremental)
+			if incremental:
+				p.connect("eidc_fetcher", "change_filter")
+			else:
+				self._connect_records(p, "eidc_fetcher")
+		return p
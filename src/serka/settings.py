@@ -19,11 +19,16 @@ class Settings(BaseSettings):
 
 	# Models (Bedrock)
 	models_embedding: str = "amazon.titan-embed-text-v2:0"
+	models_embedding_dimensions: Optional[int] = None
 	models_llm: str = "anthropic.claude-sonnet-4-6"
 
 	# External services
 	legilo_username: Optional[str] = None
 	legilo_password: Optional[str] = None
+	fetch_max_workers: int = 8
+
+	# Neo4j ingest
+	neo4j_write_workers: int = 4
 
 	# App
 	test_mode: bool = False
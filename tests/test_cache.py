@@ -0,0 +1,166 @@
+import json
+
+import pytest
+
+import serka.cache as cache
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+	monkeypatch.setattr(cache, "root", tmp_path)
+	monkeypatch.delenv("MODELS_EMBEDDING", raising=False)
+	monkeypatch.delenv("MODELS_EMBEDDING_DIMENSIONS", raising=False)
+	monkeypatch.setattr(cache, "_stores", {})
+	yield tmp_path
+	for store in cache._stores.values():
+		store.close()
+
+
+def test_get_embedding_miss_returns_none():
+	assert cache.get_embedding("not cached") is None
+
+
+def test_save_and_get_embedding_round_trip():
+	cache.save_embedding("hello", [0.5, -1.25, 2.0])
+	assert cache.get_embedding("hello") == [0.5, -1.25, 2.0]
+
+
+def test_embeddings_persist_across_store_reopen(cache_root):
+	cache.save_embedding("a", [1.0, 2.0])
+	cache.save_embedding("b", [3.0, 4.0, 5.0])
+	cache._store().close()
+
+	store = cache.EmbeddingStore(cache._store().path)
+	assert len(store) == 2
+	assert store.get(cache._key("b")) == [3.0, 4.0, 5.0]
+	store.close()
+
+
+def test_store_rolls_over_to_new_segment(tmp_path):
+	store = cache.EmbeddingStore(tmp_path / "vectors", segment_max_bytes=16)
+	for i in range(5):
+		store.put(cache._key(str(i)), [float(i)] * 4)
+	assert len(list((tmp_path / "vectors").glob("seg-*.f32"))) == 5
+	assert store.get(cache._key("3")) == [3.0] * 4
+	store.close()
+
+
+def test_store_discards_truncated_index_record(tmp_path):
+	store = cache.EmbeddingStore(tmp_path / "vectors")
+	store.put(cache._key("a"), [1.0])
+	store.close()
+	with open(tmp_path / "vectors" / "index.bin", "ab") as f:
+		f.write(b"partial")
+
+	store = cache.EmbeddingStore(tmp_path / "vectors")
+	assert store.get(cache._key("a")) == [1.0]
+	store.put(cache._key("b"), [2.0])
+	store.close()
+	assert cache.EmbeddingStore(tmp_path / "vectors").get(cache._key("b")) == [2.0]
+
+
+def test_get_embedding_falls_back_to_legacy_json(cache_root):
+	legacy = cache_root / "embeddings"
+	legacy.mkdir()
+	(legacy / f"{cache._key('old').hex()}.json").write_text(json.dumps([0.25, 0.75]))
+
+	assert cache.get_embedding("old") == [0.25, 0.75]
+	assert cache._key("old") in cache._store()
+
+
+def test_migrate_json_embeddings(cache_root):
+	legacy = cache_root / "embeddings"
+	legacy.mkdir()
+	for content in ["x", "y"]:
+		(legacy / f"{cache._key(content).hex()}.json").write_text(json.dumps([1.5]))
+	(legacy / "not-a-hash.json").write_text("[]")
+
+	assert cache.migrate_json_embeddings(remove=True) == 2
+	assert cache.get_embedding("x") == [1.5]
+	assert sorted(p.name for p in legacy.iterdir()) == ["not-a-hash.json"]
+
+
+def test_get_embeddings_preserves_order_and_misses():
+	cache.save_embeddings([("a", [1.0]), ("b", [2.0, 2.5]), ("c", [3.0])])
+	assert cache.get_embeddings(["c", "missing", "a", "b"]) == [
+		[3.0],
+		None,
+		[1.0],
+		[2.0, 2.5],
+	]
+
+
+def test_save_embeddings_skips_duplicates(cache_root):
+	cache.save_embeddings([("a", [1.0]), ("a", [1.0])])
+	cache.save_embeddings([("a", [1.0])])
+	assert len(cache._store()) == 1
+	assert (cache._store().path / "seg-00000.f32").stat().st_size == 4
+
+
+def test_get_embeddings_promotes_legacy_json(cache_root):
+	legacy = cache_root / "embeddings"
+	legacy.mkdir()
+	(legacy / f"{cache._key('old').hex()}.json").write_text(json.dumps([0.5]))
+
+	assert cache.get_embeddings(["old", "new"]) == [[0.5], None]
+	assert cache._key("old") in cache._store()
+
+
+def test_embeddings_are_namespaced_by_model_and_dimensions():
+	cache.save_embedding("text", [1.0, 2.0], model="model-a", dimensions=2)
+	assert cache.get_embedding("text", model="model-a", dimensions=2) == [1.0, 2.0]
+	assert cache.get_embedding("text", model="model-b", dimensions=2) is None
+	assert cache.get_embedding("text", model="model-a") is None
+	assert cache.get_embeddings(["text"]) == [None]
+
+
+def test_namespace_is_filesystem_safe():
+	assert (
+		cache.namespace("amazon.titan-embed-text-v2:0", 512)
+		== "amazon.titan-embed-text-v2_0-512"
+	)
+	assert (
+		cache.namespace("amazon.titan-embed-text-v2:0")
+		== "amazon.titan-embed-text-v2_0-default"
+	)
+
+
+def test_store_rejects_wrong_dimension():
+	with pytest.raises(ValueError):
+		cache.save_embeddings(
+			[("text", [1.0, 2.0, 3.0])], model="model-a", dimensions=2
+		)
+
+
+def test_legacy_json_is_served_from_the_configured_namespace(cache_root, monkeypatch):
+	legacy = cache_root / "embeddings"
+	legacy.mkdir()
+	(legacy / f"{cache._key('old').hex()}.json").write_text(json.dumps([0.5, 0.5]))
+	monkeypatch.setenv("MODELS_EMBEDDING", "other-model")
+	monkeypatch.setenv("MODELS_EMBEDDING_DIMENSIONS", "2")
+
+	assert cache.get_embedding("old") is None
+	assert cache.get_embedding("old", model="other-model") is None
+	assert cache.get_embedding("old", model="other-model", dimensions=2) == [0.5, 0.5]
+
+
+def test_legacy_json_of_another_dimension_is_not_served(cache_root, monkeypatch):
+	legacy = cache_root / "embeddings"
+	legacy.mkdir()
+	(legacy / f"{cache._key('old').hex()}.json").write_text(json.dumps([0.5]))
+	monkeypatch.setenv("MODELS_EMBEDDING_DIMENSIONS", "2")
+
+	assert cache.get_embeddings(["old"], dimensions=2) == [None]
+	assert cache.migrate_json_embeddings(remove=True) == 0
+	assert (legacy / f"{cache._key('old').hex()}.json").exists()
+
+
+def test_migrate_json_embeddings_into_the_configured_namespace(cache_root, monkeypatch):
+	legacy = cache_root / "embeddings"
+	legacy.mkdir()
+	(legacy / f"{cache._key('x').hex()}.json").write_text(json.dumps([1.5]))
+	monkeypatch.setenv("MODELS_EMBEDDING", "other-model")
+
+	assert cache.migrate_json_embeddings() == 1
+	assert cache.get_embeddings(["x"], model="other-model") == [[1.5]]
+	assert cache._key("x") not in cache._store()
@@ -0,0 +1,74 @@
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from haystack import Document
+
+import serka.cache as cache
+from serka.graph.embedders import BedrockNodeEmbedder, CachedDocumentEmbedder
+
+_BEDROCK = "haystack_integrations.components.embedders.amazon_bedrock"
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+	monkeypatch.setattr(cache, "root", tmp_path)
+	monkeypatch.setattr(cache, "_stores", {})
+	yield tmp_path
+	for store in cache._stores.values():
+		store.close()
+
+
+@pytest.fixture
+def bedrock():
+	"""Stub bedrock-runtime client that answers Titan requests at the dimension they ask for."""
+	client = MagicMock()
+	requests = []
+
+	def invoke_model(body, **kwargs):
+		request = json.loads(body)
+		requests.append(request)
+		embedding = [0.1] * request.get("dimensions", 1024)
+		return {"body": io.BytesIO(json.dumps({"embedding": embedding}).encode())}
+
+	client.invoke_model.side_effect = invoke_model
+	client.requests = requests
+	session = MagicMock()
+	session.client.return_value = client
+	with (
+		patch(f"{_BEDROCK}.text_embedder.get_aws_session", return_value=session),
+		patch(f"{_BEDROCK}.document_embedder.get_aws_session", return_value=session),
+	):
+		yield client
+
+
+def test_node_embedder_requests_configured_dimensions(bedrock):
+	embedder = BedrockNodeEmbedder(dimensions=256)
+	result = embedder.run(nodes={"Person": [{"uri": "p1", "name": "Ada"}]})
+
+	assert [r["dimensions"] for r in bedrock.requests] == [256]
+	assert len(result["node_embeddings"]["Person"][0]["embedding"]) == 256
+	assert cache.get_embeddings(
+		["Person: {'uri': 'p1', 'name': 'Ada'}"], dimensions=256
+	)[0] == pytest.approx([0.1] * 256)
+
+
+def test_document_embedder_requests_configured_dimensions(bedrock):
+	embedder = CachedDocumentEmbedder(dimensions=512)
+	result = embedder.run(
+		documents=[Document(content="soil moisture"), Document(content="river flow")]
+	)
+
+	assert [r["dimensions"] for r in bedrock.requests] == [512, 512]
+	assert [len(d.embedding) for d in result["documents"]] == [512, 512]
+	assert all(
+		e is not None
+		for e in cache.get_embeddings(["soil moisture", "river flow"], dimensions=512)
+	)
+
+
+def test_embedder_without_dimensions_uses_model_default(bedrock):
+	BedrockNodeEmbedder().run(nodes={"Person": [{"uri": "p1"}]})
+
+	assert bedrock.requests == [{"inputText": "Person: {'uri': 'p1'}"}]
@@ -1,6 +1,11 @@
 from haystack import Document
 
-from serka.graph.extractors import DocumentTruncator, EntityExtractor, TextExtractor
+from serka.graph.extractors import (
+	DocumentTruncator,
+	EntityExtractor,
+	TextExtractor,
+	record_fingerprint,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -122,3 +127,19 @@ def test_document_truncator_passes_short_docs_unchanged():
 	doc = Document(content="short content", meta={})
 	result = DocumentTruncator(max_chars=45_000).run(documents=[doc])
 	assert result["documents"][0].content == "short content"
+
+
+# ---------------------------------------------------------------------------
+# record_fingerprint
+# ---------------------------------------------------------------------------
+
+
+def test_record_fingerprint_ignores_key_order():
+	reordered = dict(reversed(list(_RECORD.items())))
+	assert record_fingerprint(reordered) == record_fingerprint(_RECORD)
+
+
+def test_record_fingerprint_changes_with_content():
+	assert record_fingerprint({**_RECORD, "title": "Renamed"}) != record_fingerprint(
+		_RECORD
+	)
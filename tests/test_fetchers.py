@@ -1,26 +1,312 @@
-from serka.fetchers import EIDCFetcher
-from unittest.mock import Mock
-import requests
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
+import pytest
 
-def test_eidc_fetcher(monkeypatch):
-	dataset_list = [{"id": 1, "title": "Dataset 1"}, {"id": 2, "title": "Dataset 2"}]
-	test_url = "http://test.com/documents"
+from serka.fetchers import EIDCFetcher, LegiloFetcher, _TimeoutSession
 
-	mock_response = Mock()
-	mock_response.json.return_value = {"results": dataset_list}
 
-	def mock_get(*args, **kwargs):
-		assert args[0] == test_url
-		assert kwargs["params"]["page"] == 1
-		assert kwargs["params"]["rows"] == 10000
-		assert kwargs["params"]["term"] == "state:published AND recordType:Dataset"
-		return mock_response
+class _StubEIDC(BaseHTTPRequestHandler):
+	datasets: list[str] = []
+	missing: set[str] = set()
+	requests: list[str] = []
+	# dataset id -> version, part of its ETag
+	versions: dict[str, int] = {}
+	not_modified: list[str] = []
+	delay = 0.0
+	in_flight = 0
+	max_in_flight = 0
+	lock = threading.Lock()
 
-	monkeypatch.setattr(requests, "get", mock_get)
+	def do_GET(self):
+		url = urlparse(self.path)
+		type(self).requests.append(self.path)
+		if url.path == "/eidc/documents":
+			params = parse_qs(url.query)
+			rows, page = int(params["rows"][0]), int(params["page"][0])
+			ids = self.datasets[(page - 1) * rows : page * rows]
+			self._json(200, {"results": [{"identifier": id} for id in ids]})
+			return
+		id = url.path.rsplit("/", 1)[-1]
+		cls = type(self)
+		with cls.lock:
+			cls.in_flight += 1
+			cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+		time.sleep(self.delay)
+		with cls.lock:
+			cls.in_flight -= 1
+		etag = f'"{id}-{cls.versions.get(id, 1)}"'
+		if id in self.missing:
+			self._json(404, {})
+		elif self.headers.get("If-None-Match") == etag:
+			cls.not_modified.append(id)
+			self.send_response(304)
+			self.send_header("ETag", etag)
+			self.end_headers()
+		else:
+			self._json(
+				200,
+				{"id": id, "title": f"Dataset {id} v{cls.versions.get(id, 1)}"},
+				etag=etag,
+			)
 
-	fetcher = EIDCFetcher(test_url)
-	result = fetcher.run()
+	def _json(self, status, body, etag=None):
+		payload = json.dumps(body).encode()
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(payload)))
+		if etag:
+			self.send_header("ETag", etag)
+		self.end_headers()
+		self.wfile.write(payload)
 
-	assert result == {"records": dataset_list}
-	assert mock_response.json.called
+	def log_message(self, *args):
+		pass
+
+
+@pytest.fixture
+def stub_server():
+	_StubEIDC.datasets = []
+	_StubEIDC.missing = set()
+	_StubEIDC.requests = []
+	_StubEIDC.versions = {}
+	_StubEIDC.not_modified = []
+	_StubEIDC.delay = 0.0
+	_StubEIDC.in_flight = 0
+	_StubEIDC.max_in_flight = 0
+	server = ThreadingHTTPServer(("127.0.0.1", 0), _StubEIDC)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	yield f"http://127.0.0.1:{server.server_port}"
+	server.shutdown()
+
+
+def _fetcher(base_url, tmp_path, max_workers=4, refresh=False):
+	return EIDCFetcher(
+		url=f"{base_url}/eidc/documents",
+		document_url=f"{base_url}/documents/{{id}}?format=json",
+		max_workers=max_workers,
+		refresh=refresh,
+		session=_TimeoutSession(str(tmp_path / "http"), backend="filesystem"),
+	)
+
+
+def test_eidc_fetcher(stub_server, tmp_path):
+	_StubEIDC.datasets = ["1", "2"]
+
+	result = _fetcher(stub_server, tmp_path).run()
+
+	assert result == {
+		"data": [
+			{"id": "1", "title": "Dataset 1 v1"},
+			{"id": "2", "title": "Dataset 2 v1"},
+		]
+	}
+	params = parse_qs(urlparse(_StubEIDC.requests[0]).query)
+	assert params["page"] == ["1"]
+	assert params["rows"] == ["10000"]
+	assert params["term"] == ["state:published AND recordType:Dataset"]
+
+
+def test_iter_pages_yields_each_page_in_order(stub_server, tmp_path):
+	_StubEIDC.datasets = [str(i) for i in range(25)]
+
+	pages = list(_fetcher(stub_server, tmp_path).iter_pages(rows=100, page_size=10))
+
+	assert [len(p) for p in pages] == [10, 10, 5]
+	assert [r["id"] for p in pages for r in p] == _StubEIDC.datasets
+
+
+def test_iter_pages_stops_at_requested_rows(stub_server, tmp_path):
+	_StubEIDC.datasets = [str(i) for i in range(25)]
+
+	pages = list(_fetcher(stub_server, tmp_path).iter_pages(rows=12, page_size=5))
+
+	assert [len(p) for p in pages] == [5, 5, 2]
+	searched_pages = [
+		parse_qs(urlparse(r).query)["page"][0]
+		for r in _StubEIDC.requests
+		if "rows=" in r
+	]
+	assert searched_pages == ["1", "2", "3"]
+
+
+def test_get_eidc_json_preserves_order_and_skips_failures(stub_server, tmp_path):
+	ids = [str(i) for i in range(20)]
+	_StubEIDC.missing = {"3", "11"}
+
+	results = _fetcher(stub_server, tmp_path).get_eidc_json(ids)
+
+	assert [r["id"] for r in results] == [id for id in ids if id not in {"3", "11"}]
+
+
+def test_get_eidc_json_fetches_concurrently(stub_server, tmp_path):
+	_StubEIDC.delay = 0.2
+	ids = [str(i) for i in range(8)]
+
+	results = _fetcher(stub_server, tmp_path, max_workers=4).get_eidc_json(ids)
+
+	assert len(results) == 8
+	assert _StubEIDC.max_in_flight == 4
+
+
+def test_shared_session_pool_is_never_shrunk(tmp_path):
+	session = _TimeoutSession(str(tmp_path / "http"), backend="filesystem")
+
+	EIDCFetcher(max_workers=16, session=session)
+	EIDCFetcher(max_workers=4, session=session)
+
+	assert session.get_adapter("https://example.org")._pool_maxsize == 16
+
+
+def test_get_eidc_json_serves_repeat_fetches_from_cache(stub_server, tmp_path):
+	ids = ["a", "b", "c"]
+	fetcher = _fetcher(stub_server, tmp_path)
+	first = fetcher.get_eidc_json(ids)
+	_StubEIDC.requests = []
+
+	assert fetcher.get_eidc_json(ids) == first
+	assert _StubEIDC.requests == []
+
+
+def test_refresh_revalidates_cached_records_and_downloads_only_changed_ones(
+	stub_server, tmp_path
+):
+	ids = ["a", "b", "c"]
+	_fetcher(stub_server, tmp_path).get_eidc_json(ids)
+	_StubEIDC.versions = {"b": 2}
+
+	results = _fetcher(stub_server, tmp_path, refresh=True).get_eidc_json(ids)
+
+	assert [r["title"] for r in results] == [
+		"Dataset a v1",
+		"Dataset b v2",
+		"Dataset c v1",
+	]
+	assert sorted(_StubEIDC.not_modified) == ["a", "c"]
+
+
+class _StubLegilo(BaseHTTPRequestHandler):
+	# dataset id -> list of statuses to return before succeeding
+	failures: dict[str, list[int]] = {}
+	requests: list[str] = []
+
+	def do_GET(self):
+		id = urlparse(self.path).path.strip("/").split("/")[0]
+		type(self).requests.append(id)
+		pending = self.failures.get(id, [])
+		status = pending.pop(0) if pending else 200
+		body = (
+			{"success": {f"{id}.txt": f"supporting text for dataset {id}"}}
+			if status == 200
+			else {}
+		)
+		payload = json.dumps(body).encode()
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(payload)))
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def log_message(self, *args):
+		pass
+
+
+@pytest.fixture
+def legilo_server():
+	_StubLegilo.failures = {}
+	_StubLegilo.requests = []
+	server = ThreadingHTTPServer(("127.0.0.1", 0), _StubLegilo)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	yield f"http://127.0.0.1:{server.server_port}"
+	server.shutdown()
+
+
+def _legilo(base_url, tmp_path, **kwargs):
+	return LegiloFetcher(
+		legilo_url=f"{base_url}/{{id}}/documents",
+		username="user",
+		password="pass",
+		backoff=0.01,
+		session=_TimeoutSession(str(tmp_path / "http"), backend="filesystem"),
+		**kwargs,
+	)
+
+
+def _datasets(*ids):
+	return [
+		{
+			"id": id,
+			"title": f"Dataset {id}",
+			"resourceIdentifiers": [{"codeSpace": "doi:", "code": id}],
+		}
+		for id in ids
+	]
+
+
+def test_legilo_fetcher_preserves_dataset_order(legilo_server, tmp_path):
+	ids = [str(i) for i in range(12)]
+
+	docs = _legilo(legilo_server, tmp_path).run(datasets=_datasets(*ids))["documents"]
+
+	assert [d.meta["uri"] for d in docs] == [f"https://doi.org/{id}" for id in ids]
+
+
+def test_legilo_fetcher_retries_throttled_and_server_errors(legilo_server, tmp_path):
+	_StubLegilo.failures = {"b": [429, 503]}
+
+	docs = _legilo(legilo_server, tmp_path).run(datasets=_datasets("a", "b"))[
+		"documents"
+	]
+
+	assert [d.meta["filename"] for d in docs] == ["a.txt", "b.txt"]
+	assert _StubLegilo.requests.count("b") == 3
+
+
+def test_legilo_fetcher_gives_up_after_max_retries(legilo_server, tmp_path):
+	_StubLegilo.failures = {"b": [500] * 10}
+
+	docs = _legilo(legilo_server, tmp_path, max_retries=2).run(
+		datasets=_datasets("a", "b")
+	)["documents"]
+
+	assert [d.meta["filename"] for d in docs] == ["a.txt"]
+	assert _StubLegilo.requests.count("b") == 3
+
+
+def test_legilo_fetcher_does_not_retry_client_errors(legilo_server, tmp_path):
+	_StubLegilo.failures = {"b": [404]}
+
+	docs = _legilo(legilo_server, tmp_path).run(datasets=_datasets("a", "b"))[
+		"documents"
+	]
+
+	assert len(docs) == 1
+	assert _StubLegilo.requests.count("b") == 1
+
+
+def test_legilo_fetcher_stops_on_failed_credential_check(legilo_server, tmp_path):
+	_StubLegilo.failures = {"a": [401]}
+
+	assert _legilo(legilo_server, tmp_path).run(datasets=_datasets("a", "b")) == {
+		"documents": []
+	}
+	assert _StubLegilo.requests == ["a"]
+
+
+def test_legilo_fetcher_refresh_revalidates_cached_documents(legilo_server, tmp_path):
+	_legilo(legilo_server, tmp_path).run(datasets=_datasets("a"))
+	_StubLegilo.requests = []
+	_legilo(legilo_server, tmp_path).run(datasets=_datasets("a"))
+	assert _StubLegilo.requests == []
+
+	docs = _legilo(legilo_server, tmp_path, refresh=True).run(datasets=_datasets("a"))[
+		"documents"
+	]
+
+	assert [d.meta["filename"] for d in docs] == ["a.txt"]
+	assert "a" in _StubLegilo.requests
@@ -0,0 +1,44 @@
+from unittest.mock import MagicMock
+
+from serka.graph.extractors import record_fingerprint
+from serka.graph.readers import DatasetChangeFilter
+
+
+def _record(code, title="Title"):
+	return {
+		"resourceIdentifiers": [{"codeSpace": "doi:", "code": code}],
+		"title": title,
+	}
+
+
+def _filter(stored):
+	change_filter = DatasetChangeFilter(host="localhost", port=7687)
+	change_filter._driver = MagicMock()
+	session = change_filter._driver.session.return_value.__enter__.return_value
+	session.execute_read.return_value = stored
+	return change_filter
+
+
+def test_change_filter_skips_unchanged_datasets():
+	unchanged, changed, new = _record("a"), _record("b", "New title"), _record("c")
+	stored = {
+		"https://doi.org/a": record_fingerprint(unchanged),
+		"https://doi.org/b": record_fingerprint(_record("b")),
+	}
+
+	result = _filter(stored).run(data=[unchanged, changed, new])
+
+	assert result["data"] == [changed, new]
+	assert result["fingerprints"] == {
+		"https://doi.org/b": record_fingerprint(changed),
+		"https://doi.org/c": record_fingerprint(new),
+	}
+
+
+def test_change_filter_passes_everything_on_empty_graph():
+	records = [_record("a"), _record("b")]
+
+	result = _filter({}).run(data=records)
+
+	assert result["data"] == records
+	assert set(result["fingerprints"]) == {"https://doi.org/a", "https://doi.org/b"}
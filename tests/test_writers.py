@@ -0,0 +1,271 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from haystack import Document
+
+from serka.graph.writers import Neo4jGraphWriter, WriteMetrics, _batched_by_bytes
+
+
+class _FakeTx:
+	def __init__(self, queries, created=None):
+		self.queries = queries
+		self.created = created
+
+	def run(self, query, **params):
+		self.queries.append(query)
+		result = MagicMock()
+		rows = len(next((v for v in params.values() if isinstance(v, list)), []))
+		created = rows if self.created is None else self.created
+		result.consume.return_value.counters.nodes_created = created
+		result.consume.return_value.counters.relationships_created = created
+		result.single.return_value = {"generation": 1}
+		return result
+
+
+def _writer(**kwargs):
+	writer = Neo4jGraphWriter(host="localhost", port=7687, **kwargs)
+	queries: list[str] = []
+	session = MagicMock()
+	session.execute_write.side_effect = lambda fn, *args: fn(_FakeTx(queries), *args)
+	writer._driver = MagicMock()
+	writer._driver.session.return_value.__enter__.return_value = session
+	return writer, queries
+
+
+_NODES = {"Dataset": [{"uri": "https://doi.org/a", "title": "A"}]}
+_RELATIONS = {"AUTHORED_BY": [("https://doi.org/a", "https://orcid.org/p")]}
+_DOCS = [
+	Document(
+		content="chunk",
+		meta={"field": "description", "uri": "https://doi.org/a"},
+		embedding=[0.1],
+	)
+]
+
+
+def test_writer_creates_by_default():
+	writer, queries = _writer()
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+
+	writes = [q for q in queries if "UNWIND" in q]
+	assert all("CREATE (" in q and "MERGE" not in q for q in writes)
+
+
+def test_writer_upsert_merges_after_creating_lookup_constraints():
+	writer, queries = _writer(upsert=True)
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+
+	writes = [q for q in queries if "UNWIND" in q]
+	assert all("MERGE" in q and "CREATE (" not in q for q in writes)
+	constraint = next(
+		i for i, q in enumerate(queries) if "CREATE CONSTRAINT embedded_uri" in q
+	)
+	assert constraint < queries.index(writes[0])
+	assert sum("CREATE CONSTRAINT embedded_uri" in q for q in queries) == 1
+
+
+def test_writer_incremental_replaces_changed_dataset_content():
+	writer, queries = _writer()
+	writer.run(
+		nodes=_NODES,
+		relations=_RELATIONS,
+		docs=_DOCS,
+		fingerprints={"https://doi.org/a": "abc"},
+	)
+
+	delete = next(i for i, q in enumerate(queries) if "DETACH DELETE t" in q)
+	first_write = next(i for i, q in enumerate(queries) if "MERGE (n:Dataset" in q)
+	fingerprint = next(i for i, q in enumerate(queries) if "SET d.fingerprint" in q)
+	assert delete < first_write < fingerprint
+	assert fingerprint == max(i for i, q in enumerate(queries) if "UNWIND" in q)
+
+
+def test_writer_upsert_keeps_stored_fingerprints():
+	writer, queries = _writer(upsert=True)
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+
+	dataset_write = next(q for q in queries if "MERGE (n:Dataset" in q)
+	assert "SET n = node{.*, fingerprint: n.fingerprint}" in dataset_write
+
+
+def test_batches_are_cut_by_payload_size():
+	rows = [{"uri": str(i), "embedding": [0.0] * 100} for i in range(10)]
+	batches = list(_batched_by_bytes(rows, max_bytes=3 * 1000))
+
+	assert [len(b) for b in batches] == [3, 3, 3, 1]
+	assert [r for b in batches for r in b] == rows
+	assert [
+		len(b)
+		for b in _batched_by_bytes([("a", "b")] * 10, max_bytes=10**6, max_rows=4)
+	] == [4, 4, 2]
+
+
+def test_writer_splits_batches_across_sessions():
+	writer, queries = _writer(max_workers=3, batch_bytes=1000)
+	nodes = {
+		"Dataset": [
+			{"uri": f"https://doi.org/{i}", "embedding": [0.0] * 100} for i in range(6)
+		]
+	}
+	relations = {
+		"AUTHORED_BY": [("https://doi.org/0", "https://orcid.org/p")],
+		"PUBLISHED_BY": [("https://doi.org/1", "https://ror.org/o")],
+	}
+
+	result = writer.run(nodes=nodes, relations=relations, docs=[])
+
+	assert sum("CREATE (n:Dataset" in q for q in queries) == 6
+	assert result["nodes_created"]["Dataset"] == 6
+	assert set(result["relations_created"]) == {"AUTHORED_BY", "PUBLISHED_BY"}
+	last_node_write = max(i for i, q in enumerate(queries) if "CREATE (n:Dataset" in q)
+	assert all(
+		i > last_node_write for i, q in enumerate(queries) if "MATCH (a:embedded" in q
+	)
+
+
+def test_paged_writer_skips_entities_written_by_earlier_pages():
+	writer, queries = _writer(paged=True)
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=[])
+	queries.clear()
+	result = writer.run(nodes=_NODES, relations=_RELATIONS, docs=[])
+
+	assert not any("CREATE (n:Dataset" in q for q in queries)
+	assert result["nodes_created"]["Dataset"] == 0
+
+
+def test_unpaged_writer_writes_every_run_in_full():
+	writer, queries = _writer()
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=[])
+	queries.clear()
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=[])
+
+	assert sum("CREATE (n:Dataset" in q for q in queries) == 1
+
+
+def test_failed_node_batch_is_not_remembered_as_written():
+	writer, queries = _writer(paged=True)
+	session = writer._driver.session.return_value.__enter__.return_value
+	session.execute_write.side_effect = RuntimeError("write failed")
+	with pytest.raises(RuntimeError):
+		writer.run(nodes=_NODES, relations=_RELATIONS, docs=[])
+	session.execute_write.side_effect = lambda fn, *args: fn(_FakeTx(queries), *args)
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=[])
+
+	assert sum("CREATE (n:Dataset" in q for q in queries) == 1
+
+
+def test_writes_return_nothing_and_count_from_the_summary():
+	writer, queries = _writer(upsert=True)
+	session = writer._driver.session.return_value.__enter__.return_value
+	# Every row MERGEs onto a node or relationship that already exists
+	session.execute_write.side_effect = lambda fn, *args: fn(
+		_FakeTx(queries, created=0), *args
+	)
+
+	result = writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+
+	writes = [q for q in queries if "UNWIND" in q]
+	assert not any("RETURN" in q for q in writes)
+	assert result["nodes_created"] == {"Dataset": 0, "Document": 0}
+	assert set(result["relations_created"].values()) == {0}
+
+
+def test_writer_reports_phase_metrics():
+	writer, _ = _writer()
+	metrics = writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)["metrics"]
+
+	assert metrics["nodes"]["rows"] == 2
+	assert metrics["relations"]["rows"] == 2
+	assert metrics["nodes"]["bytes"] > metrics["relations"]["bytes"] > 0
+	assert metrics["total"]["rows"] == 4
+	assert {"lookup_indexes", "search_indexes"} <= set(metrics)
+
+	totals = WriteMetrics()
+	totals.update(metrics)
+	totals.update(metrics)
+	assert totals.as_dict()["total"]["rows"] == 8
+
+
+def test_writer_bumps_ingest_generation_last():
+	writer, queries = _writer()
+	writer.run(
+		nodes=_NODES,
+		relations=_RELATIONS,
+		docs=_DOCS,
+		fingerprints={"https://doi.org/a": "abc"},
+	)
+
+	assert "s.generation = coalesce(s.generation, 0) + 1" in queries[-1]
+
+
+def test_paged_writer_bumps_ingest_generation_once_after_the_last_page():
+	writer, queries = _writer(paged=True)
+	for _ in range(3):
+		writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+	assert not any("s.generation" in q for q in queries)
+
+	assert writer.finish_ingest() == 1
+	assert sum("s.generation" in q for q in queries) == 1
+	assert "s.generation = coalesce(s.generation, 0) + 1" in queries[-1]
+
+
+def test_writer_leaves_ingest_generation_when_nothing_was_written():
+	writer, queries = _writer()
+	writer.run(nodes={}, relations={}, docs=[], fingerprints={})
+
+	assert not any("s.generation" in q for q in queries)
+
+	paged, queries = _writer(paged=True)
+	paged.run(nodes={}, relations={}, docs=[], fingerprints={})
+
+	assert paged.finish_ingest() is None
+	assert not any("s.generation" in q for q in queries)
+
+
+def test_writer_creates_per_label_search_indexes():
+	writer, queries = _writer()
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+
+	for suffix in ("person", "organisation"):
+		assert any(f"CREATE VECTOR INDEX vec_{suffix} " in q for q in queries)
+	for suffix in ("textchunk", "person", "organisation"):
+		assert any(f"CREATE FULLTEXT INDEX ft_{suffix} " in q for q in queries)
+
+
+def test_text_chunks_are_only_in_the_shared_vector_index():
+	writer, queries = _writer()
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+
+	assert not any("CREATE VECTOR INDEX vec_textchunk" in q for q in queries)
+
+
+def test_paged_writer_builds_search_indexes_once_after_the_last_page():
+	writer, queries = _writer(paged=True)
+	for _ in range(3):
+		writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+	assert not any(
+		"CREATE VECTOR INDEX vec_lookup" in q or "extent_sw IS NULL" in q
+		for q in queries
+	)
+
+	writer.finish_ingest()
+	assert sum("CREATE VECTOR INDEX vec_lookup" in q for q in queries) == 1
+	assert sum("extent_sw IS NULL" in q for q in queries) == 1
+
+
+def test_writer_stores_dataset_extents_as_indexed_points():
+	writer, queries = _writer()
+	writer.run(nodes=_NODES, relations=_RELATIONS, docs=_DOCS)
+
+	dataset_write = next(q for q in queries if "CREATE (n:Dataset" in q)
+	assert (
+		"n.extent_sw = CASE" in dataset_write and "n.extent_ne = CASE" in dataset_write
+	)
+	assert not any(
+		"extent_sw" in q
+		for q in queries
+		if "UNWIND" in q and "CREATE (n:Dataset" not in q
+	)
+	assert any("CREATE POINT INDEX dataset_extent_sw " in q for q in queries)
+	assert any("CREATE POINT INDEX dataset_extent_ne " in q for q in queries)